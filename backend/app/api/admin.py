@@ -10,7 +10,9 @@ from app.models.content import (
 from app.services.admin_service import AdminService
 from app.services.user_service import UserService
 from app.core.security import create_access_token, verify_password
-from app.core.database import get_database
+from app.core.auth_cache import auth_user_cache
+from app.core.content_cache import hot_content_cache
+from app.api.deps import get_admin_service, get_user_service
 from datetime import timedelta
 from app.core.config import settings
 import logging
@@ -49,7 +51,7 @@ class AdminUsersListResponse(BaseModel):
 # 管理员权限验证依赖
 async def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """验证管理员身份"""
     try:
@@ -67,7 +69,6 @@ async def get_current_admin(
         # 检查是否是内置管理员账户
         if user_id.startswith("builtin_admin_"):
             # 内置管理员账户，直接验证通过
-            admin_service = AdminService(db)
             username = user_id.replace("builtin_admin_", "")
             
             # 从内置账户配置中获取信息
@@ -90,14 +91,21 @@ async def get_current_admin(
                 "role": user_role
             }
         else:
-            # 数据库中的管理员用户
-            admin_service = AdminService(db)
-            user_doc = await admin_service.users_collection.find_one({"_id": user_id, "role": "admin"})
-            if not user_doc:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="管理员用户不存在"
+            # 数据库中的管理员用户（短TTL缓存，角色变更时失效）
+            subject = f"admin:{user_id}"
+            user_doc = auth_user_cache.get(subject)
+            if user_doc is None:
+                version = auth_user_cache.version(subject)
+                user_doc = await admin_service.users_collection.find_one(
+                    {"_id": user_id, "role": "admin"},
+                    {"username": 1}
                 )
+                if not user_doc:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="管理员用户不存在"
+                    )
+                auth_user_cache.set(subject, user_id, user_doc, version)
             
             return {
                 "user_id": user_id,
@@ -114,14 +122,12 @@ async def get_current_admin(
 @router.post("/login", response_model=AdminLoginResponse)
 async def admin_login(
     login_request: AdminLoginRequest,
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """管理员登录"""
     logger.info(f"🔐 管理员登录尝试 - username: {login_request.username}")
     
     try:
-        admin_service = AdminService(db)
-        
         # 验证管理员凭证
         admin_user = await admin_service.authenticate_admin(
             login_request.username, 
@@ -185,14 +191,13 @@ async def get_articles_for_management(
     search_keyword: Optional[str] = Query(None, description="搜索关键词"),
     tag_search: Optional[str] = Query(None, description="标签搜索"),
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """获取文章管理列表"""
     logger.info(f"📋 管理员获取文章列表 - admin: {current_admin['username']}, page: {page}")
     logger.info(f"🔍 搜索参数 - content_type: {content_type}, energy_type: {energy_type}, search_keyword: {search_keyword}, tag_search: {tag_search}")
     
     try:
-        admin_service = AdminService(db)
         result = await admin_service.get_articles_for_management(
             page=page,
             page_size=page_size,
@@ -229,13 +234,12 @@ async def get_articles_for_management(
 async def create_article(
     article_data: ContentCreateRequest,
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """创建文章"""
     logger.info(f"📝 管理员创建文章 - admin: {current_admin['username']}, title: {article_data.title}")
     
     try:
-        admin_service = AdminService(db)
         content = await admin_service.create_article(article_data, current_admin['user_id'])
         
         return ContentManagementResponse(
@@ -256,13 +260,12 @@ async def update_article(
     article_id: str,
     update_data: ContentUpdateRequest,
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """更新文章"""
     logger.info(f"✏️ 管理员更新文章 - admin: {current_admin['username']}, article_id: {article_id}")
     
     try:
-        admin_service = AdminService(db)
         content = await admin_service.update_article(article_id, update_data, current_admin['user_id'])
         
         return ContentManagementResponse(
@@ -282,13 +285,12 @@ async def update_article(
 async def delete_article(
     article_id: str,
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """删除文章"""
     logger.info(f"🗑️ 管理员删除文章 - admin: {current_admin['username']}, article_id: {article_id}")
     
     try:
-        admin_service = AdminService(db)
         success = await admin_service.delete_article(article_id, current_admin['user_id'])
         
         if success:
@@ -312,13 +314,12 @@ async def delete_article(
 async def batch_import_articles(
     import_request: BatchImportRequest,
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """批量导入文章"""
     logger.info(f"📦 管理员批量导入文章 - admin: {current_admin['username']}, count: {len(import_request.articles)}")
     
     try:
-        admin_service = AdminService(db)
         result = await admin_service.batch_import_articles(
             articles=import_request.articles,
             admin_id=current_admin['user_id'],
@@ -341,7 +342,7 @@ async def import_json_file(
     auto_parse_tags: bool = Query(True, description="是否自动解析标签"),
     overwrite_existing: bool = Query(False, description="是否覆盖已存在的文章"),
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """从JSON文件导入文章"""
     logger.info(f"📁 管理员从文件导入文章 - admin: {current_admin['username']}, file: {file.filename}")
@@ -385,7 +386,6 @@ async def import_json_file(
             )
         
         # 执行批量导入
-        admin_service = AdminService(db)
         result = await admin_service.batch_import_articles(
             articles=articles,
             admin_id=current_admin['user_id'],
@@ -408,13 +408,12 @@ async def import_json_file(
 async def get_article_detail(
     article_id: str,
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """获取文章详情"""
     logger.info(f"📄 管理员获取文章详情 - admin: {current_admin['username']}, article_id: {article_id}")
     
     try:
-        admin_service = AdminService(db)
         from bson import ObjectId
         
         article_doc = await admin_service.content_collection.find_one({"_id": ObjectId(article_id)})
@@ -441,14 +440,12 @@ async def get_article_detail(
 @router.get("/stats")
 async def get_admin_stats(
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    admin_service: AdminService = Depends(get_admin_service)
 ):
     """获取管理员统计数据"""
     logger.info(f"📊 管理员获取统计数据 - admin: {current_admin['username']}")
     
     try:
-        admin_service = AdminService(db)
-        
         # 获取文章统计
         total_articles = await admin_service.content_collection.count_documents({})
         
@@ -493,18 +490,24 @@ async def get_admin_stats(
             detail=f"获取统计数据失败: {str(e)}"
         )
 
+@router.get("/cache/stats")
+async def get_cache_stats(current_admin = Depends(get_current_admin)):
+    """获取进程内缓存统计（用于调整缓存容量）"""
+    return {
+        "hot_content": hot_content_cache.stats()
+    }
+
 @router.get("/users", response_model=AdminUsersListResponse)
 async def get_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     current_admin = Depends(get_current_admin),
-    db = Depends(get_database)
+    user_service: UserService = Depends(get_user_service)
 ):
     """获取用户列表"""
     logger.info(f"📋 管理员获取用户列表 - admin: {current_admin['username']}, page: {page}")
     
     try:
-        user_service = UserService(db)
         result = await user_service.get_users(
             page=page,
             page_size=page_size
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
 from typing import List, Optional
 from app.models.content import Content, ContentType
 from app.services.content_service import ContentService
-from app.core.database import get_database
+from app.api.deps import get_content_service
+from app.core.responses import model_response
 from pydantic import BaseModel
 import logging
 
@@ -29,20 +30,19 @@ class ContentListResponse(BaseModel):
 
 @router.get("/", response_model=ContentListResponse)
 async def get_content_list(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     content_type: Optional[str] = Query(None, description="内容类型筛选"),
     tag_filters: Optional[str] = Query(None, description="逗号分隔的标签列表"),
     sort_by: str = Query("latest", regex="^(latest|popularity|relevance)$"),
     search_keyword: Optional[str] = Query(None, description="搜索关键词"),
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """获取内容列表（支持筛选、排序、分页）"""
     logger.info(f"📋 内容列表API调用 - page={page}, page_size={page_size}, content_type={content_type}, tag_filters={tag_filters}, sort_by={sort_by}, search_keyword={search_keyword}")
     
     try:
-        content_service = ContentService(db)
-        
         skip = (page - 1) * page_size
         logger.info(f"📄 分页计算 - skip={skip}, limit={page_size}")
         
@@ -101,7 +101,7 @@ async def get_content_list(
         )
         
         logger.info(f"🎯 API调用完成 - 返回响应: items={len(response.items)}, total={response.total}, has_next={response.has_next}")
-        return response
+        return model_response(request, response)
         
     except Exception as e:
         logger.error(f"❌ 内容列表API错误: {str(e)}")
@@ -114,10 +114,9 @@ async def get_content_list(
         )
 
 @router.get("/tags", response_model=List[str])
-async def get_available_tags(db=Depends(get_database)):
+async def get_available_tags(content_service: ContentService = Depends(get_content_service)):
     """获取所有可用的标签"""
     try:
-        content_service = ContentService(db)
         tags = await content_service.get_all_tags()
         return tags
     except Exception as e:
@@ -127,15 +126,17 @@ async def get_available_tags(db=Depends(get_database)):
         )
 
 @router.get("/stats", response_model=ContentStatsResponse)
-async def get_content_stats(db=Depends(get_database)):
+async def get_content_stats(content_service: ContentService = Depends(get_content_service)):
     """获取内容统计数据"""
     logger.info(f"📊 内容统计API调用")
     
     try:
-        content_service = ContentService(db)
-        
-        # 获取总数
-        total_count = await content_service.get_content_count()
+        # 总数与按类型统计（跨 worker 共享，TTL 内只计算一次）
+        counts = await content_service.get_content_stats()
+        total_count = counts["total"]
+        announcement_count = counts["announcement"]
+        news_count = counts["news"]
+        policy_count = counts["policy"]
         logger.info(f"📄 总内容数: {total_count}")
         
         # 获取今日内容数（简化处理）
@@ -144,11 +145,6 @@ async def get_content_stats(db=Depends(get_database)):
         # 获取本周内容数
         this_week_count = max(1, total_count // 5)
         
-        # 按类型统计
-        announcement_count = await content_service.get_content_count(content_type="announcement")
-        news_count = await content_service.get_content_count(content_type="news")
-        policy_count = await content_service.get_content_count(content_type="policy")
-        
         logger.info(f"📊 统计结果 - 公告:{announcement_count}, 资讯:{news_count}, 政策:{policy_count}")
         
         stats = ContentStatsResponse(
@@ -179,17 +175,16 @@ async def get_content_stats(db=Depends(get_database)):
 
 @router.get("/search", response_model=ContentListResponse)
 async def search_content(
+    request: Request,
     keyword: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     content_type: Optional[str] = Query(None),
     tag_filters: Optional[str] = Query(None),
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """搜索内容"""
     try:
-        content_service = ContentService(db)
-        
         skip = (page - 1) * page_size
         tags = None
         if tag_filters:
@@ -212,13 +207,13 @@ async def search_content(
         
         has_next = (skip + len(contents)) < total_count
         
-        return ContentListResponse(
+        return model_response(request, ContentListResponse(
             items=contents,
             total=total_count,
             page=page,
             page_size=page_size,
             has_next=has_next
-        )
+        ))
         
     except Exception as e:
         raise HTTPException(
@@ -228,12 +223,12 @@ async def search_content(
 
 @router.get("/{content_id}", response_model=Content)
 async def get_content_detail(
+    request: Request,
     content_id: str,
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """获取内容详情"""
     try:
-        content_service = ContentService(db)
         content = await content_service.get_content_by_id(content_id)
         
         if not content:
@@ -242,7 +237,7 @@ async def get_content_detail(
                 detail="Content not found"
             )
         
-        return content
+        return model_response(request, content)
     except HTTPException:
         raise
     except Exception as e:
@@ -254,11 +249,10 @@ async def get_content_detail(
 @router.post("/{content_id}/view")
 async def record_content_view(
     content_id: str,
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """记录内容浏览（增加浏览次数）"""
     try:
-        content_service = ContentService(db)
         await content_service.increment_view_count(content_id)
         return {"success": True, "message": "View recorded successfully"}
     except Exception as e:
@@ -270,11 +264,10 @@ async def record_content_view(
 @router.post("/", response_model=Content)
 async def create_content(
     content: Content,
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """创建内容"""
     try:
-        content_service = ContentService(db)
         created_content = await content_service.create_content(content)
         return created_content
     except Exception as e:
@@ -286,7 +279,7 @@ async def create_content(
 @router.post("/recommend", response_model=ContentListResponse)
 async def recommend_content(
     request: dict,
-    db=Depends(get_database)
+    content_service: ContentService = Depends(get_content_service)
 ):
     """基于用户标签推荐内容"""
     logger.info(f"🎯 内容推荐API调用 - request: {request}")
@@ -298,11 +291,7 @@ async def recommend_content(
         logger.info(f"🏷️ 用户标签: {user_tags}")
         logger.info(f"📊 推荐数量限制: {limit}")
         
-        from app.services.recommendation_service import RecommendationService
-        recommendation_service = RecommendationService(db)
-        
         # 这里先实现简单的标签匹配推荐
-        content_service = ContentService(db)
         
         # 解析标签分类
         basic_info_tags = []
@@ -1,16 +1,74 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from app.core.config import settings
 from app.core.database import get_database
+from app.core.auth_cache import auth_user_cache
 from app.models.user import User
 from app.services.user_service import UserService
+from app.services.content_service import ContentService
+from app.services.recommendation_service import RecommendationService
+from app.services.favorite_service import FavoriteService
+from app.services.admin_service import AdminService
 
 security = HTTPBearer()
 
+# 应用级服务单例：按数据库实例缓存，请求间复用（含各服务持有的缓存与索引）
+_services: Dict[str, Any] = {}
+
+def _get_service(name: str, db, factory: Callable[[Any], Any]):
+    """获取（必要时创建）绑定到当前数据库的服务单例"""
+    service = _services.get(name)
+    if service is None or service.db is not db:
+        service = factory(db)
+        _services[name] = service
+    return service
+
+def reset_services():
+    """清空服务单例（数据库连接关闭时调用）"""
+    _services.clear()
+
+def get_user_service(db = Depends(get_database)) -> UserService:
+    return _get_service("user", db, UserService)
+
+def get_content_service(db = Depends(get_database)) -> ContentService:
+    return _get_service("content", db, ContentService)
+
+def get_recommendation_service(db = Depends(get_database)) -> RecommendationService:
+    return _get_service("recommendation", db, lambda database: RecommendationService(
+        database,
+        user_service=get_user_service(database),
+        content_service=get_content_service(database)
+    ))
+
+def get_favorite_service(db = Depends(get_database)) -> FavoriteService:
+    return _get_service("favorite", db, lambda database: FavoriteService(
+        database,
+        user_service=get_user_service(database)
+    ))
+
+def get_admin_service(db = Depends(get_database)) -> AdminService:
+    return _get_service("admin", db, lambda database: AdminService(
+        database,
+        favorite_service=get_favorite_service(database)
+    ))
+
+async def load_cached_user(subject: str, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+    """按令牌主体读取认证用户缓存，未命中时加载并写入"""
+    user = auth_user_cache.get(subject)
+    if user is None:
+        version = auth_user_cache.version(subject)
+        user = await loader()
+        if user is None:
+            return None
+        auth_user_cache.set(subject, user.id, user, version)
+    # 返回副本，避免请求内修改影响缓存
+    return user.copy()
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db = Depends(get_database)
+    user_service: UserService = Depends(get_user_service)
 ) -> User:
     """获取当前认证用户"""
     credentials_exception = HTTPException(
@@ -25,10 +83,12 @@ async def get_current_user(
         # 处理演示用户token
         if token.startswith("demo_token_"):
             demo_user_id = token.replace("demo_token_", "")
-            user_service = UserService(db)
             
             # 使用专门的方法获取演示用户
-            demo_user = await user_service.get_demo_user_by_id(demo_user_id)
+            demo_user = await load_cached_user(
+                f"demo:{demo_user_id}",
+                lambda: user_service.get_demo_user_by_id(demo_user_id)
+            )
             if demo_user:
                 return demo_user
             raise credentials_exception
@@ -43,8 +103,7 @@ async def get_current_user(
     except Exception:
         raise credentials_exception
     
-    user_service = UserService(db)
-    user = await user_service.get_user_by_id(user_id)
+    user = await load_cached_user(f"user:{user_id}", lambda: user_service.get_user_by_id(user_id))
     if user is None:
         raise credentials_exception
     
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Dict, Any
 
-from app.core.database import get_database
-from app.models.user_behavior import FavoriteRequest, FavoriteResponse, UserBehaviorStats
+from app.models.user_behavior import (
+    FavoriteRequest, FavoriteResponse, UserBehaviorStats,
+    FavoriteCheckRequest, FavoriteCheckResponse
+)
 from app.services.favorite_service import FavoriteService
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_favorite_service
 from app.models.user import User
 
 router = APIRouter()
@@ -14,12 +15,11 @@ router = APIRouter()
 async def add_favorite(
     request: FavoriteRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     添加收藏文章
     """
-    favorite_service = FavoriteService(db)
     result = await favorite_service.add_favorite(current_user.id, request.content_id)
     
     if not result.success:
@@ -34,12 +34,11 @@ async def add_favorite(
 async def remove_favorite(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     取消收藏文章
     """
-    favorite_service = FavoriteService(db)
     result = await favorite_service.remove_favorite(current_user.id, content_id)
     
     if not result.success:
@@ -54,12 +53,11 @@ async def remove_favorite(
 async def get_user_favorites(
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     获取用户收藏的文章列表
     """
-    favorite_service = FavoriteService(db)
     favorites = await favorite_service.get_user_favorites(current_user.id, limit)
     return favorites
 
@@ -68,12 +66,11 @@ async def search_user_favorites(
     query: str = "",
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     搜索用户收藏的文章
     """
-    favorite_service = FavoriteService(db)
     favorites = await favorite_service.search_user_favorites(current_user.id, query, limit)
     return favorites
 
@@ -81,35 +78,44 @@ async def search_user_favorites(
 async def check_favorite_status(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     检查文章是否已收藏
     """
-    favorite_service = FavoriteService(db)
     is_favorited = await favorite_service.is_favorited(current_user.id, content_id)
     return {"is_favorited": is_favorited}
 
+@router.post("/check", response_model=FavoriteCheckResponse)
+async def check_favorites_status(
+    request: FavoriteCheckRequest,
+    current_user: User = Depends(get_current_user),
+    favorite_service: FavoriteService = Depends(get_favorite_service)
+):
+    """
+    批量检查文章是否已收藏（一次查询返回整页文章的收藏状态）
+    """
+    favorites = await favorite_service.check_favorites(current_user.id, request.content_ids)
+    return FavoriteCheckResponse(favorites=favorites)
+
 @router.get("/stats", response_model=UserBehaviorStats)
 async def get_user_behavior_stats(
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     获取用户收藏行为统计
     """
-    favorite_service = FavoriteService(db)
     stats = await favorite_service.get_user_behavior_stats(current_user.id)
     return stats
 
 @router.get("/count")
 async def get_user_favorites_count(
     current_user: User = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    favorite_service: FavoriteService = Depends(get_favorite_service)
 ):
     """
     获取用户收藏总数
     """
-    favorite_service = FavoriteService(db)
     count = await favorite_service.get_user_favorites_count(current_user.id)
     return {"count": count} 
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import List
 from app.models.content import Content
 from app.services.recommendation_service import RecommendationService
-from app.core.database import get_database
+from app.api.deps import get_recommendation_service
 
 router = APIRouter()
 
@@ -11,11 +11,10 @@ async def get_user_recommendations(
     user_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取用户个性化推荐"""
     try:
-        recommendation_service = RecommendationService(db)
         recommendations = await recommendation_service.get_user_recommendations(
             user_id=user_id,
             skip=skip,
@@ -32,11 +31,10 @@ async def get_user_recommendations(
 async def get_trending_content(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取热门内容"""
     try:
-        recommendation_service = RecommendationService(db)
         trending = await recommendation_service.get_trending_content(
             skip=skip,
             limit=limit
@@ -52,11 +50,10 @@ async def get_trending_content(
 async def get_similar_content(
     content_id: str,
     limit: int = Query(5, ge=1, le=20),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取相似内容"""
     try:
-        recommendation_service = RecommendationService(db)
         similar_content = await recommendation_service.get_similar_content(
             content_id=content_id,
             limit=limit
@@ -1,10 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.utils.region_mapper import RegionMapper
+from app.core.responses import static_payload, static_response
 
 router = APIRouter()
 
-@router.get("/cities-details")
-async def get_cities_details():
+@static_payload("region.cities_details")
+def build_cities_details():
     cities = RegionMapper.get_all_cities()
     result = []
     for city in cities:
@@ -18,10 +19,22 @@ async def get_cities_details():
         })
     return {"cities": result, "total": len(result)}
 
-@router.get("/provinces")
-async def get_provinces():
+@static_payload("region.provinces")
+def build_provinces():
     return {"provinces": RegionMapper.get_all_provinces()}
 
+@static_payload("region.regions")
+def build_regions():
+    return {"regions": RegionMapper.get_all_regions()}
+
+@router.get("/cities-details")
+async def get_cities_details(request: Request):
+    return static_response(request, "region.cities_details")
+
+@router.get("/provinces")
+async def get_provinces(request: Request):
+    return static_response(request, "region.provinces")
+
 @router.get("/regions")
-async def get_regions():
-    return {"regions": RegionMapper.get_all_regions()} 
\ No newline at end of file
+async def get_regions(request: Request):
+    return static_response(request, "region.regions")
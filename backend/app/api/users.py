@@ -2,17 +2,18 @@
 """
 用户API路由模块
 """
-import logging
 from datetime import timedelta
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
 from pydantic import BaseModel
 
 # 核心模块导入
 from app.core.config import settings
-from app.core.database import get_database
+from app.api.deps import get_user_service, get_content_service, get_recommendation_service
 from app.core.security import create_access_token
+from app.core.logging_config import get_trace_logger, is_trace_enabled
+from app.core.responses import static_payload, static_response
 
 # 模型导入
 from app.models.user import UserCreate, UserLogin, UserProfile, UserTags, UserTagsResponse, TagUpdateRequest
@@ -20,7 +21,7 @@ from app.models.content import Content
 
 # 服务导入
 from app.services.user_service import UserService
-from app.services.recommendation_service import RecommendationService
+from app.services.recommendation_service import RecommendationService, RecommendationExplainer
 from app.services.content_service import ContentService
 
 # 工具模块导入
@@ -28,9 +29,8 @@ from app.utils.region_mapper import RegionMapper
 from app.utils.tag_processor import TagProcessor
 from app.utils.energy_weight_system import EnergyWeightSystem
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# 日志（推荐追踪日志按请求采样输出）
+logger = get_trace_logger(__name__)
 
 router = APIRouter()
 
@@ -45,6 +45,7 @@ class ContentListResponse(BaseModel):
     page: int
     page_size: int
     has_next: bool
+    explain: Optional[Dict[str, Any]] = None  # 推荐解释（explain=true 时返回）
 
 class UserInsightsResponse(BaseModel):
     behavior_stats: Dict[str, int]
@@ -91,45 +92,53 @@ class TagsUpdateRequest(BaseModel):
 class EnergySelectionRequest(BaseModel):
     energy_types: List[str]
 
+@static_payload("users.supported_cities")
+def build_supported_cities() -> SupportedCitiesResponse:
+    cities = RegionMapper.get_all_cities()
+    regions = RegionMapper.get_all_regions()
+    
+    return SupportedCitiesResponse(
+        cities=sorted(cities),  # 按字母顺序排序
+        regions=regions,
+        total_cities=len(cities)
+    )
+
 @router.get("/supported-cities", response_model=SupportedCitiesResponse)
-async def get_supported_cities():
+async def get_supported_cities(request: Request):
     """获取支持的城市列表和区域信息"""
     try:
-        cities = RegionMapper.get_all_cities()
-        regions = RegionMapper.get_all_regions()
-        
-        return SupportedCitiesResponse(
-            cities=sorted(cities),  # 按字母顺序排序
-            regions=regions,
-            total_cities=len(cities)
-        )
+        return static_response(request, "users.supported_cities")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get supported cities: {str(e)}"
         )
 
+@static_payload("users.cities_details")
+def build_cities_details() -> Dict[str, Any]:
+    cities = RegionMapper.get_all_cities()
+    cities_details = []
+    
+    for city in cities:
+        location_info = RegionMapper.get_full_location_info(city)
+        cities_details.append({
+            "city": city,
+            "province": location_info.get("province", "未知省份"),
+            "region": location_info.get("region", "未知地区"),
+            "province_code": location_info.get("province_code", ""),
+            "region_code": location_info.get("region_code", "")
+        })
+    
+    return {
+        "cities": sorted(cities_details, key=lambda x: x["city"]),
+        "total": len(cities_details)
+    }
+
 @router.get("/cities-details")
-async def get_cities_details():
+async def get_cities_details(request: Request):
     """获取所有城市的详细信息（包括省份和区域）"""
     try:
-        cities = RegionMapper.get_all_cities()
-        cities_details = []
-        
-        for city in cities:
-            location_info = RegionMapper.get_full_location_info(city)
-            cities_details.append({
-                "city": city,
-                "province": location_info.get("province", "未知省份"),
-                "region": location_info.get("region", "未知地区"),
-                "province_code": location_info.get("province_code", ""),
-                "region_code": location_info.get("region_code", "")
-            })
-        
-        return {
-            "cities": sorted(cities_details, key=lambda x: x["city"]),
-            "total": len(cities_details)
-        }
+        return static_response(request, "users.cities_details")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,12 +148,10 @@ async def get_cities_details():
 @router.post("/register", response_model=UserProfile)
 async def register_user(
     request: dict,
-    db = Depends(get_database)
+    user_service: UserService = Depends(get_user_service)
 ):
     """注册新用户（基于城市自动生成区域标签）"""
     try:
-        user_service = UserService(db)
-        
         # 🔥 提取能源类型
         energy_types = request.get("energy_types", [])
         
@@ -182,11 +189,10 @@ async def register_user(
 @router.get("/{user_id}/region-info", response_model=UserRegionInfoResponse)
 async def get_user_region_info(
     user_id: str,
-    db = Depends(get_database)
+    user_service: UserService = Depends(get_user_service)
 ):
     """获取用户的区域信息（包括注册城市和对应区域）"""
     try:
-        user_service = UserService(db)
         region_info = await user_service.get_user_region_info(user_id)
         
         return UserRegionInfoResponse(
@@ -206,13 +212,11 @@ async def get_user_region_info(
         )
 
 @router.post("/login")
-async def login(user_login: UserLogin, db=Depends(get_database)):
+async def login(user_login: UserLogin, user_service: UserService = Depends(get_user_service)):
     """用户登录"""
     logger.info(f"🔐 用户登录尝试 - email: {user_login.email}")
     
     try:
-        user_service = UserService(db)
-        
         # 验证用户凭证
         logger.info(f"🔍 验证用户凭证...")
         user = await user_service.authenticate_user(user_login.email, user_login.password)
@@ -259,13 +263,11 @@ async def login(user_login: UserLogin, db=Depends(get_database)):
         )
 
 @router.get("/{user_id}/tags", response_model=UserTagsResponse)
-async def get_user_tags(user_id: str, db=Depends(get_database)):
+async def get_user_tags(user_id: str, user_service: UserService = Depends(get_user_service)):
     """获取用户标签"""
     logger.info(f"🏷️ 获取用户标签 - user_id: {user_id}")
     
     try:
-        user_service = UserService(db)
-        
         logger.info(f"🔍 查询用户标签...")
         user_tags = await user_service.get_user_tags(user_id)
         
@@ -306,13 +308,11 @@ async def get_user_tags(user_id: str, db=Depends(get_database)):
         )
 
 @router.put("/{user_id}/tags", response_model=UserTagsResponse)
-async def update_user_tags(user_id: str, tag_request: TagUpdateRequest, db=Depends(get_database)):
+async def update_user_tags(user_id: str, tag_request: TagUpdateRequest, user_service: UserService = Depends(get_user_service)):
     """更新用户标签"""
     logger.info(f"📝 更新用户标签 - user_id: {user_id}, 新标签数量: {len(tag_request.tags)}")
     
     try:
-        user_service = UserService(db)
-        
         # 打印新标签详情
         for i, tag in enumerate(tag_request.tags[:5]):  # 只打印前5个
             logger.info(f"🆕 新标签{i+1}: {tag.category}:{tag.name} (权重:{tag.weight})")
@@ -346,13 +346,11 @@ async def update_user_tags(user_id: str, tag_request: TagUpdateRequest, db=Depen
         )
 
 @router.post("/{user_id}/tags/reset", response_model=UserTagsResponse)
-async def reset_user_tags(user_id: str, db=Depends(get_database)):
+async def reset_user_tags(user_id: str, user_service: UserService = Depends(get_user_service)):
     """🔥 重置用户标签到注册时的原始配置"""
     logger.info(f"🔄 重置用户标签 - user_id: {user_id}")
     
     try:
-        user_service = UserService(db)
-        
         logger.info(f"🔍 获取用户注册信息并重置标签...")
         reset_tags = await user_service.reset_user_tags_to_registration(user_id)
         
@@ -398,43 +396,39 @@ async def get_user_recommendations(
     page_size: int = Query(10, ge=1, le=100),
     tag_filters: Optional[str] = Query(None, description="逗号分隔的标签列表"),
     content_type: Optional[str] = Query(None, description="内容类型筛选"),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """获取用户个性化推荐内容"""
-    print(f"🔍 推荐API调用开始: user_id={user_id}, page={page}, page_size={page_size}")
+    logger.debug("🔍 推荐API调用开始: user_id=%s, page=%s, page_size=%s", user_id, page, page_size)
     
     try:
-        # 1. 创建推荐服务实例
-        print("📊 创建推荐服务实例...")
-        recommendation_service = RecommendationService(db)
-        
-        # 2. 计算分页参数
+        # 1. 计算分页参数
         skip = (page - 1) * page_size
-        print(f"📄 分页参数: skip={skip}, limit={page_size}")
+        logger.debug("📄 分页参数: skip=%s, limit=%s", skip, page_size)
         
-        # 3. 获取推荐内容
-        print("🎯 获取推荐内容...")
+        # 2. 获取推荐内容
+        logger.debug("🎯 获取推荐内容...")
         try:
             recommendations = await recommendation_service.get_user_recommendations(
                 user_id=user_id,
                 skip=skip,
                 limit=page_size
             )
-            print(f"✅ 成功获取 {len(recommendations)} 条推荐内容")
+            logger.debug("✅ 成功获取 %s 条推荐内容", len(recommendations))
         except Exception as rec_error:
-            print(f"❌ 推荐服务失败: {str(rec_error)}")
+            logger.error("❌ 推荐服务失败: %s", str(rec_error))
             # 如果推荐服务失败，返回默认内容
-            content_service = ContentService(db)
             recommendations = await content_service.get_content_list(
                 skip=skip,
                 limit=page_size,
                 sort_by="latest"
             )
-            print(f"🔄 使用默认内容: {len(recommendations)} 条")
+            logger.debug("🔄 使用默认内容: %s 条", len(recommendations))
         
-        # 4. 应用筛选条件
+        # 3. 应用筛选条件
         if tag_filters:
-            print(f"🏷️ 应用标签筛选: {tag_filters}")
+            logger.debug("🏷️ 应用标签筛选: %s", tag_filters)
             filter_tags = [tag.strip() for tag in tag_filters.split(',')]
             filtered_recommendations = []
             
@@ -453,26 +447,26 @@ async def get_user_recommendations(
                     if any(tag in filter_tags for tag in content_tags):
                         filtered_recommendations.append(content)
                 except Exception as filter_error:
-                    print(f"⚠️ 标签筛选错误: {str(filter_error)}")
+                    logger.warning("⚠️ 标签筛选错误: %s", str(filter_error))
                     # 筛选失败时保留原内容
                     filtered_recommendations.append(content)
             
             recommendations = filtered_recommendations
-            print(f"🔍 筛选后内容数量: {len(recommendations)}")
+            logger.debug("🔍 筛选后内容数量: %s", len(recommendations))
 
         if content_type:
-            print(f"📋 应用内容类型筛选: {content_type}")
+            logger.debug("📋 应用内容类型筛选: %s", content_type)
             recommendations = [
                 content for content in recommendations
                 if getattr(content, 'content_type', None) == content_type
             ]
-            print(f"📑 筛选后内容数量: {len(recommendations)}")
+            logger.debug("📑 筛选后内容数量: %s", len(recommendations))
         
-        # 5. 构建响应
+        # 4. 构建响应
         total = max(len(recommendations), 50)  # 简化总数计算
         has_next = len(recommendations) == page_size
         
-        print(f"📊 返回推荐结果: {len(recommendations)} 条")
+        logger.debug("📊 返回推荐结果: %s 条", len(recommendations))
         return ContentListResponse(
             items=recommendations,
             total=total,
@@ -482,9 +476,9 @@ async def get_user_recommendations(
         )
         
     except Exception as e:
-        print(f"❌ 推荐API错误: {str(e)}")
+        logger.error("❌ 推荐API错误: %s", str(e))
         import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         # 返回空结果而不是抛出异常
         return ContentListResponse(
             items=[],
@@ -499,15 +493,12 @@ async def get_user_tiered_recommendations(
     user_id: str,
     primary_limit: int = Query(6, ge=1, le=20, description="精准推荐数量"),
     secondary_limit: int = Query(4, ge=1, le=20, description="扩展推荐数量"),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取用户分级推荐内容：精准推荐 + 扩展推荐"""
-    print(f"🎯 分级推荐API调用: user_id={user_id}, primary={primary_limit}, secondary={secondary_limit}")
+    logger.debug("🎯 分级推荐API调用: user_id=%s, primary=%s, secondary=%s", user_id, primary_limit, secondary_limit)
     
     try:
-        # 创建推荐服务实例
-        recommendation_service = RecommendationService(db)
-        
         # 获取分级推荐内容
         tiered_result = await recommendation_service.get_tiered_recommendations(
             user_id=user_id,
@@ -515,7 +506,7 @@ async def get_user_tiered_recommendations(
             secondary_limit=secondary_limit
         )
         
-        print(f"✅ 分级推荐成功: 精准{tiered_result['total_primary']}篇，扩展{tiered_result['total_secondary']}篇")
+        logger.debug("✅ 分级推荐成功: 精准%s篇，扩展%s篇", tiered_result['total_primary'], tiered_result['total_secondary'])
         
         return {
             "status": "success",
@@ -570,9 +561,9 @@ async def get_user_tiered_recommendations(
         }
         
     except Exception as e:
-        print(f"❌ 分级推荐API错误: {str(e)}")
+        logger.error("❌ 分级推荐API错误: %s", str(e))
         import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         return {
             "status": "error",
             "message": f"获取分级推荐失败: {str(e)}",
@@ -592,12 +583,10 @@ async def get_user_tiered_recommendations(
 async def record_user_behavior(
     behavior: UserBehaviorRequest,
     user_id: str = Query(..., description="用户ID"),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """记录用户行为"""
     try:
-        recommendation_service = RecommendationService(db)
-        
         await recommendation_service.record_user_behavior(
             user_id=user_id,
             action=behavior.action,
@@ -616,11 +605,10 @@ async def record_user_behavior(
 @router.get("/{user_id}/insights", response_model=UserInsightsResponse)
 async def get_user_insights(
     user_id: str,
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取用户行为洞察"""
     try:
-        recommendation_service = RecommendationService(db)
         insights = await recommendation_service.get_user_behavior_insights(user_id)
         
         return UserInsightsResponse(**insights)
@@ -636,11 +624,10 @@ async def get_similar_content(
     user_id: str,
     content_id: str,
     limit: int = Query(5, ge=1, le=20),
-    db=Depends(get_database)
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """获取相似内容推荐"""
     try:
-        recommendation_service = RecommendationService(db)
         similar_content = await recommendation_service.get_similar_content(
             content_id=content_id,
             limit=limit
@@ -659,10 +646,9 @@ async def get_similar_content(
         )
 
 @router.get("/demo-users", response_model=DemoUsersResponse)
-async def get_demo_users(db=Depends(get_database)):
+async def get_demo_users(user_service: UserService = Depends(get_user_service)):
     """获取演示用户列表（用于前端用户切换功能）"""
     try:
-        user_service = UserService(db)
         demo_users = await user_service.get_demo_users()
         
         return DemoUsersResponse(
@@ -678,11 +664,10 @@ async def get_demo_users(db=Depends(get_database)):
 @router.get("/demo-users/{demo_user_id}/tags", response_model=UserTagsResponse)
 async def get_demo_user_tags(
     demo_user_id: str,
-    db=Depends(get_database)
+    user_service: UserService = Depends(get_user_service)
 ):
     """根据演示用户ID获取用户标签"""
     try:
-        user_service = UserService(db)
         user_tags = await user_service.get_demo_user_tags(demo_user_id)
         
         if not user_tags:
@@ -703,17 +688,21 @@ async def get_demo_user_tags(
             detail=f"Failed to get demo user tags: {str(e)}"
         )
 
+@static_payload("users.provinces_with_cities")
+def build_provinces_with_cities() -> Dict[str, Any]:
+    provinces_data = RegionMapper.get_provinces_with_cities()
+    
+    return {
+        "provinces": provinces_data,
+        "total_provinces": len(provinces_data),
+        "total_cities": sum(p["city_count"] for p in provinces_data)
+    }
+
 @router.get("/provinces-with-cities")
-async def get_provinces_with_cities():
+async def get_provinces_with_cities(request: Request):
     """获取省份及其城市的结构化数据"""
     try:
-        provinces_data = RegionMapper.get_provinces_with_cities()
-        
-        return {
-            "provinces": provinces_data,
-            "total_provinces": len(provinces_data),
-            "total_cities": sum(p["city_count"] for p in provinces_data)
-        }
+        return static_response(request, "users.provinces_with_cities")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -727,36 +716,36 @@ async def debug_imports():
         result = {}
         
         # 测试各个导入
-        print("🔍 测试导入...")
+        logger.debug("🔍 测试导入...")
         
         # 1. 测试EnergyWeightSystem
         try:
             from app.utils.energy_weight_system import EnergyWeightSystem
             products = EnergyWeightSystem.get_all_energy_products()
             result["energy_system"] = f"成功: {len(products)}个产品"
-            print(f"✅ EnergyWeightSystem: {len(products)}个产品")
+            logger.debug("✅ EnergyWeightSystem: %s个产品", len(products))
         except Exception as e:
             result["energy_system"] = f"失败: {str(e)}"
-            print(f"❌ EnergyWeightSystem: {str(e)}")
+            logger.error("❌ EnergyWeightSystem: %s", str(e))
         
         # 2. 测试RegionMapper
         try:
             from app.utils.region_mapper import RegionMapper
             provinces = RegionMapper.get_provinces_with_cities()
             result["region_mapper"] = f"成功: {len(provinces)}个省份"
-            print(f"✅ RegionMapper: {len(provinces)}个省份")
+            logger.debug("✅ RegionMapper: %s个省份", len(provinces))
         except Exception as e:
             result["region_mapper"] = f"失败: {str(e)}"
-            print(f"❌ RegionMapper: {str(e)}")
+            logger.error("❌ RegionMapper: %s", str(e))
         
         # 3. 测试ContentService
         try:
             # 直接引用已导入的ContentService
-            print(f"✅ ContentService类: {ContentService}")
+            logger.debug("✅ ContentService类: %s", ContentService)
             result["content_service"] = f"成功: {ContentService.__name__}"
         except Exception as e:
             result["content_service"] = f"失败: {str(e)}"
-            print(f"❌ ContentService: {str(e)}")
+            logger.error("❌ ContentService: %s", str(e))
         
         # 4. 测试所有导入的变量是否存在
         imports_status = {}
@@ -791,117 +780,123 @@ async def debug_imports():
             "traceback": traceback.format_exc()
         }
 
+@static_payload("users.tag_options")
+def build_tag_options() -> Dict[str, Any]:
+    # 🔥 简化版本，只返回基本的能源类型标签
+    logger.debug("📍 开始获取标签选项...")
+    
+    # 直接从能源权重系统获取能源类型标签
+    logger.debug("📍 获取能源产品...")
+    all_energy_products = EnergyWeightSystem.get_all_energy_products()
+    energy_type_tags = [product["name"] for product in all_energy_products]
+    logger.debug("📍 获取到 %s 个能源产品", len(energy_type_tags))
+    
+    # 获取其他预设标签选项
+    logger.debug("📍 设置基础标签...")
+    basic_info_tags = ["政策法规", "行业资讯", "交易公告", "调价公告", "研报分析"]
+    business_field_tags = [
+        "市场动态", "价格变化", "交易信息", "科技创新", 
+        "政策解读", "国际合作", "投资支持", "民营经济发展", 
+        "市场准入优化", "公平竞争"
+    ]
+    beneficiary_tags = [
+        "能源企业", "政府机构", "交易方", "民营企业", 
+        "国有企业", "外资企业", "LNG交易方"
+    ]
+    policy_measure_tags = [
+        "市场监管", "技术合作", "竞价规则", "投资支持", 
+        "市场准入", "创新投融资", "风险管控", "市场准入措施", 
+        "价格调整", "区域价格调整"
+    ]
+    importance_tags = [
+        "国家级", "权威发布", "重要政策", "行业影响", 
+        "常规公告", "国际影响"
+    ]
+    
+    logger.debug("📍 获取地区数据...")
+    # 获取地区标签数据
+    provinces_data = RegionMapper.get_provinces_with_cities()
+    all_cities = []
+    all_provinces = []
+    
+    for province_info in provinces_data:
+        all_provinces.append(province_info["name"])
+        all_cities.extend(province_info["cities"])
+    
+    all_regions = [region["name"] for region in RegionMapper.get_all_regions()]
+    
+    cities_by_region = {}
+    for region in RegionMapper.get_all_regions():
+        cities_by_region[region["name"]] = RegionMapper.get_cities_by_region(region["code"])
+    
+    region_tags = {
+        "cities": sorted(list(set(all_cities))),
+        "provinces": sorted(list(set(all_provinces))),
+        "regions": sorted(all_regions),
+        "cities_by_region": cities_by_region,
+        "total_cities": len(set(all_cities)),
+        "total_provinces": len(set(all_provinces)),
+        "total_regions": len(all_regions)
+    }
+    
+    # 内容类型映射
+    content_type_map = {
+        "policy": "政策法规",
+        "news": "行业资讯", 
+        "price": "调价公告",
+        "announcement": "交易公告",
+        "report": "研报分析"
+    }
+    
+    logger.debug("📍 构造响应数据...")
+    result = {
+        "energy_type_tags": energy_type_tags,
+        "basic_info_tags": basic_info_tags,
+        "business_field_tags": business_field_tags,
+        "beneficiary_tags": beneficiary_tags,
+        "policy_measure_tags": policy_measure_tags,
+        "importance_tags": importance_tags,
+        "region_tags": region_tags,
+        "content_type_map": content_type_map
+    }
+    
+    logger.debug("📍 构建完成，包含 %s 个能源标签", len(energy_type_tags))
+    return result
+
 @router.get("/tag-options")
-async def get_tag_options(
-    database = Depends(get_database)
-):
+async def get_tag_options(request: Request):
     """获取所有标签选项配置"""
     try:
-        # 🔥 简化版本，只返回基本的能源类型标签
-        print("📍 开始获取标签选项...")
-        
-        # 直接从能源权重系统获取能源类型标签
-        print("📍 获取能源产品...")
-        all_energy_products = EnergyWeightSystem.get_all_energy_products()
-        energy_type_tags = [product["name"] for product in all_energy_products]
-        print(f"📍 获取到 {len(energy_type_tags)} 个能源产品")
-        
-        # 获取其他预设标签选项
-        print("📍 设置基础标签...")
-        basic_info_tags = ["政策法规", "行业资讯", "交易公告", "调价公告", "研报分析"]
-        business_field_tags = [
-            "市场动态", "价格变化", "交易信息", "科技创新", 
-            "政策解读", "国际合作", "投资支持", "民营经济发展", 
-            "市场准入优化", "公平竞争"
-        ]
-        beneficiary_tags = [
-            "能源企业", "政府机构", "交易方", "民营企业", 
-            "国有企业", "外资企业", "LNG交易方"
-        ]
-        policy_measure_tags = [
-            "市场监管", "技术合作", "竞价规则", "投资支持", 
-            "市场准入", "创新投融资", "风险管控", "市场准入措施", 
-            "价格调整", "区域价格调整"
-        ]
-        importance_tags = [
-            "国家级", "权威发布", "重要政策", "行业影响", 
-            "常规公告", "国际影响"
-        ]
-        
-        print("📍 获取地区数据...")
-        # 获取地区标签数据
-        provinces_data = RegionMapper.get_provinces_with_cities()
-        all_cities = []
-        all_provinces = []
-        
-        for province_info in provinces_data:
-            all_provinces.append(province_info["name"])
-            all_cities.extend(province_info["cities"])
-        
-        all_regions = [region["name"] for region in RegionMapper.get_all_regions()]
-        
-        cities_by_region = {}
-        for region in RegionMapper.get_all_regions():
-            cities_by_region[region["name"]] = RegionMapper.get_cities_by_region(region["code"])
-        
-        region_tags = {
-            "cities": sorted(list(set(all_cities))),
-            "provinces": sorted(list(set(all_provinces))),
-            "regions": sorted(all_regions),
-            "cities_by_region": cities_by_region,
-            "total_cities": len(set(all_cities)),
-            "total_provinces": len(set(all_provinces)),
-            "total_regions": len(all_regions)
-        }
-        
-        # 内容类型映射
-        content_type_map = {
-            "policy": "政策法规",
-            "news": "行业资讯", 
-            "price": "调价公告",
-            "announcement": "交易公告",
-            "report": "研报分析"
-        }
-        
-        print("📍 构造响应数据...")
-        result = {
-            "energy_type_tags": energy_type_tags,
-            "basic_info_tags": basic_info_tags,
-            "business_field_tags": business_field_tags,
-            "beneficiary_tags": beneficiary_tags,
-            "policy_measure_tags": policy_measure_tags,
-            "importance_tags": importance_tags,
-            "region_tags": region_tags,
-            "content_type_map": content_type_map
-        }
-        
-        print(f"📍 返回成功，包含 {len(energy_type_tags)} 个能源标签")
-        return result
+        return static_response(request, "users.tag_options")
         
     except Exception as e:
-        print(f"❌ 标签选项获取错误: {str(e)}")
+        logger.error("❌ 标签选项获取错误: %s", str(e))
         import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get tag options: {str(e)}"
         )
 
+@static_payload("users.energy_hierarchy")
+def build_energy_hierarchy() -> Dict[str, Any]:
+    hierarchy = EnergyWeightSystem.get_energy_hierarchy_tree()
+    all_products = EnergyWeightSystem.get_all_energy_products()
+    categories = EnergyWeightSystem.get_all_categories()
+    
+    return {
+        "hierarchy": hierarchy,
+        "all_products": all_products,
+        "categories": categories,
+        "total_categories": len(categories),
+        "total_products": len(all_products)
+    }
+
 @router.get("/energy-hierarchy")
-async def get_energy_hierarchy():
+async def get_energy_hierarchy(request: Request):
     """获取能源产品层级结构"""
     try:
-        hierarchy = EnergyWeightSystem.get_energy_hierarchy_tree()
-        all_products = EnergyWeightSystem.get_all_energy_products()
-        categories = EnergyWeightSystem.get_all_categories()
-        
-        return {
-            "hierarchy": hierarchy,
-            "all_products": all_products,
-            "categories": categories,
-            "total_categories": len(categories),
-            "total_products": len(all_products)
-        }
+        return static_response(request, "users.energy_hierarchy")
         
     except Exception as e:
         raise HTTPException(
@@ -954,75 +949,97 @@ async def validate_energy_selection(request: EnergySelectionRequest):
             detail=f"Failed to validate energy selection: {str(e)}"
         )
 
+def _create_explainer(pipeline: str, explain: bool) -> Optional[RecommendationExplainer]:
+    """请求 explain=true 或被追踪采样时收集推荐解释"""
+    if explain or is_trace_enabled():
+        return RecommendationExplainer(pipeline)
+    return None
+
+def _finish_explain(
+    explainer: Optional[RecommendationExplainer],
+    recommendations: List[Content],
+    explain: bool
+) -> Optional[Dict[str, Any]]:
+    """输出采样请求的推荐摘要（阶段耗时 + 候选集规模），按需返回完整解释"""
+    if explainer is None:
+        return None
+    
+    explanation = explainer.to_dict(recommendations)
+    logger.debug(
+        "📊 推荐解释摘要: pipeline=%s, stage_timings_ms=%s, candidate_counts=%s, selected_counts=%s",
+        explanation["pipeline"], explanation["stage_timings_ms"], explanation["candidate_counts"], explanation["selected_counts"]
+    )
+    return explanation if explain else None
+
 @router.get("/{user_id}/smart-recommendations", response_model=ContentListResponse)
 async def get_user_smart_recommendations(
     user_id: str,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db=Depends(get_database)
+    explain: bool = Query(False, description="返回推荐解释：来源层级、标签贡献、奖励、时间因子与阶段耗时"),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """🔥 智能推荐API：精准权重匹配优先 + 时间排序"""
-    print(f"🧠 智能推荐API调用: user_id={user_id}, page={page}, page_size={page_size}")
+    logger.debug("🧠 智能推荐API调用: user_id=%s, page=%s, page_size=%s", user_id, page, page_size)
     
     try:
-        # 创建推荐服务实例
-        recommendation_service = RecommendationService(db)
-        
         # 计算分页参数
         skip = (page - 1) * page_size
-        print(f"📄 分页参数: skip={skip}, limit={page_size}")
+        logger.debug("📄 分页参数: skip=%s, limit=%s", skip, page_size)
         
         # 🔥 使用新的智能推荐算法
-        print("🎯 调用智能推荐算法...")
+        logger.debug("🎯 调用智能推荐算法...")
+        explainer = _create_explainer("smart", explain)
         recommendations = await recommendation_service.get_smart_recommendations(
             user_id=user_id,
             skip=skip,
-            limit=page_size
+            limit=page_size,
+            explainer=explainer
         )
         
-        print(f"✅ 智能推荐成功返回 {len(recommendations)} 条内容")
+        logger.debug("✅ 智能推荐成功返回 %s 条内容", len(recommendations))
         
         # 🔥 API层面的最终去重保障
         unique_recommendations = []
         seen_ids = set()
         
-        print(f"🔍 API层去重检查: 输入 {len(recommendations)} 条推荐")
+        logger.debug("🔍 API层去重检查: 输入 %s 条推荐", len(recommendations))
         
         for i, content in enumerate(recommendations):
             content_id = content.id
-            print(f"   检查第{i+1}条: ID={content_id}, Title={content.title[:30]}...")
+            logger.debug("   检查第%s条: ID=%s, Title=%s...", i + 1, content_id, content.title[:30])
             
             if content_id not in seen_ids:
                 unique_recommendations.append(content)
                 seen_ids.add(content_id)
-                print(f"   ✅ 添加到唯一列表 (当前{len(unique_recommendations)}条)")
+                logger.debug("   ✅ 添加到唯一列表 (当前%s条)", len(unique_recommendations))
             else:
-                print(f"   ⚠️ API层去重：跳过重复内容 {content.title[:30]}... (ID: {content_id})")
+                logger.debug("   ⚠️ API层去重：跳过重复内容 %s... (ID: %s)", content.title[:30], content_id)
         
         final_recommendations = unique_recommendations
-        print(f"🎯 API层去重完成: {len(recommendations)} → {len(final_recommendations)}条唯一内容")
+        logger.debug("🎯 API层去重完成: %s → %s条唯一内容", len(recommendations), len(final_recommendations))
         
         # 构建响应
         total = max(len(final_recommendations), 50)  # 简化总数计算
         has_next = len(final_recommendations) == page_size
         
-        print(f"📊 智能推荐API完成: {len(final_recommendations)} 条内容")
+        logger.debug("📊 智能推荐API完成: %s 条内容", len(final_recommendations))
         return ContentListResponse(
             items=final_recommendations,
             total=total,
             page=page,
             page_size=page_size,
-            has_next=has_next
+            has_next=has_next,
+            explain=_finish_explain(explainer, final_recommendations, explain)
         )
         
     except Exception as e:
-        print(f"❌ 智能推荐API错误: {str(e)}")
+        logger.error("❌ 智能推荐API错误: %s", str(e))
         import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         
         # 回退到普通推荐
         try:
-            recommendation_service = RecommendationService(db)
             skip = (page - 1) * page_size
             recommendations = await recommendation_service.get_user_recommendations(
                 user_id=user_id,
@@ -1052,17 +1069,19 @@ async def get_user_recommendations_by_type(
     content_type: str,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db=Depends(get_database)
+    explain: bool = Query(False, description="返回推荐解释：来源层级、标签贡献、奖励、时间因子与阶段耗时"),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """🎯 按内容类型获取智能推荐：行情/政策/公告独立推荐逻辑"""
-    print(f"🎯 按类型推荐API: user_id={user_id}, type={content_type}")
+    logger.debug("🎯 按类型推荐API: user_id=%s, type=%s", user_id, content_type)
     
     try:
-        # 创建推荐服务实例
-        recommendation_service = RecommendationService(db)
-        
         # 计算分页参数
         skip = (page - 1) * page_size
+        explainer = _create_explainer(
+            "by_type" if content_type in ("market", "policy", "announcement") else "smart",
+            explain
+        )
         
         # 🔥 根据内容类型调用对应的智能推荐逻辑
         if content_type == "market":
@@ -1072,7 +1091,8 @@ async def get_user_recommendations_by_type(
                 content_types=["news"],
                 basic_info_tags=["行业资讯"],
                 skip=skip,
-                limit=page_size
+                limit=page_size,
+                explainer=explainer
             )
         elif content_type == "policy":
             # 政策推荐：政策法规类内容
@@ -1081,7 +1101,8 @@ async def get_user_recommendations_by_type(
                 content_types=["policy"],
                 basic_info_tags=["政策法规"],
                 skip=skip,
-                limit=page_size
+                limit=page_size,
+                explainer=explainer
             )
         elif content_type == "announcement":
             # 公告推荐：交易公告+调价公告
@@ -1090,37 +1111,39 @@ async def get_user_recommendations_by_type(
                 content_types=["announcement", "price"],
                 basic_info_tags=["交易公告", "调价公告"],
                 skip=skip,
-                limit=page_size
+                limit=page_size,
+                explainer=explainer
             )
         else:
             # 全部推荐：使用智能推荐
             recommendations = await recommendation_service.get_smart_recommendations(
                 user_id=user_id,
                 skip=skip,
-                limit=page_size
+                limit=page_size,
+                explainer=explainer
             )
         
-        print(f"✅ 按类型推荐成功: {content_type} - {len(recommendations)}条")
+        logger.debug("✅ 按类型推荐成功: %s - %s条", content_type, len(recommendations))
         
         # 🔥 API层面的最终去重保障
         unique_recommendations = []
         seen_ids = set()
         
-        print(f"🔍 API层去重检查: 输入 {len(recommendations)} 条推荐")
+        logger.debug("🔍 API层去重检查: 输入 %s 条推荐", len(recommendations))
         
         for i, content in enumerate(recommendations):
             content_id = content.id
-            print(f"   检查第{i+1}条: ID={content_id}, Title={content.title[:30]}...")
+            logger.debug("   检查第%s条: ID=%s, Title=%s...", i + 1, content_id, content.title[:30])
             
             if content_id not in seen_ids:
                 unique_recommendations.append(content)
                 seen_ids.add(content_id)
-                print(f"   ✅ 添加到唯一列表 (当前{len(unique_recommendations)}条)")
+                logger.debug("   ✅ 添加到唯一列表 (当前%s条)", len(unique_recommendations))
             else:
-                print(f"   ⚠️ API层去重：跳过重复内容 {content.title[:30]}... (ID: {content_id})")
+                logger.debug("   ⚠️ API层去重：跳过重复内容 %s... (ID: %s)", content.title[:30], content_id)
         
         final_recommendations = unique_recommendations
-        print(f"🎯 API层去重完成: {len(recommendations)} → {len(final_recommendations)}条唯一内容")
+        logger.debug("🎯 API层去重完成: %s → %s条唯一内容", len(recommendations), len(final_recommendations))
         
         # 构建响应
         total = max(len(final_recommendations), 50)
@@ -1131,13 +1154,14 @@ async def get_user_recommendations_by_type(
             total=total,
             page=page,
             page_size=page_size,
-            has_next=has_next
+            has_next=has_next,
+            explain=_finish_explain(explainer, final_recommendations, explain)
         )
         
     except Exception as e:
-        print(f"❌ 按类型推荐API错误: {str(e)}")
+        logger.error("❌ 按类型推荐API错误: %s", str(e))
         import traceback
-        print(f"错误堆栈: {traceback.format_exc()}")
+        logger.error("错误堆栈: %s", traceback.format_exc())
         
         # 回退到空结果
         return ContentListResponse(
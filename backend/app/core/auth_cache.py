@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+class AuthUserCache:
+    """
+    认证用户进程内缓存（短TTL）
+
+    以令牌主体（如 user:<id>、demo:<id>、admin:<id>）为键，避免每个认证请求都查询数据库。
+    每个主体维护一个版本号：角色或启用状态变更时递增版本，旧版本条目立即失效，
+    变更前已发起的加载也无法把旧数据写回缓存。
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # subject -> (过期时间, 版本号, 用户ID, 缓存值)
+        self._entries: Dict[str, Tuple[float, int, str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def version(self, subject: str) -> int:
+        """获取主体当前版本号（加载前读取，写入时校验）"""
+        return self._versions.get(subject, 0)
+
+    def get(self, subject: str) -> Optional[Any]:
+        """读取未过期且版本一致的缓存值"""
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+
+        expires_at, version, _, value = entry
+        if expires_at < time.monotonic() or version != self.version(subject):
+            self._entries.pop(subject, None)
+            return None
+        return value
+
+    def set(self, subject: str, user_id: str, value: Any, version: int):
+        """写入缓存；加载期间版本已变化则丢弃"""
+        if self.ttl_seconds <= 0 or version != self.version(subject):
+            return
+
+        if subject not in self._entries and len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, version, user_id, value)
+
+    def invalidate_user(self, user_id: str):
+        """用户角色或启用状态变更后，使该用户的所有主体失效"""
+        subjects = {subject for subject, entry in self._entries.items() if entry[2] == user_id}
+        subjects.update(f"{prefix}:{user_id}" for prefix in ("user", "admin"))
+        for subject in subjects:
+            self._versions[subject] = self.version(subject) + 1
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self._versions.clear()
+
+    def _evict(self):
+        """先清理过期条目，仍然已满时淘汰最早写入的条目"""
+        now = time.monotonic()
+        for subject in [subject for subject, entry in self._entries.items() if entry[0] < now]:
+            del self._entries[subject]
+
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+auth_user_cache = AuthUserCache(
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES
+)
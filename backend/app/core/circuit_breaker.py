@@ -0,0 +1,139 @@
+"""
+外部依赖熔断器
+
+AI 后端 / Dify 不可用时每个请求都要等到超时（AI_API_TIMEOUT / 60 秒），占住 worker 的并发。
+连续失败 failure_threshold 次后熔断（open），reset_timeout_seconds 内直接抛出 CircuitOpenError；
+之后放行一个试探请求（half_open），只有该试探成功才恢复（closed），失败则重新计时。
+熔断前已放行、熔断后才结束的慢请求不影响熔断状态。
+
+用法:
+    async with get_circuit_breaker("ai_backend").call():
+        response = await client.post(...)
+        response.raise_for_status()
+
+4xx 响应（请求本身有误）不计为失败；被取消（CancelledError 等非 Exception）的调用既不算成功也不算失败。
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """熔断期间的调用被直接拒绝"""
+
+def is_backend_failure(exc: BaseException) -> bool:
+    """带 HTTP 响应的异常只有 5xx 计为后端故障"""
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code is None or status_code >= 500
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30,
+        is_failure: Callable[[BaseException], bool] = is_backend_failure
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.is_failure = is_failure
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def call(self) -> "CircuitCall":
+        """单次受保护调用（async with），记录本次调用是否为半开试探"""
+        return CircuitCall(self)
+
+    def admit(self) -> bool:
+        """放行则返回是否为半开试探，熔断中抛出 CircuitOpenError"""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._trial_in_flight):
+            raise CircuitOpenError(f"{self.name} circuit is open: {self.last_error}")
+        if state == HALF_OPEN:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self, trial: bool = False):
+        if trial:
+            logger.info(f"✅ {self.name} 熔断恢复")
+            self.consecutive_failures = 0
+            self.opened_at = None
+        elif self.opened_at is None:
+            self.consecutive_failures = 0
+
+    def record_failure(self, exc: BaseException, trial: bool = False):
+        self.consecutive_failures += 1
+        self.last_error = str(exc) or type(exc).__name__
+        if trial:
+            # 半开试探失败时重新计时
+            self.opened_at = time.monotonic()
+        elif self.opened_at is None and self.consecutive_failures >= self.failure_threshold:
+            logger.warning(f"⚠️ {self.name} 连续失败 {self.consecutive_failures} 次，熔断 {self.reset_timeout_seconds}s: {self.last_error}")
+            self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        snapshot: Dict[str, Any] = {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+        if state == OPEN:
+            snapshot["retry_in_seconds"] = round(self.reset_timeout_seconds - (time.monotonic() - self.opened_at), 1)
+        return snapshot
+
+class CircuitCall:
+    """CircuitBreaker.call() 返回的单次调用上下文"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.trial = False
+
+    async def __aenter__(self):
+        self.trial = self.breaker.admit()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.trial:
+            self.breaker.release_trial()
+        if exc is not None and not isinstance(exc, Exception):
+            return False
+        if exc is not None and self.breaker.is_failure(exc):
+            self.breaker.record_failure(exc, trial=self.trial)
+        else:
+            self.breaker.record_success(trial=self.trial)
+        return False
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """按名称获取（首次调用时创建）熔断器，阈值取自 AI_CIRCUIT_* 配置"""
+    breaker = circuit_breakers.get(name)
+    if breaker is None:
+        breaker = circuit_breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout_seconds=settings.AI_CIRCUIT_RESET_SECONDS
+        )
+    return breaker
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # 项目信息
@@ -11,15 +11,88 @@ class Settings(BaseSettings):
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "energy_info"
     
+    # MongoDB 连接池与超时配置（毫秒）
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 10
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # 连接池耗尽时等待连接的上限，超时立即失败
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 30000
+    MONGODB_COMPRESSORS: str = ""  # 如 "zstd,snappy,zlib"（zstd / snappy 需安装 zstandard / python-snappy）
+    MONGODB_RETRY_READS: bool = True
+    MONGODB_READ_PREFERENCE: str = "primary"
+    MONGODB_RECOMMENDATION_READ_PREFERENCE: str = "primary"  # 推荐等只读路径，副本集可设为 secondaryPreferred
+    
+    # 单次操作服务端超时（maxTimeMS，0为不限制）
+    MONGODB_QUERY_MAX_TIME_MS: int = 5000
+    MONGODB_RECOMMENDATION_MAX_TIME_MS: int = 3000
+    
     # AI集成配置
     AI_BACKEND_URL: str = "https://ai.wiseocean.cn"
     AI_API_TIMEOUT: int = 30
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5  # 连续失败多少次后熔断
+    AI_CIRCUIT_RESET_SECONDS: float = 30  # 熔断多久后放行试探请求
     
     # 安全配置
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 密码哈希配置（调整轮数后旧密码在登录时自动重算）
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    LOGIN_CONCURRENCY_LIMIT: int = 8
+    
+    # 认证用户缓存配置（TTL为0时关闭缓存）
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
+    
+    # 热门文章缓存配置（TTL为0时关闭缓存）
+    CONTENT_CACHE_MAX_ENTRIES: int = 2000
+    CONTENT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CONTENT_CACHE_TTL_SECONDS: float = 300
+    
+    # 缓存失效总线（auto：优先 change stream，单机 mongod 自动改为轮询；off：关闭）
+    INVALIDATION_BUS_MODE: str = "auto"  # auto / change_stream / poll / off
+    INVALIDATION_POLL_INTERVAL_SECONDS: float = 5
+    INVALIDATION_POLL_BATCH_SIZE: int = 1000
+    INVALIDATION_RETRY_SECONDS: float = 5
+    
+    # 跨 worker 共享状态（为空时使用进程内实现，如 redis://127.0.0.1:6379/0）
+    SHARED_STATE_URL: str = ""
+    SHARED_STATE_POOL_SIZE: int = 8
+    SHARED_STATE_KEY_PREFIX: str = "energy_info:"
+    CONTENT_STATS_TTL_SECONDS: float = 60  # 内容统计在共享状态中的缓存时间
+    CONTENT_TAGS_TTL_SECONDS: float = 300  # 全部标签列表在共享状态中的缓存时间
+    
+    # 启动预热（预热完成前 /health 返回 503，负载均衡不会转发流量）
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 60  # 超时后未完成的步骤取消，服务照常就绪
+    WARMUP_BEHAVIOR_DAYS: int = 7  # 统计最近多少天的用户行为
+    WARMUP_ACTIVE_USERS: int = 20  # 预计算推荐的活跃用户数
+    WARMUP_HOT_CONTENT: int = 500  # 预加载到热门文章缓存的文章数
+    WARMUP_CONCURRENCY: int = 4
+    # 预热期间 /health 是否返回 503；gunicorn 回收重启的 worker 由 gunicorn.conf.py 置为 False
+    WARMUP_GATE_HEALTH: bool = True
+    
+    # 就绪 / 存活探针（/health/ready、/health/live）
+    HEALTH_MONGO_TIMEOUT_SECONDS: float = 2
+    HEALTH_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    HEALTH_MAX_LOOP_LAG_MS: float = 500  # 最近窗口内事件循环最大延迟超过该值时不就绪
+    HEALTH_LIVENESS_STALL_SECONDS: float = 10  # 延迟监控超过该时间未运行视为事件循环卡死
+    
+    # 日志配置
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json / text
+    LOG_LEVELS: Dict[str, str] = {}  # 按模块覆盖级别，如 {"app.services.recommendation_service": "DEBUG"}
+    LOG_TRACE_SAMPLE_RATE: float = 0.01  # 输出完整推荐追踪的请求比例
+    LOG_TRACE_HEADER: str = "X-Debug-Trace"  # 请求头为 1/true 时强制输出追踪
+    
+    # 响应压缩配置（字节）
+    GZIP_MINIMUM_SIZE: int = 1024
+    STATIC_PAYLOAD_MAX_AGE: int = 3600  # 静态参考数据（城市/标签选项等）的浏览器缓存时间（秒）
+    
     # CORS配置 - 同时支持localhost和公网IP
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
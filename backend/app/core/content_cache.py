@@ -0,0 +1,144 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from app.core.config import settings
+
+class HotContentCache:
+    """
+    热门文章进程内 LRU 缓存（键为 ObjectId，值为映射后的 Content）
+
+    - 条目数与估算内存双重上限，超出时淘汰最久未访问的条目；可选 TTL
+    - 读取返回浅拷贝，调用方修改 relevance_score 等字段不会污染缓存
+    - 文章被管理员修改/删除/导入覆盖时由 AdminService / 失效总线调用 invalidate；
+      按键记录失效时的代数，失效前已发起的该文章加载无法把旧数据写回缓存，
+      其他文章的加载不受影响（失效记录超出上限时最早的记录折算为整体下限）
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (过期时间, 估算字节数, Content)
+        self._entries: "OrderedDict[Any, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        # 早于该代数发起的加载一律丢弃（clear 或失效记录被裁剪时推进）
+        self._min_generation = 0
+        # key -> 最近一次失效时的代数
+        self._invalidated: "OrderedDict[Any, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def generation(self) -> int:
+        """加载前读取，写入时校验"""
+        return self._generation
+
+    def get(self, key) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, content = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return content.model_copy()
+
+    def get_many(self, keys: Iterable) -> Dict[Any, Any]:
+        """返回命中的 {key: Content}"""
+        found = {}
+        for key in keys:
+            content = self.get(key)
+            if content is not None:
+                found[key] = content
+        return found
+
+    def set(self, key, content, generation: int):
+        """写入缓存；加载期间发生过失效则丢弃"""
+        if not self.enabled or generation < self._min_generation:
+            return
+        if self._invalidated.get(key, -1) > generation:
+            return
+
+        size = _estimate_size(content)
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, content.model_copy())
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def bump_view_count(self, key, amount: int = 1):
+        """同步缓存中的浏览次数（浏览计数过于频繁，不做失效）"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[2].view_count += amount
+
+    def invalidate(self, key):
+        self._generation += 1
+        self.invalidations += 1
+        self._remove(key)
+        self._invalidated[key] = self._generation
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > max(self.max_entries, 1):
+            _, generation = self._invalidated.popitem(last=False)
+            self._min_generation = max(self._min_generation, generation)
+
+    def clear(self):
+        self._generation += 1
+        self._min_generation = self._generation
+        self._invalidated.clear()
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+def _estimate_size(content) -> int:
+    """估算 Content 占用内存（字符串与标签列表为主，加固定对象开销）"""
+    size = 1024
+    for value in content.__dict__.values():
+        if isinstance(value, str):
+            size += sys.getsizeof(value)
+        elif isinstance(value, list):
+            size += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value if isinstance(item, str))
+    return size
+
+hot_content_cache = HotContentCache(
+    max_entries=settings.CONTENT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CONTENT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.CONTENT_CACHE_TTL_SECONDS
+)
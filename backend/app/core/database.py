@@ -1,6 +1,13 @@
+from typing import Any, Dict
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
 from pymongo.database import Database
 from app.core.config import settings
+from app.core.metrics import MongoCommandListener, mongo_pool_listener
+from app.core.query_guard import query_guard_listener
+import logging
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
     client: AsyncIOMotorClient = None
@@ -8,28 +15,68 @@ class DatabaseManager:
 
 db_manager = DatabaseManager()
 
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+def get_read_preference(name: str):
+    """读偏好名称 -> pymongo ReadPreference"""
+    try:
+        return READ_PREFERENCES[name]
+    except KeyError:
+        raise Exception(f"Unknown read preference: {name}")
+
+def mongo_client_options() -> Dict[str, Any]:
+    """由配置生成 MongoDB 客户端参数"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+        "retryReads": settings.MONGODB_RETRY_READS,
+        "read_preference": get_read_preference(settings.MONGODB_READ_PREFERENCE),
+    }
+    compressors = [name.strip() for name in settings.MONGODB_COMPRESSORS.split(",") if name.strip()]
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+def max_time_options(max_time_ms: int) -> Dict[str, Any]:
+    """find_one / count_documents / aggregate 的 maxTimeMS 参数（0 表示不限制）"""
+    return {"maxTimeMS": max_time_ms} if max_time_ms > 0 else {}
+
 async def connect_to_mongo():
     """连接到MongoDB"""
     try:
         db_manager.client = AsyncIOMotorClient(
             settings.MONGODB_URL,
-            maxPoolSize=10,
-            minPoolSize=10,
+            event_listeners=[MongoCommandListener(), query_guard_listener, mongo_pool_listener],
+            **mongo_client_options()
         )
         db_manager.database = db_manager.client[settings.DATABASE_NAME]
         
         # 测试连接
         await db_manager.client.admin.command('ping')
-        print("Successfully connected to MongoDB")
+        logger.info(
+            "Successfully connected to MongoDB (pool %s-%s, read preference %s)",
+            settings.MONGODB_MIN_POOL_SIZE, settings.MONGODB_MAX_POOL_SIZE, settings.MONGODB_READ_PREFERENCE
+        )
     except Exception as e:
-        print(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise e
 
 async def close_mongo_connection():
     """关闭MongoDB连接"""
     if db_manager.client:
         db_manager.client.close()
-        print("MongoDB connection closed")
+        logger.info("MongoDB connection closed")
 
 def get_database():
     """获取数据库实例（同步版本）"""
@@ -0,0 +1,123 @@
+"""
+就绪 / 存活探针
+
+- /health/live：进程与事件循环是否还在工作（事件循环延迟监控任务仍在按时运行）
+- /health/ready：能否承接流量，任一关键检查失败返回 503，负载均衡据此摘除该 worker
+    mongo       ping 延迟（超时 HEALTH_MONGO_TIMEOUT_SECONDS 视为失败）
+    mongo_pool  连接池使用中 / 可用 / 排队数，池耗尽且有请求排队时失败
+    event_loop  事件循环延迟，超过 HEALTH_MAX_LOOP_LAG_MS 时失败
+    warmup      启动预热是否完成
+    ai_backends 各 AI 后端熔断器状态（非关键依赖，熔断只标记 degraded）
+
+连接池计数来自 metrics.MongoPoolListener（pymongo 连接池事件，在 database.py 注册）。
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.circuit_breaker import OPEN, circuit_breakers, get_circuit_breaker
+from app.core.metrics import mongo_pool_listener
+from app.core.warmup import warmup_state
+
+STARTED_AT = time.time()
+
+# 未调用过的后端也显示在就绪报告中
+AI_BACKENDS = ("ai_backend", "dify")
+
+class LoopLagMonitor:
+    """定时 sleep 并测量实际唤醒延迟，反映事件循环被阻塞的程度"""
+
+    def __init__(self, interval_seconds: float = 0.5, window: int = 20):
+        self.interval_seconds = interval_seconds
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.last_tick: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.last_tick = time.monotonic()
+            self.samples.append(max(0.0, self.last_tick - expected) * 1000)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = list(self.samples)
+        return {
+            "lag_ms": round(samples[-1], 1) if samples else None,
+            "max_lag_ms": round(max(samples), 1) if samples else None,
+            "seconds_since_tick": round(time.monotonic() - self.last_tick, 3) if self.last_tick else None,
+        }
+
+loop_lag_monitor = LoopLagMonitor(settings.HEALTH_LOOP_LAG_INTERVAL_SECONDS)
+
+async def check_mongo(client) -> Dict[str, Any]:
+    if client is None:
+        return {"ok": False, "error": "MongoDB client is not connected"}
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), settings.HEALTH_MONGO_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"ping timed out after {settings.HEALTH_MONGO_TIMEOUT_SECONDS}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def check_mongo_pool() -> Dict[str, Any]:
+    pool = mongo_pool_listener.snapshot(settings.MONGODB_MAX_POOL_SIZE)
+    pool["ok"] = not (pool["available"] <= 0 and pool["waiting"] > 0)
+    return pool
+
+def check_event_loop() -> Dict[str, Any]:
+    loop = loop_lag_monitor.snapshot()
+    loop["ok"] = loop_lag_monitor.running and (loop["max_lag_ms"] or 0) <= settings.HEALTH_MAX_LOOP_LAG_MS
+    return loop
+
+def check_ai_backends() -> Dict[str, Any]:
+    for name in AI_BACKENDS:
+        get_circuit_breaker(name)
+    return {name: breaker.snapshot() for name, breaker in circuit_breakers.items()}
+
+async def readiness_report(client) -> Tuple[bool, Dict[str, Any]]:
+    """(是否就绪, 报告)"""
+    checks = {
+        "mongo": await check_mongo(client),
+        "mongo_pool": check_mongo_pool(),
+        "event_loop": check_event_loop(),
+        "warmup": {"ok": warmup_state.serving, "status": warmup_state.status},
+        "ai_backends": check_ai_backends(),
+    }
+    ready = all(check["ok"] for name, check in checks.items() if name != "ai_backends")
+    degraded = any(breaker["state"] == OPEN for breaker in checks["ai_backends"].values())
+    status = "ready" if ready and not degraded else ("degraded" if ready else "not_ready")
+    return ready, {"status": status, "pid": os.getpid(), "checks": checks}
+
+def liveness_report() -> Tuple[bool, Dict[str, Any]]:
+    """(是否存活, 报告)；延迟监控任务退出或长时间未运行视为事件循环卡死"""
+    loop = loop_lag_monitor.snapshot()
+    stalled = loop["seconds_since_tick"] is not None and loop["seconds_since_tick"] > settings.HEALTH_LIVENESS_STALL_SECONDS
+    alive = loop_lag_monitor.running and not stalled
+    return alive, {
+        "status": "alive" if alive else "stalled",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - STARTED_AT, 1),
+        "event_loop": loop,
+    }
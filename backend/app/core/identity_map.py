@@ -0,0 +1,133 @@
+"""
+请求级身份映射（DataLoader 风格）
+
+同一请求内按 (命名空间, 键) 缓存已加载的对象：
+- 重复查询同一对象直接复用，未找到的结果（None）也会被记住
+- 并发的加载（asyncio.gather）共享进行中的批次，不会重复查询
+- 只在请求范围内有效，请求结束即丢弃，不需要失效机制
+
+IdentityMapMiddleware 为每个HTTP请求创建新的映射；脚本或后台任务可用
+`with request_identity_map():` 手动开启。没有活动映射时 load_many 直接调用加载函数。
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+_MISSING = object()
+
+class IdentityMap:
+    """命名空间 -> {键: 对象 / None / 进行中的批次}"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Hashable, Any]] = {}
+
+    def discard(self, namespace: str, key: Hashable):
+        """对象在本请求内被修改后调用，下次重新加载"""
+        self._entries.get(namespace, {}).pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def load_many(
+        self,
+        namespace: str,
+        keys: Iterable[Hashable],
+        loader: Callable[[list], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """
+        返回 {键: 对象}（不存在的键不在结果中）
+
+        loader 接收未命中的键列表，返回 {键: 对象}，只对未命中且没有进行中批次的键调用一次。
+        """
+        entries = self._entries.setdefault(namespace, {})
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        missing = []
+        seen = set()
+
+        for key in keys:
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = entries.get(key, _MISSING)
+            if entry is _MISSING:
+                missing.append(key)
+            elif isinstance(entry, asyncio.Future):
+                waiting[key] = entry
+            elif entry is not None:
+                results[key] = entry
+
+        if missing:
+            batch = asyncio.get_running_loop().create_future()
+            for key in missing:
+                entries[key] = batch
+            try:
+                loaded = await loader(missing)
+            except BaseException as e:
+                # 加载失败不缓存，本请求内后续调用会重试
+                for key in missing:
+                    if entries.get(key) is batch:
+                        del entries[key]
+                if isinstance(e, asyncio.CancelledError):
+                    batch.cancel()
+                else:
+                    batch.set_exception(e)
+                    batch.exception()  # 标记已读取，避免无人等待时输出告警
+                raise
+            for key in missing:
+                value = loaded.get(key)
+                entries[key] = value
+                if value is not None:
+                    results[key] = value
+            batch.set_result(loaded)
+
+        for key, batch in waiting.items():
+            value = (await batch).get(key)
+            if value is not None:
+                results[key] = value
+
+        return results
+
+_identity_map_var: ContextVar[Optional[IdentityMap]] = ContextVar("identity_map", default=None)
+
+def get_identity_map() -> Optional[IdentityMap]:
+    """当前请求的身份映射（不在请求范围内时为 None）"""
+    return _identity_map_var.get()
+
+async def load_many(
+    namespace: str,
+    keys: Iterable[Hashable],
+    loader: Callable[[list], Awaitable[Dict[Hashable, Any]]]
+) -> Dict[Hashable, Any]:
+    """有活动映射时经过映射加载，否则直接去重后调用 loader"""
+    identity_map = _identity_map_var.get()
+    if identity_map is not None:
+        return await identity_map.load_many(namespace, keys, loader)
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return {}
+    loaded = await loader(unique_keys)
+    return {key: value for key, value in loaded.items() if value is not None}
+
+@contextmanager
+def request_identity_map():
+    """开启一个新的身份映射作用域"""
+    token = _identity_map_var.set(IdentityMap())
+    try:
+        yield _identity_map_var.get()
+    finally:
+        _identity_map_var.reset(token)
+
+class IdentityMapMiddleware:
+    """ASGI中间件：每个HTTP请求使用独立的身份映射"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_identity_map():
+            await self.app(scope, receive, send)
@@ -0,0 +1,274 @@
+"""
+缓存 / 索引失效总线
+
+其他 worker 和 backend/scripts 下的脚本会直接写 MongoDB，进程内缓存需要感知这些写入：
+- 副本集：订阅 content / user_tags / user_favorites / users 的 change stream，
+  断线后用 resume token 续订；token 失效（历史已被覆盖）时发布 reset 事件让订阅方整体清空。
+  content 单独一条流且不做 updateLookup（失效只需 _id），只改 view_count 的更新在服务端过滤掉
+- 单机 mongod（不支持 change stream）：按各集合的更新时间字段（POLL_TIMESTAMP_FIELDS）轮询，
+  只能发现插入与更新；删除以及未写该字段的更新（如 backend/scripts 下的旧脚本直接改 users）
+  发现不了，依赖各缓存自身的 TTL 兜底
+
+订阅方通过 invalidation_bus.subscribe(collection, callback) 注册，回调接收 InvalidationEvent
+（同步或异步函数均可，异常只记录日志）。
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from pymongo.errors import OperationFailure, PyMongoError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("content", "user_tags", "user_favorites", "users")
+
+# 轮询模式下各集合的更新时间字段（写入方需在每次插入 / 更新时设置；users 由 UserService 维护）
+POLL_TIMESTAMP_FIELDS = {
+    "content": "updated_at",
+    "user_tags": "updated_at",
+    "user_favorites": "favorited_at",
+    "users": "updated_at",
+}
+
+# 事件中携带的关键字段（避免把整篇文章带进事件）
+KEY_FIELDS = ("id", "user_id", "content_id")
+
+# 失效只需文档 _id 的集合，不做 updateLookup
+NO_LOOKUP_COLLECTIONS = ("content",)
+
+# 只修改这些字段的更新不发布事件（浏览计数过于频繁，缓存中由 bump_view_count 同步）
+IGNORED_UPDATE_FIELDS = {
+    "content": ("view_count",),
+}
+
+# MongoDB 错误码：非副本集不支持 change stream / resume token 对应的历史已丢失
+_CHANGE_STREAM_UNSUPPORTED = 40573
+_CHANGE_STREAM_HISTORY_LOST = 286
+
+class InvalidationEvent(NamedTuple):
+    collection: str
+    operation: str  # insert / update / replace / delete / reset
+    document_id: Any  # 文档 _id；reset 事件为 None，表示整个集合需要失效
+    document: Optional[Dict[str, Any]]  # KEY_FIELDS 中存在的字段，删除事件为 None
+
+Subscriber = Callable[[InvalidationEvent], Union[None, Awaitable[None]]]
+
+class InvalidationBus:
+    """change stream / 轮询 -> 订阅方"""
+
+    def __init__(self, collections=WATCHED_COLLECTIONS):
+        self.collections = tuple(collections)
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # 流名称（逗号连接的集合名）-> resume token
+        self.resume_tokens: Dict[str, Dict[str, Any]] = {}
+        self.mode: Optional[str] = None
+        self.events_published = 0
+
+    def subscribe(self, collection: str, callback: Subscriber):
+        self._subscribers.setdefault(collection, []).append(callback)
+
+    def unsubscribe(self, collection: str, callback: Subscriber):
+        callbacks = self._subscribers.get(collection, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def publish(self, event: InvalidationEvent):
+        self.events_published += 1
+        for callback in list(self._subscribers.get(event.collection, [])):
+            try:
+                result = callback(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error("❌ 失效事件处理失败 %s/%s: %s", event.collection, event.operation, e)
+
+    async def reset_all(self):
+        """事件可能丢失时通知所有订阅方整体清空"""
+        for collection in self.collections:
+            await self.publish(InvalidationEvent(collection, "reset", None, None))
+
+    # ---------- 生命周期 ----------
+
+    def start(self, db, mode: str = "auto"):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(db, mode))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db, mode: str):
+        try:
+            if mode in ("auto", "change_stream"):
+                try:
+                    await self._watch(db)
+                    return
+                except OperationFailure as e:
+                    if mode == "change_stream" or e.code != _CHANGE_STREAM_UNSUPPORTED:
+                        raise
+                    logger.info("ℹ️ MongoDB 不支持 change stream（非副本集），失效总线改用轮询")
+            await self._poll(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.mode = None
+            logger.error("❌ 失效总线已停止: %s", e)
+
+    # ---------- change stream ----------
+
+    async def _watch(self, db):
+        self.mode = "change_stream"
+        groups = [
+            ([c for c in self.collections if c in NO_LOOKUP_COLLECTIONS], None),
+            ([c for c in self.collections if c not in NO_LOOKUP_COLLECTIONS], "updateLookup"),
+        ]
+        tasks = [
+            asyncio.create_task(self._watch_stream(db, collections, full_document))
+            for collections, full_document in groups if collections
+        ]
+        try:
+            # 各流都不会正常结束，任一抛出异常（如不支持 change stream）即整体退出
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _watch_stream(self, db, collections: List[str], full_document: Optional[str]):
+        name = ",".join(collections)
+        pipeline = [_stream_match(collections), {"$project": {
+            "operationType": 1,
+            "ns": 1,
+            "documentKey": 1,
+            **{f"fullDocument.{field}": 1 for field in KEY_FIELDS},
+        }}]
+        while True:
+            try:
+                async with db.watch(pipeline, full_document=full_document, resume_after=self.resume_tokens.get(name)) as stream:
+                    logger.info("👂 失效总线已订阅 change stream: %s", name)
+                    async for change in stream:
+                        self.resume_tokens[name] = stream.resume_token
+                        await self.publish(_event_from_change(change))
+                # 流正常结束（如集合被删除后失效）时立即重新订阅
+                continue
+            except OperationFailure as e:
+                if e.code == _CHANGE_STREAM_HISTORY_LOST:
+                    logger.warning("⚠️ resume token 已失效，清空 %s 相关缓存后重新订阅", name)
+                    self.resume_tokens.pop(name, None)
+                    for collection in collections:
+                        await self.publish(InvalidationEvent(collection, "reset", None, None))
+                    continue
+                if e.code == _CHANGE_STREAM_UNSUPPORTED:
+                    raise
+                logger.error("❌ change stream 异常: %s，稍后重试", e)
+            except PyMongoError as e:
+                logger.error("❌ change stream 连接中断: %s，稍后重试", e)
+            await asyncio.sleep(settings.INVALIDATION_RETRY_SECONDS)
+
+    # ---------- 轮询 ----------
+
+    async def _poll(self, db):
+        self.mode = "poll"
+        fields = {collection: POLL_TIMESTAMP_FIELDS[collection] for collection in self.collections}
+        for collection, field in fields.items():
+            try:
+                await db[collection].create_index([(field, 1), ("_id", 1)])
+            except PyMongoError as e:
+                logger.warning("⚠️ 创建轮询索引失败 %s.%s: %s", collection, field, e)
+
+        # 本地时间与 datetime.now()/utcnow() 写入的数据都不会早于此刻（取较早者）
+        started_at = min(datetime.now(), datetime.utcnow())
+        # 按 (时间字段, _id) 翻页：批量写入可能让上千条文档时间戳相同，只按时间 $gt 会跳过同一时刻的剩余文档
+        last_seen: Dict[str, Tuple[datetime, Any]] = {collection: (started_at, None) for collection in fields}
+        projection = {field: 1 for field in KEY_FIELDS}
+        logger.info("🔁 失效总线轮询启动（间隔 %ss）: %s", settings.INVALIDATION_POLL_INTERVAL_SECONDS, ", ".join(fields))
+
+        while True:
+            await asyncio.sleep(settings.INVALIDATION_POLL_INTERVAL_SECONDS)
+            for collection, field in fields.items():
+                try:
+                    seen_at, seen_id = last_seen[collection]
+                    query: Dict[str, Any] = {field: {"$gt": seen_at}}
+                    if seen_id is not None:
+                        query = {"$or": [query, {field: seen_at, "_id": {"$gt": seen_id}}]}
+                    cursor = db[collection].find(
+                        query,
+                        {**projection, field: 1}
+                    ).sort([(field, 1), ("_id", 1)]).limit(settings.INVALIDATION_POLL_BATCH_SIZE)
+                    async for document in cursor:
+                        last_seen[collection] = (document[field], document["_id"])
+                        await self.publish(InvalidationEvent(
+                            collection, "update", document["_id"], _key_fields(document)
+                        ))
+                except PyMongoError as e:
+                    logger.error("❌ 失效轮询失败 %s: %s", collection, e)
+
+def _stream_match(collections: List[str]) -> Dict[str, Any]:
+    """按集合过滤，并丢弃只修改了 IGNORED_UPDATE_FIELDS 的更新事件"""
+    ignored = [
+        {"$and": [
+            {"$eq": ["$ns.coll", collection]},
+            {"$eq": ["$operationType", "update"]},
+            {"$eq": [{"$size": {"$ifNull": ["$updateDescription.removedFields", []]}}, 0]},
+            {"$setIsSubset": [
+                {"$map": {
+                    "input": {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}},
+                    "in": "$$this.k"
+                }},
+                list(fields)
+            ]},
+        ]}
+        for collection, fields in IGNORED_UPDATE_FIELDS.items() if collection in collections
+    ]
+    match: Dict[str, Any] = {"ns.coll": {"$in": list(collections)}}
+    if ignored:
+        match["$expr"] = {"$not": [{"$or": ignored}]}
+    return {"$match": match}
+
+def _key_fields(document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if document is None:
+        return None
+    return {field: document[field] for field in KEY_FIELDS if field in document}
+
+def _event_from_change(change: Dict[str, Any]) -> InvalidationEvent:
+    return InvalidationEvent(
+        collection=change["ns"]["coll"],
+        operation=change["operationType"],
+        document_id=change.get("documentKey", {}).get("_id"),
+        document=_key_fields(change.get("fullDocument"))
+    )
+
+invalidation_bus = InvalidationBus()
+
+def register_cache_invalidation(bus: InvalidationBus = invalidation_bus):
+    """把进程内缓存挂到失效总线上"""
+    from app.core.auth_cache import auth_user_cache
+    from app.core.content_cache import hot_content_cache
+
+    def on_content_change(event: InvalidationEvent):
+        if event.operation == "insert":
+            return  # 新文章不会在缓存中
+        if event.document_id is None:
+            hot_content_cache.clear()
+        else:
+            hot_content_cache.invalidate(event.document_id)
+
+    def on_user_change(event: InvalidationEvent):
+        user_id = (event.document or {}).get("id")
+        if user_id:
+            auth_user_cache.invalidate_user(user_id)
+        elif event.document_id is None or event.operation == "delete":
+            # 删除事件只有 _id，无法定位到用户ID，整体清空（TTL很短，代价可控）
+            auth_user_cache.clear()
+
+    bus.subscribe("content", on_content_change)
+    bus.subscribe("users", on_user_change)
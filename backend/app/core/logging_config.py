@@ -0,0 +1,151 @@
+"""
+结构化日志
+
+- JSON / 文本两种输出格式，按模块配置日志级别
+- 请求ID关联：RequestContextMiddleware 为每个请求生成（或沿用 X-Request-ID）请求ID
+- 推荐追踪采样：TraceLogger 的 DEBUG 日志只在被采样的请求中输出
+  （按 LOG_TRACE_SAMPLE_RATE 随机采样，或请求头 X-Debug-Trace: 1 强制开启）
+- 非阻塞输出：业务线程只把日志放入队列，由 QueueListener 后台线程写出
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.config import settings
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+trace_enabled_var: ContextVar[bool] = ContextVar("trace_enabled", default=False)
+
+# LogRecord 自带的属性，其余属性视为 extra 字段输出
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class RequestContextFilter(logging.Filter):
+    """为日志记录附加当前请求ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """单行JSON日志"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class TraceLogger(logging.LoggerAdapter):
+    """
+    推荐追踪日志：DEBUG 级别在被采样的请求内始终输出，其余请求遵循模块日志级别
+
+    采用 %s 占位符传参，未采样时不做字符串格式化。
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def isEnabledFor(self, level: int) -> bool:
+        if level <= logging.DEBUG and trace_enabled_var.get():
+            return True
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, msg, *args, **kwargs):
+        if self.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            # 直接调用 _log，跳过底层 logger 的级别判断（采样请求需要越过模块级别）
+            self.logger._log(level, msg, args, **kwargs)
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+def get_trace_logger(name: str) -> TraceLogger:
+    return TraceLogger(logging.getLogger(name))
+
+def is_trace_enabled() -> bool:
+    """当前请求是否开启了完整追踪"""
+    return trace_enabled_var.get()
+
+def setup_logging():
+    """配置根日志：队列异步输出 + 格式 + 按模块级别（可重复调用）"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"
+        ))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # 请求ID是 ContextVar，必须在业务线程入队前写入记录
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    for module_name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(module_name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """停止后台写日志线程（输出队列中剩余日志）"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class RequestContextMiddleware:
+    """ASGI中间件：设置请求ID与追踪采样标记，并在响应头返回请求ID"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        debug_header = settings.LOG_TRACE_HEADER.lower().encode("latin-1")
+        traced = headers.get(debug_header, b"") in (b"1", b"true") or random.random() < settings.LOG_TRACE_SAMPLE_RATE
+
+        request_id_token = request_id_var.set(request_id)
+        trace_token = trace_enabled_var.set(traced)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(request_id_token)
+            trace_enabled_var.reset(trace_token)
@@ -0,0 +1,299 @@
+"""
+进程内指标采集（Prometheus 文本格式导出）
+
+- HTTP 请求耗时：MetricsMiddleware，按路由模板打标签
+- 推荐流程分阶段耗时：StageTimer
+- MongoDB 命令耗时：MongoCommandListener（pymongo CommandListener）
+- MongoDB 连接池使用情况：MongoPoolListener（pymongo ConnectionPoolListener，供就绪探针读取）
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """单调递增计数器"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """累积分桶直方图"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> [各桶计数, 总和, 总数]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status")
+)
+RECOMMENDATION_STAGE_DURATION = registry.histogram(
+    "recommendation_stage_duration_seconds",
+    "Recommendation pipeline latency by stage.",
+    ("pipeline", "stage")
+)
+MONGO_COMMAND_DURATION = registry.histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency reported by the driver.",
+    ("command", "collection", "status")
+)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+class StageTimer:
+    """
+    分阶段计时器：lap(stage) 记录距上一次 lap 的耗时
+
+    用法：
+        stages = StageTimer("smart")
+        ...获取标签...
+        stages.lap("tag_fetch")
+    """
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+        RECOMMENDATION_STAGE_DURATION.observe(elapsed, pipeline=self.pipeline, stage=stage)
+        return elapsed
+
+    def skip(self):
+        """丢弃当前阶段的耗时（如只输出日志的代码段）"""
+        self._last = time.perf_counter()
+
+class MetricsMiddleware:
+    """ASGI中间件：按路由模板记录HTTP请求耗时"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 路由匹配后 scope 中带有 route，使用路由模板避免标签基数膨胀
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", "unmatched"),
+                status=status_code
+            )
+
+class MongoCommandListener(monitoring.CommandListener):
+    """记录驱动上报的MongoDB命令耗时"""
+
+    def __init__(self):
+        # (连接, request_id) -> 集合名（只有命令开始事件带命令体）
+        self._collections: Dict[Tuple[Optional[object], int], str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ""
+            )
+
+    def succeeded(self, event):
+        self._observe(event, "success")
+
+    def failed(self, event):
+        self._observe(event, "failure")
+
+    def _observe(self, event, status: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000,
+            command=event.command_name,
+            collection=collection,
+            status=status
+        )
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """按服务器地址统计连接池：已建立、使用中、排队中、取连接超时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, int], Dict[str, int]] = defaultdict(
+            lambda: {"open": 0, "in_use": 0, "waiting": 0, "checkout_failed": 0}
+        )
+
+    def _add(self, address, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[address][field] += amount
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._counts.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._add(event.address, "open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, "open", -1)
+
+    def connection_check_out_started(self, event):
+        self._add(event.address, "waiting")
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            counts = self._counts[event.address]
+            counts["waiting"] -= 1
+            counts["checkout_failed"] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            counts = self._counts[event.address]
+            counts["waiting"] -= 1
+            counts["in_use"] += 1
+
+    def connection_checked_in(self, event):
+        self._add(event.address, "in_use", -1)
+
+    def snapshot(self, max_size: int) -> Dict[str, Any]:
+        with self._lock:
+            servers = {f"{host}:{port}": dict(counts) for (host, port), counts in self._counts.items()}
+        in_use = sum(counts["in_use"] for counts in servers.values())
+        waiting = sum(counts["waiting"] for counts in servers.values())
+        return {
+            "max_size": max_size,
+            "in_use": in_use,
+            # 连接池按服务器独立计算上限，这里取使用最多的服务器剩余容量
+            "available": max_size - max((counts["in_use"] for counts in servers.values()), default=0),
+            "waiting": waiting,
+            "checkout_failed": sum(counts["checkout_failed"] for counts in servers.values()),
+            "servers": servers,
+        }
+
+mongo_pool_listener = MongoPoolListener()
@@ -0,0 +1,242 @@
+"""
+MongoDB 查询次数 / 耗时守卫
+
+用于发现 N+1 查询（循环内逐条 find_one 等）：
+- QueryGuardListener：pymongo CommandListener，把命令记录到当前活动的 QueryRecorder
+- QueryRecorder：记录一段代码发出的全部命令（命令名、集合、耗时、调用位置）
+- query_budget：上下文管理器 / 装饰器，超出命令数或总耗时预算时抛出 QueryBudgetExceeded
+- format_report：按调用位置汇总，列出命令最多 / 最慢的代码行
+
+注意：记录器在进程内全局生效，同一时刻并发的其他请求的命令也会被计入，
+适合在测试和 scripts/check_query_budgets.py 这类顺序执行的场景中使用。
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from pymongo import monitoring
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_APP_DIR = os.path.join(_BACKEND_DIR, "app") + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+_active_recorders: List["QueryRecorder"] = []
+_active_lock = threading.Lock()
+
+class QueryEvent(NamedTuple):
+    command: str
+    collection: str
+    duration_ms: float
+    call_site: str
+    status: str
+
+class QueryBudgetExceeded(AssertionError):
+    """超出查询预算"""
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(_APP_DIR) and filename != _THIS_FILE
+
+def _format_frame(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.relpath(code.co_filename, _BACKEND_DIR)}:{frame.f_lineno} ({code.co_name})"
+
+def _call_site_from_stack(frame) -> str:
+    """在线程栈中找最内层的 app 代码"""
+    while frame is not None:
+        if _is_app_frame(frame.f_code.co_filename):
+            return _format_frame(frame)
+        frame = frame.f_back
+    return "<unknown>"
+
+def _call_site_from_task(task: Optional[asyncio.Task]) -> str:
+    """
+    异步调用（motor）：命令在线程池中执行，线程栈里只有驱动代码，
+    沿着挂起任务的 await 链找到最内层的 app 协程
+    """
+    if task is None:
+        return "<unknown>"
+    call_site = "<unknown>"
+    awaitable = getattr(task, "get_coro", lambda: None)()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is not None and _is_app_frame(frame.f_code.co_filename):
+            call_site = _format_frame(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return call_site
+
+class QueryRecorder:
+    """
+    记录一段代码发出的MongoDB命令
+
+    用法：
+        with QueryRecorder() as recorder:
+            await service.get_users()
+        print(recorder.count, recorder.total_time_ms)
+    """
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.events: List[QueryEvent] = []
+        self._pending: Dict[Tuple[Optional[object], int], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        try:
+            self._task = asyncio.current_task()
+        except RuntimeError:
+            self._task = None
+        with _active_lock:
+            _active_recorders.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _active_lock:
+            if self in _active_recorders:
+                _active_recorders.remove(self)
+        return False
+
+    @property
+    def count(self) -> int:
+        return len(self.events)
+
+    @property
+    def total_time_ms(self) -> float:
+        return sum(event.duration_ms for event in self.events)
+
+    def _started(self, event):
+        if threading.get_ident() == self._thread_id:
+            # 同步驱动（pymongo）：命令在调用线程中执行
+            call_site = _call_site_from_stack(sys._getframe(1))
+        else:
+            call_site = _call_site_from_task(self._task)
+            if call_site == "<unknown>":
+                # 任务尚未挂起（线程池已开始执行命令）：直接查看事件循环线程的栈
+                call_site = _call_site_from_stack(sys._current_frames().get(self._thread_id))
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else "",
+                call_site
+            )
+
+    def _finished(self, event, status: str):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            collection, call_site = pending
+            self.events.append(QueryEvent(
+                command=event.command_name,
+                collection=collection,
+                duration_ms=event.duration_micros / 1000,
+                call_site=call_site,
+                status=status
+            ))
+
+    def call_sites(self) -> List[Dict[str, object]]:
+        """按调用位置汇总：命令数、总耗时、涉及的命令"""
+        sites: Dict[str, Dict[str, object]] = {}
+        for event in self.events:
+            site = sites.get(event.call_site)
+            if site is None:
+                site = sites[event.call_site] = {"call_site": event.call_site, "count": 0, "time_ms": 0.0, "commands": set()}
+            site["count"] += 1
+            site["time_ms"] += event.duration_ms
+            site["commands"].add(f"{event.command}:{event.collection}" if event.collection else event.command)
+        return sorted(sites.values(), key=lambda site: (site["count"], site["time_ms"]), reverse=True)
+
+class QueryGuardListener(monitoring.CommandListener):
+    """把驱动命令事件分发给活动中的 QueryRecorder（没有活动记录器时直接返回）"""
+
+    def started(self, event):
+        if not _active_recorders:
+            return
+        for recorder in list(_active_recorders):
+            recorder._started(event)
+
+    def succeeded(self, event):
+        if not _active_recorders:
+            return
+        for recorder in list(_active_recorders):
+            recorder._finished(event, "success")
+
+    def failed(self, event):
+        if not _active_recorders:
+            return
+        for recorder in list(_active_recorders):
+            recorder._finished(event, "failure")
+
+def format_report(recorder: QueryRecorder, top: int = 10) -> str:
+    """调用位置排行（命令数优先，其次耗时）"""
+    title = f"[{recorder.label}] " if recorder.label else ""
+    lines = [f"{title}{recorder.count} 条命令，总耗时 {recorder.total_time_ms:.1f}ms"]
+    for site in recorder.call_sites()[:top]:
+        commands = ", ".join(sorted(site["commands"]))
+        lines.append(f"  {site['count']:>5} 次 {site['time_ms']:>9.1f}ms  {site['call_site']}  [{commands}]")
+    return "\n".join(lines)
+
+class query_budget:
+    """
+    查询预算：上下文管理器 / 装饰器（支持同步与异步函数）
+
+    用法：
+        with query_budget(max_commands=3, max_time_ms=50, label="get_users"):
+            await user_service.get_users()
+
+        @query_budget(max_commands=2)
+        async def test_get_users(): ...
+    """
+
+    def __init__(self, max_commands: Optional[int] = None, max_time_ms: Optional[float] = None, label: str = "", top: int = 10):
+        self.max_commands = max_commands
+        self.max_time_ms = max_time_ms
+        self.label = label
+        self.top = top
+        self.recorder: Optional[QueryRecorder] = None
+
+    def __enter__(self) -> QueryRecorder:
+        self.recorder = QueryRecorder(self.label).__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            self.check(self.recorder)
+        return False
+
+    def violations(self, recorder: QueryRecorder) -> List[str]:
+        problems = []
+        if self.max_commands is not None and recorder.count > self.max_commands:
+            problems.append(f"命令数 {recorder.count} > 预算 {self.max_commands}")
+        if self.max_time_ms is not None and recorder.total_time_ms > self.max_time_ms:
+            problems.append(f"命令总耗时 {recorder.total_time_ms:.1f}ms > 预算 {self.max_time_ms}ms")
+        return problems
+
+    def check(self, recorder: QueryRecorder):
+        problems = self.violations(recorder)
+        if problems:
+            raise QueryBudgetExceeded(f"{'；'.join(problems)}\n{format_report(recorder, self.top)}")
+
+    def __call__(self, func):
+        label = self.label or func.__qualname__
+        budget = (self.max_commands, self.max_time_ms, label, self.top)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with query_budget(*budget):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with query_budget(*budget):
+                return func(*args, **kwargs)
+        return wrapper
+
+query_guard_listener = QueryGuardListener()
@@ -0,0 +1,101 @@
+"""
+响应序列化与条件请求
+
+- model_response：pydantic v2 model_dump + orjson 直接生成响应体，跳过 jsonable_encoder
+- 基于响应体计算弱 ETag，请求头 If-None-Match 命中时返回 304（不带响应体）
+- 静态参考数据（城市、地区、标签选项等）：启动时预先序列化为字节 + 弱 ETag，
+  之后每次请求直接返回同一份字节或 304
+- ETag 一律为弱校验：响应可能经 GZipMiddleware 压缩，表示形式变化而 ETag 不变，
+  强 ETag 要求字节完全一致，不能跨编码复用
+"""
+import hashlib
+import logging
+import orjson
+from typing import Any, Callable, Dict
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+def dump_json(model: BaseModel) -> bytes:
+    """pydantic 模型序列化为 JSON 字节（datetime / 枚举由 orjson 原生处理）"""
+    return orjson.dumps(model.model_dump())
+
+def compute_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断 If-None-Match 是否命中（支持多个值与 *）"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    candidates = {_opaque_tag(value) for value in if_none_match.split(",")}
+    return _opaque_tag(etag) in candidates
+
+def model_response(request: Request, model: BaseModel) -> Response:
+    """返回带 ETag 的 JSON 响应；客户端缓存未变化时返回 304"""
+    body = dump_json(model)
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+class StaticPayload:
+    """预先序列化的响应体及其弱 ETag"""
+
+    def __init__(self, data: Any):
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+        self.body = orjson.dumps(data)
+        self.etag = compute_etag(self.body)
+        self.headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={settings.STATIC_PAYLOAD_MAX_AGE}"
+        }
+
+# 名称 -> 构建函数 / 已构建的响应体
+_static_builders: Dict[str, Callable[[], Any]] = {}
+_static_payloads: Dict[str, StaticPayload] = {}
+
+def static_payload(name: str):
+    """注册静态参考数据的构建函数（装饰器）"""
+    def decorator(builder: Callable[[], Any]):
+        _static_builders[name] = builder
+        return builder
+    return decorator
+
+def get_static_payload(name: str) -> StaticPayload:
+    """获取预构建的响应体（未预热时在首次访问时构建）"""
+    payload = _static_payloads.get(name)
+    if payload is None:
+        payload = _static_payloads[name] = StaticPayload(_static_builders[name]())
+    return payload
+
+def warm_static_payloads():
+    """启动时构建全部已注册的静态响应体"""
+    for name in _static_builders:
+        try:
+            get_static_payload(name)
+        except Exception as e:
+            # 构建失败不阻止启动，首次请求时重试并返回错误
+            logger.error("❌ 静态响应预构建失败: %s - %s", name, str(e))
+
+def static_response(request: Request, name: str) -> Response:
+    """返回预构建的响应体；If-None-Match 命中时返回 304"""
+    payload = get_static_payload(name)
+    if etag_matches(request, payload.etag):
+        return Response(status_code=304, headers=payload.headers)
+    return Response(content=payload.body, media_type=JSON_MEDIA_TYPE, headers=payload.headers)
@@ -1,10 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
 from app.core.config import settings
-from typing import Optional
+from typing import Optional, Tuple
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt__rounds 调整后，旧哈希会被标记为需要更新，登录成功时透明重算
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
+
+# bcrypt 为CPU密集操作，放到有界线程池执行，避免阻塞事件循环
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_semaphore: Optional[asyncio.Semaphore] = None
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +26,32 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_password_task(func, *args):
+    """在密码线程池中执行，同时限制并发中的登录/注册数量"""
+    global _password_semaphore
+    if _password_semaphore is None:
+        _password_semaphore = asyncio.Semaphore(settings.LOGIN_CONCURRENCY_LIMIT)
+    
+    async with _password_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+async def get_password_hash_async(password: str) -> str:
+    """异步计算密码哈希（不阻塞事件循环）"""
+    return await _run_password_task(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """异步校验密码（不阻塞事件循环）"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    异步校验密码，哈希参数过期时同时返回新哈希
+    
+    返回 (是否通过, 新哈希或None)
+    """
+    return await _run_password_task(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
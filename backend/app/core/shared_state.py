@@ -0,0 +1,248 @@
+"""
+跨 worker 共享状态
+
+多 worker 部署时进程内缓存、限流计数、预计算结果各自一份。需要跨进程共享的数据通过 SharedState 读写：
+- LocalSharedState：进程内字典（单 worker / 开发环境，默认）
+- RespSharedState：Redis 协议（RESP2）客户端，可连接 Redis / KeyDB / Dragonfly，
+  或本地替身 scripts/shared_state_server.py（无需安装 Redis 即可验证多 worker 行为）
+
+值统一为字符串，结构化数据用 get_json / set_json。
+配置 SHARED_STATE_URL（如 redis://127.0.0.1:6379/0）后启用 RespSharedState。
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from app.core.config import settings
+
+class SharedStateError(Exception):
+    """共享状态后端返回错误或连接失败"""
+
+class SharedStateConnectionError(SharedStateError):
+    """连接失败、断开或超时（连接不可再复用）"""
+
+class SharedState:
+    """共享状态接口（键会自动加上 key_prefix）"""
+
+    def __init__(self, key_prefix: str = ""):
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        """写入；only_if_absent=True 时键已存在则不写入并返回 False（可用作跨 worker 锁）"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[float] = None) -> int:
+        """原子递增；键不存在时先以 0 和 TTL 创建（SET NX），已有键的过期时间不变（固定窗口计数）"""
+        raise NotImplementedError
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        value = await self.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set_json(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        return await self.set(key, json.dumps(value, ensure_ascii=False, default=str), ttl_seconds)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+class LocalSharedState(SharedState):
+    """进程内实现（同一事件循环内操作天然原子）"""
+
+    def __init__(self, key_prefix: str = ""):
+        super().__init__(key_prefix)
+        # key -> (过期时间或None, 值)
+        self._entries: Dict[str, Tuple[Optional[float], str]] = {}
+
+    def _live(self, key: str) -> Optional[Tuple[Optional[float], str]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    @staticmethod
+    def _expires_at(ttl_seconds: Optional[float]) -> Optional[float]:
+        return time.monotonic() + ttl_seconds if ttl_seconds else None
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._live(self._key(key))
+        return entry[1] if entry else None
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        full_key = self._key(key)
+        if only_if_absent and self._live(full_key) is not None:
+            return False
+        self._entries[full_key] = (self._expires_at(ttl_seconds), str(value))
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(self._key(key), None)
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[float] = None) -> int:
+        full_key = self._key(key)
+        if ttl_seconds:
+            await self.set(key, "0", ttl_seconds, only_if_absent=True)
+        entry = self._live(full_key) or (None, "0")
+        try:
+            value = int(entry[1]) + amount
+        except ValueError:
+            raise SharedStateError(f"Value of {key} is not an integer")
+        self._entries[full_key] = (entry[0], str(value))
+        return value
+
+# ---------- RESP2 编解码 ----------
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise SharedStateConnectionError("Connection closed by server")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        raise SharedStateError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode("utf-8")
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise SharedStateError(f"Unexpected reply: {line!r}")
+
+class RespSharedState(SharedState):
+    """Redis 协议客户端（小连接池，每条连接一次只执行一个命令；信号量限制同时占用的连接数）"""
+
+    def __init__(self, url: str, pool_size: int = 8, key_prefix: str = "", timeout: float = 2.0):
+        super().__init__(key_prefix)
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "resp"):
+            raise SharedStateError(f"Unsupported shared state URL: {url}")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.database = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(pool_size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise SharedStateConnectionError(f"Failed to connect to {self.host}:{self.port}: {e}")
+        connection = (reader, writer)
+        try:
+            if self.password:
+                await self._send(connection, "AUTH", self.password)
+            if self.database:
+                await self._send(connection, "SELECT", self.database)
+        except BaseException:
+            writer.close()
+            raise
+        return connection
+
+    async def _send(self, connection, *args):
+        reader, writer = connection
+        try:
+            writer.write(encode_command(*args))
+            await asyncio.wait_for(writer.drain(), self.timeout)
+            return await asyncio.wait_for(read_reply(reader), self.timeout)
+        except asyncio.TimeoutError:
+            raise SharedStateConnectionError(f"{args[0]} timed out after {self.timeout}s")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise SharedStateConnectionError(f"{args[0]} failed: {e}")
+
+    async def execute(self, *args):
+        async with self._semaphore:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                reply = await self._send(connection, *args)
+            except SharedStateConnectionError:
+                connection[1].close()
+                raise
+            except SharedStateError:
+                self._idle.append(connection)  # 命令错误，连接仍可用
+                raise
+            except BaseException:
+                # 取消时响应可能还在路上，连接不能复用
+                connection[1].close()
+                raise
+            self._idle.append(connection)
+            return reply
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.execute("GET", self._key(key))
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        args: List[Any] = ["SET", self._key(key), value]
+        if ttl_seconds:
+            args += ["PX", max(1, int(ttl_seconds * 1000))]
+        if only_if_absent:
+            args.append("NX")
+        return await self.execute(*args) == "OK"
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", self._key(key))
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[float] = None) -> int:
+        full_key = self._key(key)
+        if ttl_seconds:
+            # 先带 TTL 创建计数键：两条命令之间被取消也不会留下永不过期的计数
+            await self.execute("SET", full_key, 0, "PX", max(1, int(ttl_seconds * 1000)), "NX")
+        return await self.execute("INCRBY", full_key, amount)
+
+    async def ping(self) -> bool:
+        return await self.execute("PING") == "PONG"
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+_shared_state: Optional[SharedState] = None
+
+def get_shared_state() -> SharedState:
+    """按 SHARED_STATE_URL 创建（首次调用时）共享状态后端"""
+    global _shared_state
+    if _shared_state is None:
+        if settings.SHARED_STATE_URL:
+            _shared_state = RespSharedState(
+                settings.SHARED_STATE_URL,
+                pool_size=settings.SHARED_STATE_POOL_SIZE,
+                key_prefix=settings.SHARED_STATE_KEY_PREFIX
+            )
+        else:
+            _shared_state = LocalSharedState(key_prefix=settings.SHARED_STATE_KEY_PREFIX)
+    return _shared_state
+
+async def close_shared_state():
+    global _shared_state
+    if _shared_state is not None:
+        await _shared_state.close()
+        _shared_state = None
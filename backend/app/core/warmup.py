@@ -0,0 +1,198 @@
+"""
+启动预热
+
+新 worker 启动后第一批请求要承担参考数据序列化、标签聚合、内容统计和冷的热门文章缓存，
+延迟明显高于稳态。lifespan 中启动后台预热任务，各步骤并发执行：
+- static_payloads：城市 / 能源类型等静态参考数据的序列化结果与 ETag
+- content_stats / content_tags：内容统计与全部标签列表写入共享状态
+- hot_content：最近被频繁浏览的文章预加载到热门文章缓存
+- active_users：为最活跃的用户预跑一次智能推荐（带动其标签、行为涉及的文章进入缓存）
+
+预热完成（或超时）前 warmup_state.ready 为 False，/health 返回 503，负载均衡暂不转发流量。
+gunicorn 下只有首批 worker 这样做（WARMUP_GATE_HEALTH，见 gunicorn.conf.py）：所有 worker 共用监听 socket，
+max_requests 回收的 worker 若也返回 503，健康检查结果会随请求落到哪个 worker 而抖动。
+多 worker 时 content_stats / active_users 通过共享状态锁只由一个 worker 执行。
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.database import max_time_options
+from app.core.responses import warm_static_payloads
+from app.core.shared_state import SharedStateError, get_shared_state
+
+logger = logging.getLogger(__name__)
+
+CONTENT_STATS_LOCK_KEY = "warmup:content_stats"
+ACTIVE_USERS_LOCK_KEY = "warmup:active_users"
+
+class WarmupState:
+    """预热进度（pending -> running -> ready）"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @property
+    def serving(self) -> bool:
+        """健康检查是否放行（不挡健康检查的 worker 预热期间也放行）"""
+        return self.ready or not settings.WARMUP_GATE_HEALTH
+
+    def mark_ready(self):
+        """跳过预热直接就绪（WARMUP_ENABLED=False）"""
+        self.status = "ready"
+        self.finished_at = time.monotonic()
+
+    def summary(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {"status": self.status, "duration_seconds": duration, "steps": self.steps}
+
+    def start(self, db):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(db), name="startup-warmup")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, db):
+        self.status = "running"
+        self.started_at = time.monotonic()
+        self.steps = {}
+        try:
+            steps = build_steps(db)
+        except Exception as e:
+            # 预热只是优化，失败不阻止 worker 接流量
+            logger.error(f"❌ 启动预热初始化失败: {str(e)}")
+            self.mark_ready()
+            return
+        logger.info(f"🔥 开始启动预热: {', '.join(steps)}")
+        tasks = [asyncio.create_task(self._run_step(name, step)) for name, step in steps.items()]
+        done, pending = await asyncio.wait(tasks, timeout=settings.WARMUP_TIMEOUT_SECONDS)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.mark_ready()
+        failed = [name for name, step in self.steps.items() if step["status"] != "ok"]
+        if failed:
+            logger.warning(f"⚠️ 启动预热完成（{self.summary()['duration_seconds']}s），未完成步骤: {', '.join(failed)}")
+        else:
+            logger.info(f"✅ 启动预热完成（{self.summary()['duration_seconds']}s）")
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"status": "running"}
+        self.steps[name] = record
+        try:
+            result = await step()
+            record["status"] = "ok"
+            if result is not None:
+                record["result"] = result
+        except asyncio.CancelledError:
+            record["status"] = "timeout"
+            raise
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            logger.warning(f"⚠️ 预热步骤 {name} 失败: {str(e)}")
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+def build_steps(db) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    # 延迟导入：deps 依赖各服务模块，避免 core 模块导入期循环依赖
+    from app.api.deps import get_content_service, get_recommendation_service
+    from app.services.content_service import CONTENT_STATS_KEY
+
+    content_service = get_content_service(db)
+    recommendation_service = get_recommendation_service(db)
+    since = datetime.utcnow() - timedelta(days=settings.WARMUP_BEHAVIOR_DAYS)
+
+    async def static_payloads():
+        warm_static_payloads()
+
+    async def content_stats():
+        if not await acquire_lock(CONTENT_STATS_LOCK_KEY, settings.CONTENT_STATS_TTL_SECONDS):
+            return {"skipped": "another worker is computing"}
+        stats = await content_service.compute_content_stats()
+        await publish_json(CONTENT_STATS_KEY, stats, settings.CONTENT_STATS_TTL_SECONDS)
+        return stats
+
+    async def content_tags():
+        return {"count": len(await content_service.get_all_tags())}
+
+    async def hot_content():
+        ids = await top_behavior_keys(db, "content_id", since, settings.WARMUP_HOT_CONTENT, {"action": "view"})
+        contents = await content_service.get_contents_by_ids(ids)
+        return {"loaded": len(contents)}
+
+    async def active_users():
+        if not await acquire_lock(ACTIVE_USERS_LOCK_KEY, settings.WARMUP_TIMEOUT_SECONDS):
+            return {"skipped": "another worker is priming"}
+        user_ids = await top_behavior_keys(db, "user_id", since, settings.WARMUP_ACTIVE_USERS)
+        semaphore = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+
+        async def prime(user_id: str):
+            async with semaphore:
+                await recommendation_service.get_smart_recommendations(user_id, limit=10)
+
+        results = await asyncio.gather(*(prime(user_id) for user_id in user_ids), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning(f"⚠️ {len(errors)} 个活跃用户推荐预计算失败: {str(errors[0])}")
+        return {"users": len(user_ids), "errors": len(errors)}
+
+    return {
+        "static_payloads": static_payloads,
+        "content_stats": content_stats,
+        "content_tags": content_tags,
+        "hot_content": hot_content,
+        "active_users": active_users,
+    }
+
+async def publish_json(key: str, value: Any, ttl_seconds: float):
+    """预计算结果写入共享状态，其他 worker 直接读取"""
+    try:
+        await get_shared_state().set_json(key, value, ttl_seconds)
+    except SharedStateError as e:
+        logger.warning(f"⚠️ 写入共享状态 {key} 失败: {str(e)}")
+
+async def top_behavior_keys(db, field: str, since: datetime, limit: int, match: Optional[Dict[str, Any]] = None) -> List[str]:
+    """最近行为次数最多的 user_id / content_id"""
+    if limit <= 0:
+        return []
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": since}, **(match or {})}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit}
+    ]
+    cursor = db.user_behavior.aggregate(pipeline, **max_time_options(settings.MONGODB_QUERY_MAX_TIME_MS))
+    return [doc["_id"] async for doc in cursor if doc["_id"]]
+
+async def acquire_lock(key: str, ttl_seconds: float) -> bool:
+    """跨 worker 的一次性锁；共享状态不可用时各 worker 自行执行"""
+    try:
+        return await get_shared_state().set(key, str(os.getpid()), ttl_seconds, only_if_absent=True)
+    except SharedStateError as e:
+        logger.warning(f"⚠️ 获取预热锁失败，本 worker 直接执行: {str(e)}")
+        return True
+
+warmup_state = WarmupState()
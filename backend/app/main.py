@@ -1,23 +1,55 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.logging_config import setup_logging, shutdown_logging, RequestContextMiddleware
+from app.core.metrics import MetricsMiddleware, registry as metrics_registry, CONTENT_TYPE_LATEST
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database, db_manager
 from app.api import users, content, recommendations, ai_integration, region, admin, ai_chat, favorites
+from app.api.deps import get_favorite_service, reset_services
+from app.core.responses import warm_static_payloads
+from app.core.identity_map import IdentityMapMiddleware
+from app.core.invalidation import invalidation_bus, register_cache_invalidation
+from app.core.shared_state import close_shared_state
+from app.core.warmup import warmup_state
+from app.core.health import loop_lag_monitor, readiness_report, liveness_report
+
+setup_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    setup_logging()
+    loop_lag_monitor.start()
     await connect_to_mongo()
+    await get_favorite_service(get_database()).ensure_indexes()
+    if settings.INVALIDATION_BUS_MODE != "off":
+        register_cache_invalidation()
+        invalidation_bus.start(get_database(), settings.INVALIDATION_BUS_MODE)
+    # 后台预热，完成前 /health 返回 503
+    if settings.WARMUP_ENABLED:
+        warmup_state.start(get_database())
+    else:
+        warm_static_payloads()
+        warmup_state.mark_ready()
     yield
     # Shutdown
+    await warmup_state.stop()
+    await invalidation_bus.stop()
+    await close_shared_state()
     await close_mongo_connection()
+    await loop_lag_monitor.stop()
+    reset_services()
+    shutdown_logging()
 
 def create_application() -> FastAPI:
     application = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -30,6 +62,18 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # 请求级身份映射（同一请求内重复读取的内容只查询一次）
+    application.add_middleware(IdentityMapMiddleware)
+    
+    # 响应压缩（超过阈值的响应才压缩，客户端需声明 Accept-Encoding: gzip）
+    application.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+    
+    # 请求耗时指标（按路由模板统计）
+    application.add_middleware(MetricsMiddleware)
+    
+    # 请求ID与追踪采样（最外层，覆盖其余中间件的日志）
+    application.add_middleware(RequestContextMiddleware)
+    
     # 注册路由
     application.include_router(
         users.router, 
@@ -96,8 +140,30 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    if not warmup_state.serving:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "message": "Energy Info System is warming up", "warmup": warmup_state.summary()}
+        )
     return {"status": "healthy", "message": "Energy Info System is running"}
 
+@app.get("/health/live", include_in_schema=False)
+async def liveness_check():
+    """存活探针：事件循环仍在调度"""
+    alive, report = liveness_report()
+    return ORJSONResponse(status_code=200 if alive else 503, content=report)
+
+@app.get("/health/ready", include_in_schema=False)
+async def readiness_check():
+    """就绪探针：MongoDB、连接池、事件循环延迟、预热、AI 后端熔断状态"""
+    ready, report = await readiness_report(db_manager.client)
+    return ORJSONResponse(status_code=200 if ready else 503, content=report)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 文本格式指标"""
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get(f"{settings.API_V1_STR}/health")
 async def api_health_check():
     return {"status": "healthy", "message": "Energy Info System API is running", "version": settings.VERSION}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
@@ -10,6 +10,14 @@ class UserFavorite(BaseModel):
     content_id: str = Field(..., description="文章ID")
     favorited_at: datetime = Field(default_factory=datetime.now, description="收藏时间")
     
+    # 文章内容快照（收藏时写入，管理员更新文章时同步刷新，列表/搜索无需关联content）
+    title: str = Field(default="", description="文章标题快照")
+    source: Optional[str] = Field(default=None, description="来源快照")
+    type: Optional[str] = Field(default=None, description="文章类型快照")
+    publish_date: Optional[str] = Field(default=None, description="发布日期快照")
+    link: Optional[str] = Field(default=None, description="原文链接快照")
+    content_deleted: bool = Field(default=False, description="文章是否已被删除")
+    
     # 收藏时文章的标签快照（用于标签学习）
     energy_type_tags: List[str] = Field(default=[], description="能源类型标签快照")
     region_tags: List[str] = Field(default=[], description="地域标签快照")
@@ -24,6 +32,16 @@ class UserFavorite(BaseModel):
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
+class UserFavoriteSummary(BaseModel):
+    """用户收藏汇总（随收藏/取消收藏原子维护）"""
+    user_id: str = Field(..., description="用户ID")
+    total_favorites: int = Field(default=0, description="总收藏数")
+    content_ids: List[str] = Field(default=[], description="已收藏的文章ID集合")
+    energy_type_interests: Dict[str, int] = Field(default={}, description="能源类型兴趣分布")
+    region_interests: Dict[str, int] = Field(default={}, description="地域兴趣分布")
+    last_activity: Optional[datetime] = Field(default=None, description="最后活动时间")
+    updated_at: datetime = Field(default_factory=datetime.now, description="更新时间")
+
 class UserBehaviorStats(BaseModel):
     """用户行为统计"""
     user_id: str = Field(..., description="用户ID")
@@ -41,4 +59,12 @@ class FavoriteResponse(BaseModel):
     success: bool = Field(..., description="操作是否成功")
     message: str = Field(..., description="操作结果消息")
     learned_tags: Optional[dict] = Field(default=None, description="新学习的标签")
-    total_favorites: int = Field(default=0, description="用户总收藏数") 
\ No newline at end of file
+    total_favorites: int = Field(default=0, description="用户总收藏数") 
+
+class FavoriteCheckRequest(BaseModel):
+    """批量检查收藏状态请求模型"""
+    content_ids: List[str] = Field(..., max_length=200, description="文章ID列表")
+
+class FavoriteCheckResponse(BaseModel):
+    """批量检查收藏状态响应模型"""
+    favorites: Dict[str, bool] = Field(default={}, description="文章ID到收藏状态的映射")
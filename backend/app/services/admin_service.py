@@ -2,12 +2,14 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from app.models.user import UserRole, AdminPermission, User, UserProfile
 from app.models.content import Content, ContentCreateRequest, ContentUpdateRequest, JsonArticle, CONTENT_TYPE_MAP
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.security import verify_password_async, create_access_token, get_password_hash
 from app.core.database import get_database
 from app.utils.region_mapper import RegionMapper
 from app.services.user_service import UserService
+from app.services.favorite_service import FavoriteService
 from app.utils.tag_processor import TagProcessor
 from app.core.config import settings
+from app.core.content_cache import hot_content_cache
 import logging
 import json
 import ast
@@ -36,10 +38,11 @@ BUILTIN_ADMIN_ACCOUNTS = {
 }
 
 class AdminService:
-    def __init__(self, db):
+    def __init__(self, db, favorite_service: Optional[FavoriteService] = None):
         self.db = db
         self.users_collection = db.users
         self.content_collection = db.content
+        self.favorite_service = favorite_service or FavoriteService(db)
         
     async def authenticate_admin(self, username: str, password: str) -> Optional[User]:
         """管理员认证 - 使用硬编码账户"""
@@ -61,7 +64,7 @@ class AdminService:
                 return None
             
             # 验证密码
-            if not verify_password(password, admin_account["password_hash"]):
+            if not await verify_password_async(password, admin_account["password_hash"]):
                 logger.warning(f"❌ 管理员密码错误: {username}")
                 return None
             
@@ -180,6 +183,7 @@ class AdminService:
             
             # 获取更新后的文章
             updated_article = await self.content_collection.find_one({"_id": ObjectId(article_id)})
+            await self._propagate_content_change(article_id, updated_article)
             updated_article["id"] = str(updated_article["_id"])
             content = Content(**updated_article)
             
@@ -202,6 +206,7 @@ class AdminService:
             result = await self.content_collection.delete_one({"_id": ObjectId(article_id)})
             
             if result.deleted_count > 0:
+                await self._propagate_content_change(article_id, None)
                 logger.info(f"管理员 {admin_id} 删除文章成功: {existing_article.get('title', 'Unknown')}")
                 return True
             else:
@@ -211,6 +216,16 @@ class AdminService:
             logger.error(f"删除文章失败: {str(e)}")
             raise Exception(f"删除文章失败: {str(e)}")
     
+    async def _propagate_content_change(self, article_id: str, article: Optional[Dict[str, Any]]):
+        """
+        文章变更后同步依赖该文章的派生数据（article为None表示已删除）
+        """
+        hot_content_cache.invalidate(ObjectId(article_id))
+        if article is None:
+            await self.favorite_service.mark_content_deleted(article_id)
+        else:
+            await self.favorite_service.refresh_content_snapshot(article_id, article)
+    
     def parse_json_tags(self, tag_string: Optional[str]) -> List[str]:
         """解析JSON字符串格式的标签（使用统一的TagProcessor）"""
         return TagProcessor.safe_parse_tags(tag_string)
@@ -313,6 +328,7 @@ class AdminService:
                                 {"_id": existing_article["_id"]},
                                 {"$set": content_dict}
                             )
+                            await self._propagate_content_change(str(existing_article["_id"]), content_dict)
                             updated_count += 1
                             logger.info(f"更新文章: {content_dict['title']}")
                         else:
@@ -1,4 +1,5 @@
 import httpx
+import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -10,6 +11,8 @@ from app.models.ai_chat import (
     ChatRequest, ChatResponse, ChatHistoryQuery
 )
 
+logger = logging.getLogger(__name__)
+
 class AIChatService:
     def __init__(self, db: AsyncIOMotorDatabase = None):
         self.db = db
@@ -166,7 +169,7 @@ class AIChatService:
             )
             
         except Exception as e:
-            print(f"AI聊天服务错误: {str(e)}")
+            logger.error("AI聊天服务错误: %s", str(e))
             return ChatResponse(
                 session_id=request.session_id,
                 assistant_name="AI助手",
@@ -203,7 +206,7 @@ class AIChatService:
             )
             return True
         except Exception as e:
-            print(f"保存助手消息失败: {str(e)}")
+            logger.error("保存助手消息失败: %s", str(e))
             return False
 
     async def save_user_message(self, session_id: str, user_message: str, user_id: Optional[str] = None, user_info: Optional[Dict[str, Any]] = None) -> bool:
@@ -235,7 +238,7 @@ class AIChatService:
             )
             return True
         except Exception as e:
-            print(f"保存用户消息失败: {str(e)}")
+            logger.error("保存用户消息失败: %s", str(e))
             return False
 
     async def get_session_history(self, session_id: str) -> Optional[ChatSession]:
@@ -302,8 +305,23 @@ class AIChatService:
         skip = (query.page - 1) * query.page_size
         cursor = self.collection.find(filter_dict).sort("updated_at", -1).skip(skip).limit(query.page_size)
         
+        session_docs = await cursor.to_list(length=query.page_size)
+        
+        # 一次查询取回本页会话涉及的用户名
+        usernames = {}
+        lookup_failed = False
+        user_ids = list({doc["user_id"] for doc in session_docs if doc.get("user_id")})
+        if user_ids:
+            database = self.db if self.db is not None else db_manager.database
+            try:
+                # 处理UUID格式的用户ID，而不是ObjectId
+                async for user_doc in database.users.find({"_id": {"$in": user_ids}}, {"username": 1}):
+                    usernames[user_doc["_id"]] = user_doc.get("username", "未知用户")
+            except Exception:
+                lookup_failed = True
+        
         sessions = []
-        async for session_doc in cursor:
+        for session_doc in session_docs:
             # 转换消息格式
             messages = []
             for msg in session_doc.get("messages", []):
@@ -313,26 +331,17 @@ class AIChatService:
                     timestamp=msg["timestamp"]
                 ))
             
-            # 获取用户名
+            # 获取用户名（用户表 > 会话中的 user_info）
             username = "匿名用户"
-            if session_doc.get("user_id"):
-                # 从用户表获取用户名
-                user_collection = self.db.users if self.db else db_manager.database.users
-                try:
-                    # 处理UUID格式的用户ID，而不是ObjectId
-                    user_doc = await user_collection.find_one({"_id": session_doc["user_id"]})
-                    if user_doc:
-                        username = user_doc.get("username", "未知用户")
-                    else:
-                        # 如果没找到，可能用户信息中包含用户名
-                        if session_doc.get("user_info") and session_doc["user_info"].get("username"):
-                            username = session_doc["user_info"]["username"]
-                except Exception as e:
-                    # 如果查询失败，尝试从user_info中获取用户名
-                    if session_doc.get("user_info") and session_doc["user_info"].get("username"):
-                        username = session_doc["user_info"]["username"]
-                    else:
-                        username = f"用户{session_doc['user_id'][:8]}"
+            user_id = session_doc.get("user_id")
+            if user_id:
+                user_info = session_doc.get("user_info") or {}
+                if user_id in usernames:
+                    username = usernames[user_id]
+                elif user_info.get("username"):
+                    username = user_info["username"]
+                elif lookup_failed:
+                    username = f"用户{user_id[:8]}"
             
             session = ChatSession(
                 id=str(session_doc["_id"]),
@@ -393,7 +402,7 @@ class AIChatService:
             result = await self.collection.delete_one({"session_id": session_id})
             return result.deleted_count > 0
         except Exception as e:
-            print(f"删除会话失败: {e}")
+            logger.error("删除会话失败: %s", e)
             return False
 
     async def batch_delete_sessions(self, session_ids: List[str]) -> int:
@@ -402,7 +411,7 @@ class AIChatService:
             result = await self.collection.delete_many({"session_id": {"$in": session_ids}})
             return result.deleted_count
         except Exception as e:
-            print(f"批量删除会话失败: {e}")
+            logger.error("批量删除会话失败: %s", e)
             return 0
 
     async def get_statistics(self) -> Dict[str, Any]:
@@ -1,6 +1,7 @@
 import httpx
 from typing import List, Dict, Any, Optional
 from app.core.config import settings
+from app.core.circuit_breaker import get_circuit_breaker
 from app.models.content import Content, ContentTag
 
 class AIIntegrationService:
@@ -11,7 +12,7 @@ class AIIntegrationService:
     async def generate_content_tags(self, content: Content) -> List[ContentTag]:
         """调用AI服务生成内容标签"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with get_circuit_breaker("ai_backend").call(), httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.post(
                     f"{self.base_url}/api/auto-tagging",
                     json={
@@ -21,9 +22,10 @@ class AIIntegrationService:
                     }
                 )
                 response.raise_for_status()
-                
-                ai_response = response.json()
-                return self._parse_ai_tags(ai_response)
+            
+            # 响应解析在熔断保护之外：格式异常或解析错误不计为后端故障
+            ai_response = response.json()
+            return self._parse_ai_tags(ai_response)
         except httpx.TimeoutException:
             raise Exception("AI service timeout")
         except httpx.HTTPStatusError as e:
@@ -110,7 +112,7 @@ class AIIntegrationService:
             
             config = assistant_configs[assistant_type]
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with get_circuit_breaker("ai_backend").call(), httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.post(
                     f"{self.base_url}/api/chat",
                     json={
@@ -121,7 +123,7 @@ class AIIntegrationService:
                     }
                 )
                 response.raise_for_status()
-                
-                return response.json()
+            
+            return response.json()
         except Exception as e:
             raise Exception(f"Failed to chat with assistant: {str(e)}") 
\ No newline at end of file
@@ -1,16 +1,31 @@
+import asyncio
 from typing import List, Optional, Dict, Any
 from pymongo.database import Database
 from bson import ObjectId
 from app.models.content import Content, ContentType
+from app.core.identity_map import get_identity_map, load_many
+from app.core.content_cache import hot_content_cache
+from app.core.config import settings
+from app.core.database import get_read_preference, max_time_options
+from app.core.shared_state import SharedStateError, get_shared_state
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+CONTENT_STATS_KEY = "content:stats"
+CONTENT_TAGS_KEY = "content:tags"
+
 class ContentService:
     def __init__(self, database: Database):
         self.db = database
         self.collection = self.db.content
+        # 推荐候选等只读查询（副本集可读从节点）
+        self.recommendation_collection = self.collection.with_options(
+            read_preference=get_read_preference(settings.MONGODB_RECOMMENDATION_READ_PREFERENCE)
+        )
+        self.query_max_time_ms = settings.MONGODB_QUERY_MAX_TIME_MS or None
+        self.recommendation_max_time_ms = settings.MONGODB_RECOMMENDATION_MAX_TIME_MS or None
 
     async def create_content(self, content: Content) -> Content:
         """创建内容"""
@@ -165,15 +180,75 @@ class ContentService:
         return type_mapping.get(chinese_type, "news")
 
     async def get_content_by_id(self, content_id: str) -> Optional[Content]:
-        """根据ID获取内容"""
+        """根据ID获取内容（同一请求内重复查询复用身份映射）"""
         try:
-            document = await self.collection.find_one({"_id": ObjectId(content_id)})
-            if document:
-                return self._map_document_to_content(document)
-            return None
+            object_id = ObjectId(content_id)
+            contents = await load_many("content", [object_id], self._load_contents)
+            return contents.get(object_id)
         except Exception as e:
             raise Exception(f"Failed to get content by id: {str(e)}")
 
+    async def get_contents_by_ids(
+        self,
+        content_ids: List[str],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Content]:
+        """
+        批量获取内容：一次 $in 查询，按输入顺序返回
+        
+        无效ID与不存在的内容被跳过，重复ID只返回一次。
+        projection 只取部分字段（如列表页不需要正文），未取的字段按映射默认值填充。
+        """
+        try:
+            object_ids = list(dict.fromkeys(
+                ObjectId(content_id) for content_id in content_ids if ObjectId.is_valid(content_id)
+            ))
+            if not object_ids:
+                return []
+            
+            if projection:
+                # 部分字段的对象单独缓存，避免被当作完整内容复用
+                namespace = "content:" + ",".join(f"{field}={value}" for field, value in sorted(projection.items()))
+                loader = lambda ids: self._load_contents(ids, projection)
+            else:
+                namespace, loader = "content", self._load_contents
+            
+            contents = await load_many(namespace, object_ids, loader)
+            return [contents[object_id] for object_id in object_ids if object_id in contents]
+        except Exception as e:
+            raise Exception(f"Failed to get contents by ids: {str(e)}")
+
+    async def _load_contents(
+        self,
+        object_ids: List[ObjectId],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Dict[ObjectId, Content]:
+        """按 _id 批量查询并映射（完整内容先查热门文章缓存）"""
+        if projection:
+            documents = await self.collection.find(
+                {"_id": {"$in": object_ids}}, projection, max_time_ms=self.query_max_time_ms
+            ).to_list(length=None)
+            return {document["_id"]: self._map_document_to_content(document) for document in documents}
+        
+        contents = hot_content_cache.get_many(object_ids)
+        missing = [object_id for object_id in object_ids if object_id not in contents]
+        if not missing:
+            return contents
+        
+        generation = hot_content_cache.generation()
+        if len(missing) == 1:
+            document = await self.collection.find_one({"_id": missing[0]}, max_time_ms=self.query_max_time_ms)
+            documents = [document] if document else []
+        else:
+            documents = await self.collection.find(
+                {"_id": {"$in": missing}}, max_time_ms=self.query_max_time_ms
+            ).to_list(length=None)
+        for document in documents:
+            content = self._map_document_to_content(document)
+            hot_content_cache.set(document["_id"], content, generation)
+            contents[document["_id"]] = content
+        return contents
+
     async def get_content_list(
         self,
         content_type: str = None,
@@ -218,7 +293,7 @@ class ContentService:
                 sort_order = -1
             
             contents = []
-            cursor = self.collection.find(query).sort([(sort_field, sort_order)]).skip(skip).limit(limit)
+            cursor = self.collection.find(query, max_time_ms=self.query_max_time_ms).sort([(sort_field, sort_order)]).skip(skip).limit(limit)
             
             async for document in cursor:
                 try:
@@ -269,11 +344,49 @@ class ContentService:
                 else:
                     query["$or"] = tag_queries
             
-            count = await self.collection.count_documents(query)
+            count = await self.collection.count_documents(query, **max_time_options(settings.MONGODB_QUERY_MAX_TIME_MS))
             return count
         except Exception as e:
             raise Exception(f"Failed to get content count: {str(e)}")
 
+    async def get_content_stats(self) -> Dict[str, int]:
+        """
+        内容总数与按类型统计
+        
+        结果写入共享状态（CONTENT_STATS_TTL_SECONDS），多个 worker 共用一份，
+        仪表盘每次加载不再各自执行4次 count。
+        """
+        return await self._get_shared_json(
+            CONTENT_STATS_KEY, settings.CONTENT_STATS_TTL_SECONDS, self.compute_content_stats, "内容统计"
+        )
+
+    async def _get_shared_json(self, key: str, ttl_seconds: float, compute, label: str):
+        """先读共享状态，未命中时计算并写入；共享状态不可用时直接计算"""
+        shared_state = get_shared_state()
+        try:
+            value = await shared_state.get_json(key)
+        except SharedStateError as e:
+            logger.warning(f"⚠️ 读取共享{label}失败，直接查询: {str(e)}")
+            return await compute()
+        
+        if value is None:
+            value = await compute()
+            try:
+                await shared_state.set_json(key, value, ttl_seconds)
+            except SharedStateError as e:
+                logger.warning(f"⚠️ 写入共享{label}失败: {str(e)}")
+        return value
+
+    async def compute_content_stats(self) -> Dict[str, int]:
+        """直接查询数据库计算内容统计"""
+        total, announcement, news, policy = await asyncio.gather(
+            self.get_content_count(),
+            self.get_content_count(content_type="announcement"),
+            self.get_content_count(content_type="news"),
+            self.get_content_count(content_type="policy")
+        )
+        return {"total": total, "announcement": announcement, "news": news, "policy": policy}
+
     async def get_search_count(
         self,
         keyword: str,
@@ -288,7 +401,13 @@ class ContentService:
         )
 
     async def get_all_tags(self) -> List[str]:
-        """获取所有可用的标签"""
+        """获取所有可用的标签（共享状态缓存 CONTENT_TAGS_TTL_SECONDS）"""
+        return await self._get_shared_json(
+            CONTENT_TAGS_KEY, settings.CONTENT_TAGS_TTL_SECONDS, self.compute_all_tags, "标签列表"
+        )
+
+    async def compute_all_tags(self) -> List[str]:
+        """聚合全部文章的标签（去重排序）"""
         try:
             pipeline = [
                 {
@@ -323,10 +442,15 @@ class ContentService:
     async def increment_view_count(self, content_id: str) -> None:
         """增加内容浏览次数"""
         try:
+            object_id = ObjectId(content_id)
             await self.collection.update_one(
-                {"_id": ObjectId(content_id)},
+                {"_id": object_id},
                 {"$inc": {"view_count": 1}}
             )
+            hot_content_cache.bump_view_count(object_id)
+            identity_map = get_identity_map()
+            if identity_map is not None:
+                identity_map.discard("content", object_id)
         except Exception as e:
             raise Exception(f"Failed to increment view count: {str(e)}")
 
@@ -375,7 +499,7 @@ class ContentService:
             
             contents = []
             # 🔥 修改排序字段：使用publish_date替代发布时间
-            cursor = self.collection.find(query).sort([("publish_date", -1)]).skip(skip).limit(limit)
+            cursor = self.collection.find(query, max_time_ms=self.query_max_time_ms).sort([("publish_date", -1)]).skip(skip).limit(limit)
             
             async for document in cursor:
                 try:
@@ -435,7 +559,9 @@ class ContentService:
             ]
             
             contents = []
-            async for document in self.collection.aggregate(pipeline):
+            async for document in self.recommendation_collection.aggregate(
+                pipeline, **max_time_options(settings.MONGODB_RECOMMENDATION_MAX_TIME_MS)
+            ):
                 try:
                     content = self._map_document_to_content(document)
                     contents.append(content)
@@ -489,7 +615,9 @@ class ContentService:
                 query = {"$and": tag_conditions}
             
             contents = []
-            cursor = self.collection.find(query).sort([("发布时间", -1)]).limit(limit)
+            cursor = self.recommendation_collection.find(
+                query, max_time_ms=self.recommendation_max_time_ms
+            ).sort([("发布时间", -1)]).limit(limit)
             
             async for document in cursor:
                 try:
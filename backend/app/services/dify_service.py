@@ -3,6 +3,7 @@ import json
 import logging
 from typing import Dict, Any, List
 from ..core.config import settings
+from ..core.circuit_breaker import get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -40,17 +41,23 @@ class DifyService:
                 "Content-Type": "application/json"
             }
             
-            # 发送请求
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.endpoint,
-                    json=request_data,
-                    headers=headers
-                )
-            
-            if response.status_code != 200:
-                logger.error(f"❌ Dify API调用失败: {response.status_code} - {response.text}")
-                raise Exception(f"Dify API调用失败: {response.status_code}")
+            # 发送请求（Dify 连续失败时熔断，直接返回空标签）
+            async with get_circuit_breaker("dify").call():
+                async with httpx.AsyncClient(timeout=60.0) as client:
+                    response = await client.post(
+                        self.endpoint,
+                        json=request_data,
+                        headers=headers
+                    )
+                
+                if response.status_code != 200:
+                    logger.error(f"❌ Dify API调用失败: {response.status_code} - {response.text}")
+                    # 携带 response，熔断器据此只把 5xx 计为失败
+                    raise httpx.HTTPStatusError(
+                        f"Dify API调用失败: {response.status_code}",
+                        request=response.request,
+                        response=response
+                    )
             
             result = response.json()
             logger.info(f"✅ Dify API调用成功，状态: {result.get('workflow_run_id', 'unknown')}")
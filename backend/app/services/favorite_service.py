@@ -1,43 +1,80 @@
+import asyncio
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import logging
 
-from app.models.user_behavior import UserFavorite, UserBehaviorStats, FavoriteResponse
+from app.models.user_behavior import UserFavorite, UserFavoriteSummary, UserBehaviorStats, FavoriteResponse
 from app.models.content import Content
-from app.models.user import UserTag, TagCategory, TagSource
+from app.models.user import UserTag, UserTags, TagCategory, TagSource
 from app.services.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
+# 收藏时读取的文章字段：标签用于学习，其余用于写入内容快照
+SNAPSHOT_PROJECTION = {
+    "title": 1,
+    "source": 1,
+    "type": 1,
+    "publish_date": 1,
+    "publish_time": 1,
+    "link": 1,
+    "energy_type_tags": 1,
+    "region_tags": 1,
+    "business_field_tags": 1
+}
+
+# 收藏列表/搜索返回的字段
+FAVORITE_LIST_PROJECTION = {
+    "content_id": 1,
+    "favorited_at": 1,
+    "title": 1,
+    "publish_date": 1,
+    "source": 1,
+    "type": 1,
+    "energy_type_tags": 1,
+    "region_tags": 1,
+    "business_field_tags": 1,
+    "link": 1
+}
+
+# 收藏汇总中维护的兴趣分布：汇总字段 -> 收藏记录中的标签字段
+INTEREST_FIELDS = {
+    "energy_type_interests": "energy_type_tags",
+    "region_interests": "region_tags"
+}
+
 class FavoriteService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, user_service: Optional[UserService] = None):
         self.db = db
         self.favorites_collection = db.user_favorites
+        self.summary_collection = db.user_favorite_summaries
         self.content_collection = db.content
-        self.user_service = UserService(db)
+        self.user_service = user_service or UserService(db)
     
     async def add_favorite(self, user_id: str, content_id: str) -> FavoriteResponse:
         """
         添加收藏并学习标签
         """
         try:
-            # 检查是否已经收藏
-            existing = await self.favorites_collection.find_one({
-                "user_id": user_id,
-                "content_id": content_id
-            })
-            
-            if existing:
-                return FavoriteResponse(
-                    success=False,
-                    message="文章已经收藏过了",
-                    total_favorites=await self.get_user_favorites_count(user_id)
-                )
+            # 文章标签和用户当前标签互不依赖，并发读取
+            content_doc, current_user_tags = await asyncio.gather(
+                self.content_collection.find_one(
+                    {"_id": ObjectId(content_id)},
+                    SNAPSHOT_PROJECTION
+                ),
+                self.user_service.get_user_tags(user_id),
+                return_exceptions=True
+            )
+            if isinstance(content_doc, Exception):
+                raise content_doc
+            if isinstance(current_user_tags, Exception):
+                logger.error(f"获取用户标签失败: {str(current_user_tags)}")
+                current_user_tags = None
             
-            # 获取文章内容
-            content_doc = await self.content_collection.find_one({"_id": ObjectId(content_id)})
             if not content_doc:
                 return FavoriteResponse(
                     success=False,
@@ -45,34 +82,55 @@ class FavoriteService:
                     total_favorites=await self.get_user_favorites_count(user_id)
                 )
             
-            # 创建收藏记录
+            # 创建收藏记录（标签学习成功后再标记 tags_learned）
+            now = datetime.now()
             favorite = UserFavorite(
                 user_id=user_id,
                 content_id=content_id,
-                energy_type_tags=content_doc.get("energy_type_tags", []),
-                region_tags=content_doc.get("region_tags", []),
-                business_field_tags=content_doc.get("business_field_tags", [])
+                favorited_at=now,
+                **self.build_content_snapshot(content_doc)
             )
             
-            # 保存收藏记录
-            result = await self.favorites_collection.insert_one(favorite.dict(exclude={"id"}))
+            # 🔥 查重与插入合并为一次upsert：已存在时不会写入
+            # 并发upsert可能同时走到插入，由 (user_id, content_id) 唯一索引拒绝后一个
+            try:
+                result = await self.favorites_collection.update_one(
+                    {"user_id": user_id, "content_id": content_id},
+                    {"$setOnInsert": favorite.dict(exclude={"id"})},
+                    upsert=True
+                )
+                upserted_id = result.upserted_id
+            except DuplicateKeyError:
+                upserted_id = None
+            
+            if upserted_id is None:
+                return FavoriteResponse(
+                    success=False,
+                    message="文章已经收藏过了",
+                    total_favorites=await self.get_user_favorites_count(user_id)
+                )
             
-            # 学习标签
-            learned_tags = await self._learn_tags_from_content(user_id, content_doc)
+            # 学习标签（一次原子更新），成功后记录学习状态
+            try:
+                learned_tags = await self._learn_tags_from_content(user_id, content_doc, current_user_tags)
+                await self.favorites_collection.update_one(
+                    {"_id": upserted_id},
+                    {"$set": {"tags_learned": True, "learned_at": datetime.now()}}
+                )
+            except Exception as e:
+                logger.error(f"学习标签失败: {str(e)}")
+                learned_tags = {"energy_types": [], "regions": [], "business_fields": []}
             
-            # 更新收藏记录的学习状态
-            await self.favorites_collection.update_one(
-                {"_id": result.inserted_id},
+            # 更新收藏汇总，同时拿到最新收藏总数
+            total_favorites = await self._update_favorite_summary(
+                {"user_id": user_id, "content_ids": {"$ne": content_id}},
                 {
-                    "$set": {
-                        "tags_learned": True,
-                        "learned_at": datetime.now()
-                    }
+                    "$inc": {"total_favorites": 1, **self._interest_increments(favorite.dict(), 1)},
+                    "$addToSet": {"content_ids": content_id},
+                    "$max": {"last_activity": now}
                 }
             )
             
-            total_favorites = await self.get_user_favorites_count(user_id)
-            
             return FavoriteResponse(
                 success=True,
                 message="收藏成功，已学习相关标签",
@@ -93,19 +151,27 @@ class FavoriteService:
         取消收藏（不删除已学习的标签）
         """
         try:
-            result = await self.favorites_collection.delete_one({
-                "user_id": user_id,
-                "content_id": content_id
-            })
+            # 取回被删除记录的标签快照，用于回退兴趣分布
+            deleted = await self.favorites_collection.find_one_and_delete(
+                {"user_id": user_id, "content_id": content_id},
+                projection=list(INTEREST_FIELDS.values())
+            )
             
-            if result.deleted_count == 0:
+            if deleted is None:
                 return FavoriteResponse(
                     success=False,
                     message="该文章未收藏或已取消收藏",
                     total_favorites=await self.get_user_favorites_count(user_id)
                 )
             
-            total_favorites = await self.get_user_favorites_count(user_id)
+            total_favorites = await self._update_favorite_summary(
+                {"user_id": user_id, "content_ids": content_id},
+                {
+                    "$inc": {"total_favorites": -1, **self._interest_increments(deleted, -1)},
+                    "$pull": {"content_ids": content_id},
+                    "$max": {"last_activity": datetime.now()}
+                }
+            )
             
             return FavoriteResponse(
                 success=True,
@@ -123,48 +189,17 @@ class FavoriteService:
     
     async def get_user_favorites(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """
-        获取用户收藏的文章列表
+        获取用户收藏的文章列表（读取收藏记录中的内容快照，无需关联content）
         """
         try:
-            # 聚合查询，关联文章内容
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$sort": {"favorited_at": -1}},
-                {"$limit": limit},
-                {
-                    "$addFields": {
-                        "content_object_id": {"$toObjectId": "$content_id"}
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "content",
-                        "localField": "content_object_id",
-                        "foreignField": "_id",
-                        "as": "content"
-                    }
-                },
-                {"$unwind": "$content"},
-                {
-                    "$project": {
-                        "content_id": 1,
-                        "favorited_at": 1,
-                        "title": "$content.title",
-                        "publish_date": {"$ifNull": ["$content.publish_date", "$content.publish_time"]},  # 优先使用publish_date字段
-                        "source": "$content.source",
-                        "type": "$content.type",
-                        "energy_type_tags": "$content.energy_type_tags",
-                        "region_tags": "$content.region_tags",
-                        "link": "$content.link"
-                    }
-                }
-            ]
+            cursor = self.favorites_collection.find(
+                {"user_id": user_id, "content_deleted": {"$ne": True}},
+                FAVORITE_LIST_PROJECTION
+            ).sort("favorited_at", -1).limit(limit)
             
-            cursor = self.favorites_collection.aggregate(pipeline)
-            favorites = []
-            async for doc in cursor:
+            favorites = await self._ensure_snapshots(await cursor.to_list(length=limit))
+            for doc in favorites:
                 doc["_id"] = str(doc["_id"])
-                favorites.append(doc)
             
             return favorites
             
@@ -177,71 +212,28 @@ class FavoriteService:
         搜索用户收藏的文章
         """
         try:
-            # 构建搜索条件
-            search_conditions = []
+            # 先按用户索引缩小范围，再匹配快照字段
+            search_filter = {"user_id": user_id, "content_deleted": {"$ne": True}}
             
             if query and query.strip():
                 query = query.strip()
                 # 构建文本搜索条件
-                text_search = {
-                    "$or": [
-                        {"content.title": {"$regex": query, "$options": "i"}},  # 标题搜索
-                        {"content.source": {"$regex": query, "$options": "i"}},  # 来源搜索
-                        {"content.energy_type_tags": {"$regex": query, "$options": "i"}},  # 能源类型搜索
-                        {"content.region_tags": {"$regex": query, "$options": "i"}},  # 地区搜索
-                        {"content.business_field_tags": {"$regex": query, "$options": "i"}},  # 业务领域搜索
-                    ]
-                }
-                search_conditions.append(text_search)
-            
-            # 聚合查询管道
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {
-                    "$addFields": {
-                        "content_object_id": {"$toObjectId": "$content_id"}
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "content",
-                        "localField": "content_object_id",
-                        "foreignField": "_id",
-                        "as": "content"
-                    }
-                },
-                {"$unwind": "$content"}
-            ]
-            
-            # 添加搜索条件
-            if search_conditions:
-                pipeline.append({"$match": {"$and": search_conditions}})
-            
-            # 添加排序和限制
-            pipeline.extend([
-                {"$sort": {"favorited_at": -1}},
-                {"$limit": limit},
-                {
-                    "$project": {
-                        "content_id": 1,
-                        "favorited_at": 1,
-                        "title": "$content.title",
-                        "publish_date": {"$ifNull": ["$content.publish_date", "$content.publish_time"]},
-                        "source": "$content.source",
-                        "type": "$content.type",
-                        "energy_type_tags": "$content.energy_type_tags",
-                        "region_tags": "$content.region_tags",
-                        "business_field_tags": "$content.business_field_tags",
-                        "link": "$content.link"
-                    }
-                }
-            ])
-            
-            cursor = self.favorites_collection.aggregate(pipeline)
-            favorites = []
-            async for doc in cursor:
+                search_filter["$or"] = [
+                    {"title": {"$regex": query, "$options": "i"}},  # 标题搜索
+                    {"source": {"$regex": query, "$options": "i"}},  # 来源搜索
+                    {"energy_type_tags": {"$regex": query, "$options": "i"}},  # 能源类型搜索
+                    {"region_tags": {"$regex": query, "$options": "i"}},  # 地区搜索
+                    {"business_field_tags": {"$regex": query, "$options": "i"}},  # 业务领域搜索
+                ]
+            
+            cursor = self.favorites_collection.find(
+                search_filter,
+                FAVORITE_LIST_PROJECTION
+            ).sort("favorited_at", -1).limit(limit)
+            
+            favorites = await self._ensure_snapshots(await cursor.to_list(length=limit))
+            for doc in favorites:
                 doc["_id"] = str(doc["_id"])
-                favorites.append(doc)
             
             logger.info(f"用户 {user_id} 搜索收藏: '{query}', 结果数量: {len(favorites)}")
             return favorites
@@ -250,29 +242,253 @@ class FavoriteService:
             logger.error(f"搜索用户收藏失败: {str(e)}")
             return []
     
+    @staticmethod
+    def build_content_snapshot(content_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """根据文章文档生成收藏记录中的内容快照"""
+        # 优先使用publish_date字段，缺失时由publish_time推导
+        publish_date = content_doc.get("publish_date")
+        if not publish_date:
+            publish_time = content_doc.get("publish_time")
+            publish_date = publish_time.strftime("%Y-%m-%d") if isinstance(publish_time, datetime) else publish_time
+        
+        return {
+            "title": content_doc.get("title") or "",
+            "source": content_doc.get("source"),
+            "type": content_doc.get("type"),
+            "publish_date": publish_date,
+            "link": content_doc.get("link"),
+            "energy_type_tags": content_doc.get("energy_type_tags") or [],
+            "region_tags": content_doc.get("region_tags") or [],
+            "business_field_tags": content_doc.get("business_field_tags") or []
+        }
+    
+    async def _ensure_snapshots(self, favorites: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        为缺少内容快照的旧收藏记录回填快照（一次$in查询 + 一次批量写入），文章已删除的记录被过滤
+        """
+        missing_ids = [doc["content_id"] for doc in favorites if "title" not in doc]
+        if not missing_ids:
+            return favorites
+        
+        object_ids = [ObjectId(content_id) for content_id in missing_ids if ObjectId.is_valid(content_id)]
+        snapshots = {}
+        async for content_doc in self.content_collection.find({"_id": {"$in": object_ids}}, SNAPSHOT_PROJECTION):
+            snapshots[str(content_doc["_id"])] = self.build_content_snapshot(content_doc)
+        
+        result = []
+        operations = []
+        for doc in favorites:
+            if "title" in doc:
+                result.append(doc)
+                continue
+            
+            snapshot = snapshots.get(doc["content_id"])
+            if snapshot is None:
+                # 与原$lookup行为一致：文章已不存在时不返回
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"content_deleted": True}}))
+                continue
+            
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": snapshot}))
+            doc.update(snapshot)
+            result.append(doc)
+        
+        if operations:
+            await self.favorites_collection.bulk_write(operations, ordered=False)
+        
+        return result
+    
+    async def refresh_content_snapshot(self, content_id: str, content_doc: Dict[str, Any]) -> int:
+        """
+        文章更新后刷新所有相关收藏记录中的内容快照
+        
+        标签变化会影响兴趣分布，受影响用户的汇总在下次读取时按收藏记录重建。
+        """
+        try:
+            result = await self.favorites_collection.update_many(
+                {"content_id": content_id},
+                {"$set": {**self.build_content_snapshot(content_doc), "content_deleted": False}}
+            )
+            if result.modified_count > 0:
+                await self.summary_collection.update_many(
+                    {"content_ids": content_id},
+                    {"$unset": {field: "" for field in INTEREST_FIELDS}}
+                )
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"刷新收藏内容快照失败: {str(e)}")
+            return 0
+    
+    async def mark_content_deleted(self, content_id: str) -> int:
+        """文章删除后标记相关收藏记录，列表与搜索不再返回"""
+        try:
+            result = await self.favorites_collection.update_many(
+                {"content_id": content_id},
+                {"$set": {"content_deleted": True}}
+            )
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"标记收藏文章删除失败: {str(e)}")
+            return 0
+    
+    async def ensure_indexes(self):
+        """创建收藏相关索引（列表/搜索按用户+收藏时间读取，快照刷新按文章ID定位）"""
+        try:
+            await self.favorites_collection.create_index([("user_id", 1), ("favorited_at", -1)])
+            await self.favorites_collection.create_index("content_id")
+            await self.summary_collection.create_index("user_id", unique=True)
+            await self.summary_collection.create_index("content_ids")
+            await self._ensure_unique_favorite_index()
+        except Exception as e:
+            logger.error(f"创建收藏索引失败: {str(e)}")
+    
+    async def _ensure_unique_favorite_index(self):
+        """(user_id, content_id) 唯一索引；创建前清理历史重复收藏（保留最早一条）"""
+        duplicates = self.favorites_collection.aggregate([
+            {"$sort": {"favorited_at": 1}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "content_id": "$content_id"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ], allowDiskUse=True)
+        removed = 0
+        async for group in duplicates:
+            result = await self.favorites_collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+            removed += result.deleted_count
+        if removed:
+            logger.warning(f"⚠️ 清理重复收藏记录 {removed} 条")
+        
+        # 旧版本创建的同名非唯一索引需先删除
+        indexes = await self.favorites_collection.index_information()
+        existing = indexes.get("user_id_1_content_id_1")
+        if existing is not None and not existing.get("unique"):
+            await self.favorites_collection.drop_index("user_id_1_content_id_1")
+        await self.favorites_collection.create_index([("user_id", 1), ("content_id", 1)], unique=True)
+    
     async def get_user_favorites_count(self, user_id: str) -> int:
-        """获取用户收藏总数"""
+        """获取用户收藏总数（读取收藏汇总）"""
         try:
-            return await self.favorites_collection.count_documents({"user_id": user_id})
+            summary = await self._get_favorite_summary(user_id)
+            return summary.get("total_favorites", 0)
         except Exception as e:
             logger.error(f"获取收藏总数失败: {str(e)}")
             return 0
     
     async def is_favorited(self, user_id: str, content_id: str) -> bool:
         """检查文章是否已收藏"""
+        favorites = await self.check_favorites(user_id, [content_id])
+        return favorites.get(content_id, False)
+    
+    async def check_favorites(self, user_id: str, content_ids: List[str]) -> Dict[str, bool]:
+        """
+        批量检查文章收藏状态（一次读取收藏汇总）
+        """
         try:
-            result = await self.favorites_collection.find_one({
-                "user_id": user_id,
-                "content_id": content_id
-            })
-            return result is not None
+            summary = await self._get_favorite_summary(user_id)
+            favorited_ids = set(summary.get("content_ids", []))
+            return {content_id: content_id in favorited_ids for content_id in content_ids}
         except Exception as e:
             logger.error(f"检查收藏状态失败: {str(e)}")
-            return False
+            return {content_id: False for content_id in content_ids}
+    
+    async def _get_favorite_summary(self, user_id: str) -> Dict[str, Any]:
+        """获取用户收藏汇总，缺失时根据收藏记录回填"""
+        summary = await self.summary_collection.find_one({"user_id": user_id})
+        if summary is None or "energy_type_interests" not in summary:
+            # 缺失或为旧版汇总（无兴趣分布）时重建
+            summary = await self._rebuild_favorite_summary(user_id)
+        return summary
+    
+    async def _update_favorite_summary(self, summary_filter: Dict[str, Any], update: Dict[str, Any]) -> int:
+        """
+        原子更新收藏汇总并返回最新收藏总数
+        
+        summary_filter 同时校验汇总与本次变更一致（如新增时文章ID尚不在集合中）；
+        汇总缺失或不一致时按收藏记录重建，保证计数可自愈。
+        """
+        user_id = summary_filter["user_id"]
+        try:
+            update.setdefault("$set", {})["updated_at"] = datetime.now()
+            summary = await self.summary_collection.find_one_and_update(
+                {**summary_filter, "energy_type_interests": {"$exists": True}},
+                update,
+                projection={"total_favorites": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if summary is None:
+                summary = await self._rebuild_favorite_summary(user_id)
+            return summary.get("total_favorites", 0)
+        except Exception as e:
+            logger.error(f"更新收藏汇总失败: {str(e)}")
+            return 0
+    
+    async def _rebuild_favorite_summary(self, user_id: str) -> Dict[str, Any]:
+        """根据收藏记录重建用户收藏汇总（$facet 一次扫描）"""
+        facets = {
+            "overview": [
+                {"$group": {
+                    "_id": None,
+                    "content_ids": {"$addToSet": "$content_id"},
+                    "last_activity": {"$max": "$favorited_at"}
+                }}
+            ]
+        }
+        for summary_field, tag_field in INTEREST_FIELDS.items():
+            facets[summary_field] = [
+                {"$unwind": f"${tag_field}"},
+                {"$group": {"_id": f"${tag_field}", "count": {"$sum": 1}}}
+            ]
+        
+        pipeline = [{"$match": {"user_id": user_id}}, {"$facet": facets}]
+        result = {}
+        async for doc in self.favorites_collection.aggregate(pipeline):
+            result = doc
+        
+        overview = result.get("overview") or [{}]
+        content_ids = overview[0].get("content_ids", [])
+        interests = {
+            summary_field: {
+                doc["_id"]: doc["count"]
+                for doc in result.get(summary_field, [])
+                if self._is_interest_key(doc["_id"])
+            }
+            for summary_field in INTEREST_FIELDS
+        }
+        
+        summary = UserFavoriteSummary(
+            user_id=user_id,
+            total_favorites=len(content_ids),
+            content_ids=content_ids,
+            last_activity=overview[0].get("last_activity"),
+            **interests
+        ).dict()
+        await self.summary_collection.replace_one({"user_id": user_id}, summary, upsert=True)
+        return summary
     
-    async def _learn_tags_from_content(self, user_id: str, content_doc: Dict) -> Dict[str, List[str]]:
+    def _interest_increments(self, favorite_doc: Dict[str, Any], delta: int) -> Dict[str, int]:
+        """根据收藏记录的标签快照生成兴趣分布的 $inc 字段"""
+        increments = {}
+        for summary_field, tag_field in INTEREST_FIELDS.items():
+            for tag in favorite_doc.get(tag_field) or []:
+                if self._is_interest_key(tag):
+                    path = f"{summary_field}.{tag}"
+                    increments[path] = increments.get(path, 0) + delta
+        return increments
+    
+    @staticmethod
+    def _is_interest_key(tag: Any) -> bool:
+        """标签可作为文档字段名（非空，且不含 . 或以 $ 开头）"""
+        return isinstance(tag, str) and bool(tag) and "." not in tag and not tag.startswith("$")
+    
+    async def _learn_tags_from_content(
+        self,
+        user_id: str,
+        content_doc: Dict,
+        current_user_tags: Optional[UserTags] = None
+    ) -> Dict[str, List[str]]:
         """
-        从收藏的文章中学习标签
+        从收藏的文章中学习标签（所有新标签合并为一次原子更新，失败时抛出异常）
         """
         learned_tags = {
             "energy_types": [],
@@ -280,63 +496,66 @@ class FavoriteService:
             "business_fields": []
         }
         
-        try:
-            # 获取当前用户标签
+        # 获取当前用户标签
+        if current_user_tags is None:
             current_user_tags = await self.user_service.get_user_tags(user_id)
-            if not current_user_tags:
-                return learned_tags
-            
-            # 当前用户已有的标签名称集合
-            existing_tag_names = {tag.name for tag in current_user_tags.tags}
-            
-            # 学习能源类型标签
-            energy_tags = content_doc.get("energy_type_tags", [])
-            for energy_tag in energy_tags:
-                if energy_tag and energy_tag not in existing_tag_names:
-                    # 添加新的能源类型标签，权重设为2.0（收藏行为权重）
-                    await self.user_service.add_user_tag(
-                        user_id=user_id,
-                        tag_name=energy_tag,
-                        category=TagCategory.ENERGY_TYPE,
-                        weight=2.0,
-                        source=TagSource.AI_GENERATED  # 标记为AI生成（基于收藏行为）
-                    )
-                    learned_tags["energy_types"].append(energy_tag)
-                    logger.info(f"用户 {user_id} 从收藏中学习能源标签: {energy_tag}")
-            
-            # 学习地域标签（城市和省份优先级较高）
-            region_tags = content_doc.get("region_tags", [])
-            for region_tag in region_tags:
-                if region_tag and region_tag not in existing_tag_names and region_tag != "全国":
-                    # 判断标签类型并设置相应权重
-                    category, weight = self._determine_region_category_and_weight(region_tag)
-                    
-                    await self.user_service.add_user_tag(
-                        user_id=user_id,
-                        tag_name=region_tag,
-                        category=category,
-                        weight=weight,
-                        source=TagSource.AI_GENERATED
-                    )
-                    learned_tags["regions"].append(region_tag)
-                    logger.info(f"用户 {user_id} 从收藏中学习地域标签: {region_tag} ({category.value})")
-            
-            # 学习业务领域标签（权重较低）
-            business_tags = content_doc.get("business_field_tags", [])
-            for business_tag in business_tags[:2]:  # 只学习前2个，避免标签过多
-                if business_tag and business_tag not in existing_tag_names:
-                    await self.user_service.add_user_tag(
-                        user_id=user_id,
-                        tag_name=business_tag,
-                        category=TagCategory.BUSINESS_FIELD,
-                        weight=1.0,  # 业务标签权重较低
-                        source=TagSource.AI_GENERATED
-                    )
-                    learned_tags["business_fields"].append(business_tag)
-                    logger.info(f"用户 {user_id} 从收藏中学习业务标签: {business_tag}")
-            
-        except Exception as e:
-            logger.error(f"学习标签失败: {str(e)}")
+        if not current_user_tags:
+            return learned_tags
+        
+        # 当前用户已有的标签名称集合
+        existing_tag_names = {tag.name for tag in current_user_tags.tags}
+        candidates = []  # (learned_tags分组, 新标签)
+        
+        # 学习能源类型标签，权重设为2.0（收藏行为权重）
+        energy_tags = content_doc.get("energy_type_tags", [])
+        for energy_tag in energy_tags:
+            if energy_tag and energy_tag not in existing_tag_names:
+                candidates.append(("energy_types", UserTag(
+                    category=TagCategory.ENERGY_TYPE,
+                    name=energy_tag,
+                    weight=2.0,
+                    source=TagSource.AI_GENERATED  # 标记为AI生成（基于收藏行为）
+                )))
+        
+        # 学习地域标签（城市和省份优先级较高）
+        region_tags = content_doc.get("region_tags", [])
+        for region_tag in region_tags:
+            if region_tag and region_tag not in existing_tag_names and region_tag != "全国":
+                # 判断标签类型并设置相应权重
+                category, weight = self._determine_region_category_and_weight(region_tag)
+                candidates.append(("regions", UserTag(
+                    category=category,
+                    name=region_tag,
+                    weight=weight,
+                    source=TagSource.AI_GENERATED
+                )))
+        
+        # 学习业务领域标签（权重较低）
+        business_tags = content_doc.get("business_field_tags", [])
+        for business_tag in business_tags[:2]:  # 只学习前2个，避免标签过多
+            if business_tag and business_tag not in existing_tag_names:
+                candidates.append(("business_fields", UserTag(
+                    category=TagCategory.BUSINESS_FIELD,
+                    name=business_tag,
+                    weight=1.0,  # 业务标签权重较低
+                    source=TagSource.AI_GENERATED
+                )))
+        
+        if not candidates:
+            return learned_tags
+        
+        added_tags = await self.user_service.add_user_tags(
+            user_id,
+            [tag for _, tag in candidates],
+            current_user_tags=current_user_tags
+        )
+        added_ids = {id(tag) for tag in added_tags}
+        
+        for group, tag in candidates:
+            if id(tag) in added_ids:
+                learned_tags[group].append(tag.name)
+        
+        logger.info(f"用户 {user_id} 从收藏中学习标签: {learned_tags}")
         
         return learned_tags
     
@@ -362,51 +581,27 @@ class FavoriteService:
     
     async def get_user_behavior_stats(self, user_id: str) -> UserBehaviorStats:
         """
-        获取用户行为统计
+        获取用户行为统计（直接读取收藏汇总中增量维护的兴趣分布）
         """
         try:
-            # 统计收藏总数
-            total_favorites = await self.get_user_favorites_count(user_id)
+            summary = await self._get_favorite_summary(user_id)
             
-            # 统计能源类型兴趣分布
-            energy_pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$unwind": "$energy_type_tags"},
-                {"$group": {"_id": "$energy_type_tags", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]
-            
-            energy_interests = {}
-            async for doc in self.favorites_collection.aggregate(energy_pipeline):
-                energy_interests[doc["_id"]] = doc["count"]
-            
-            # 统计地域兴趣分布
-            region_pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$unwind": "$region_tags"},
-                {"$group": {"_id": "$region_tags", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]
-            
-            region_interests = {}
-            async for doc in self.favorites_collection.aggregate(region_pipeline):
-                region_interests[doc["_id"]] = doc["count"]
-            
-            # 获取最后活动时间
-            last_favorite = await self.favorites_collection.find_one(
-                {"user_id": user_id},
-                sort=[("favorited_at", -1)]
-            )
-            last_activity = last_favorite["favorited_at"] if last_favorite else None
+            def sorted_interests(interests: Dict[str, int]) -> Dict[str, int]:
+                # 按次数降序，去掉取消收藏后归零的标签
+                return dict(sorted(
+                    ((tag, count) for tag, count in (interests or {}).items() if count > 0),
+                    key=lambda item: item[1],
+                    reverse=True
+                ))
             
             return UserBehaviorStats(
                 user_id=user_id,
-                total_favorites=total_favorites,
-                energy_type_interests=energy_interests,
-                region_interests=region_interests,
-                last_activity=last_activity
+                total_favorites=summary.get("total_favorites", 0),
+                energy_type_interests=sorted_interests(summary.get("energy_type_interests")),
+                region_interests=sorted_interests(summary.get("region_interests")),
+                last_activity=summary.get("last_activity")
             )
             
         except Exception as e:
             logger.error(f"获取用户行为统计失败: {str(e)}")
-            return UserBehaviorStats(user_id=user_id) 
\ No newline at end of file
+            return UserBehaviorStats(user_id=user_id)
@@ -1,16 +1,79 @@
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Optional
 from pymongo.database import Database
 from datetime import datetime, timedelta
 from app.models.user import UserTags, UserTag
 from app.models.content import Content
 from app.services.user_service import UserService
 from app.services.content_service import ContentService
+from app.core.config import settings
+from app.core.database import max_time_options
+from app.core.metrics import StageTimer
+from app.core.logging_config import get_trace_logger
+
+logger = get_trace_logger(__name__)
+
+class RecommendationExplainer:
+    """
+    推荐解释收集器（explain=true 或请求被追踪采样时由接口层创建并传入）
+    
+    记录每篇内容来自哪一层、匹配标签与逐标签得分、奖励、时间因子，以及各阶段耗时与候选集规模。
+    未传入时推荐流程不做任何额外计算。
+    """
+    
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.candidate_counts: Dict[str, int] = {}  # 各层查询取回的候选数（去重、截断前）
+        self.selected_counts: Dict[str, int] = {}  # 各层最终选入的内容数
+        self.user_tag_count: Optional[int] = None
+        self.stage_timings: Dict[str, float] = {}
+    
+    def item(self, content_id: str) -> Dict[str, Any]:
+        return self.items.setdefault(content_id, {})
+    
+    def record_candidates(self, tier: str, count: int):
+        """累计某层查询取回的候选数"""
+        self.candidate_counts[tier] = self.candidate_counts.get(tier, 0) + count
+    
+    def record_tier(self, contents: List[Content], tier: str):
+        """记录内容来源层级（已记录的内容保持首次来源）"""
+        added = 0
+        for content in contents:
+            item = self.item(content.id)
+            if "tier" not in item:
+                item["tier"] = tier
+                added += 1
+        self.selected_counts[tier] = self.selected_counts.get(tier, 0) + added
+    
+    def to_dict(self, recommendations: List[Content]) -> Dict[str, Any]:
+        return {
+            "pipeline": self.pipeline,
+            "stage_timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stage_timings.items()},
+            "user_tag_count": self.user_tag_count,
+            "candidate_counts": self.candidate_counts,
+            "selected_counts": self.selected_counts,
+            "items": [
+                {
+                    "content_id": content.id,
+                    "title": content.title,
+                    "relevance_score": content.relevance_score,
+                    **self.items.get(content.id, {})
+                }
+                for content in recommendations
+            ]
+        }
 
 class RecommendationService:
-    def __init__(self, database: Database):
+    def __init__(
+        self,
+        database: Database,
+        user_service: Optional[UserService] = None,
+        content_service: Optional[ContentService] = None
+    ):
         self.db = database
-        self.user_service = UserService(database)
-        self.content_service = ContentService(database)
+        self.user_service = user_service or UserService(database)
+        self.content_service = content_service or ContentService(database)
         self.user_behavior_collection = self.db.user_behavior
 
     async def get_user_recommendations(
@@ -30,17 +93,17 @@ class RecommendationService:
                     user_tags = await self.user_service.ensure_user_has_tags(user_id)
                 except:
                     # 如果仍然无法获取标签，返回最新内容
-                    print(f"用户 {user_id} 无法获取标签，返回最新内容")
+                    logger.debug("用户 %s 无法获取标签，返回最新内容", user_id)
                     return await self.content_service.get_content_list(skip=skip, limit=limit)
             
-            print(f"🎯 推荐服务为用户 {user_id} 找到 {len(user_tags.tags)} 个标签")
+            logger.debug("🎯 推荐服务为用户 %s 找到 %s 个标签", user_id, len(user_tags.tags))
             
             # 基于用户行为调整标签权重
             adjusted_tags = await self.adjust_tag_weights_by_behavior(user_id, user_tags.tags)
             
             # 提取用户所有标签名称
             tag_names = [tag.name for tag in adjusted_tags]
-            print(f"📋 推荐服务使用标签: {tag_names}")
+            logger.debug("📋 推荐服务使用标签: %s", tag_names)
             
             # 根据用户标签获取推荐内容
             recommended_content = await self.content_service.get_content_by_user_tags(
@@ -49,7 +112,7 @@ class RecommendationService:
                 limit=limit
             )
             
-            print(f"📊 根据标签找到 {len(recommended_content)} 条匹配内容")
+            logger.debug("📊 根据标签找到 %s 条匹配内容", len(recommended_content))
             
             # 计算相关性分数（使用优化的权重分级系统）
             for content in recommended_content:
@@ -63,7 +126,7 @@ class RecommendationService:
             
             return recommended_content
         except Exception as e:
-            print(f"❌ 推荐服务错误: {str(e)}")
+            logger.error("❌ 推荐服务错误: %s", str(e))
             raise Exception(f"Failed to get user recommendations: {str(e)}")
 
     async def record_user_behavior(
@@ -105,7 +168,7 @@ class RecommendationService:
             behaviors = await self.user_behavior_collection.find({
                 "user_id": user_id,
                 "timestamp": {"$gte": thirty_days_ago}
-            }).to_list(length=None)
+            }, max_time_ms=self.content_service.query_max_time_ms).to_list(length=None)
             
             if not behaviors:
                 return user_tags
@@ -113,8 +176,14 @@ class RecommendationService:
             # 统计每个标签的行为次数
             tag_behavior_counts = {}
             
+            # 一次批量取回行为涉及的全部内容
+            contents = await self.content_service.get_contents_by_ids(
+                [behavior["content_id"] for behavior in behaviors]
+            )
+            contents_by_id = {content.id: content for content in contents}
+            
             for behavior in behaviors:
-                content = await self.content_service.get_content_by_id(behavior["content_id"])
+                content = contents_by_id.get(behavior["content_id"])
                 if not content:
                     continue
                     
@@ -178,7 +247,7 @@ class RecommendationService:
             recent_behaviors = await self.user_behavior_collection.find({
                 "user_id": user_id,
                 "timestamp": {"$gte": seven_days_ago}
-            }).to_list(length=None)
+            }, max_time_ms=self.content_service.query_max_time_ms).to_list(length=None)
             
             # 统计各类行为
             behavior_stats = {
@@ -191,6 +260,12 @@ class RecommendationService:
             total_reading_time = 0
             content_types = {}
             
+            contents = await self.content_service.get_contents_by_ids(
+                [behavior["content_id"] for behavior in recent_behaviors],
+                projection={"type": 1, "文档类型": 1}
+            )
+            contents_by_id = {content.id: content for content in contents}
+            
             for behavior in recent_behaviors:
                 action = behavior.get('action', 'view')
                 if action in behavior_stats:
@@ -200,7 +275,7 @@ class RecommendationService:
                     total_reading_time += behavior['duration']
                 
                 # 统计浏览的内容类型
-                content = await self.content_service.get_content_by_id(behavior["content_id"])
+                content = contents_by_id.get(behavior["content_id"])
                 if content:
                     content_type = content.type
                     content_types[content_type] = content_types.get(content_type, 0) + 1
@@ -239,9 +314,14 @@ class RecommendationService:
     async def calculate_content_relevance_score_v2(
         self,
         user_tags: UserTags,
-        content: Content
+        content: Content,
+        explanation: Optional[Dict[str, Any]] = None
     ) -> float:
-        """计算内容与用户的相关性分数V2 - 标签权重优先，时间调节"""
+        """
+        计算内容与用户的相关性分数V2 - 标签权重优先，时间调节
+        
+        explanation 不为 None 时写入匹配标签、逐标签得分、奖励与时间因子。
+        """
         
         if not user_tags or not user_tags.tags:
             return 0.0
@@ -265,6 +345,9 @@ class RecommendationService:
             "importance": 0.6       # 重要性标签
         }
         
+        if explanation is not None:
+            explanation["contributions"] = []
+        
         # 计算标签权重分数
         total_score = 0.0
         matched_tags = 0
@@ -291,26 +374,39 @@ class RecommendationService:
                 if tag_weight > highest_tag_weight:
                     highest_tag_weight = tag_weight
                 
+                if explanation is not None:
+                    explanation["contributions"].append({
+                        "tag": tag_name,
+                        "category": tag_category,
+                        "weight": tag_weight,
+                        "multiplier": multiplier,
+                        "score": tag_score
+                    })
+                
                 # 🎯 记录能源类型匹配
                 if tag_category == "energy_type":
                     energy_type_matched = True
                     energy_type_score = tag_score
-                    print(f"🔍 能源标签权重计算: {tag_name} = {tag_weight} × {multiplier} = {tag_score}")
+                    logger.debug("🔍 能源标签权重计算: %s = %s × %s = %s", tag_name, tag_weight, multiplier, tag_score)
                 
                 total_score += tag_score
         
+        base_score = total_score
+        precision_bonus = 0.0
+        super_precision_bonus = 0.0
+        
         # 🎯 精准标签匹配奖励系统
         if energy_type_matched and highest_tag_weight >= 4.0:
             # 高权重能源类型标签额外奖励
             precision_bonus = energy_type_score * 0.8  # 🔥 提升到80%精准匹配奖励
             total_score += precision_bonus
-            print(f"🎯 精准能源标签奖励: +{precision_bonus:.2f} (总分: {total_score:.2f})")
+            logger.debug("🎯 精准能源标签奖励: +%.2f (总分: %.2f)", precision_bonus, total_score)
             
             # 🎯 能源类型优先权：如果用户有高权重能源标签且内容精准匹配，额外奖励
             if highest_tag_weight >= 5.0:
                 super_precision_bonus = energy_type_score * 0.3  # 30%超级精准奖励
                 total_score += super_precision_bonus
-                print(f"🔥 超级精准能源标签奖励: +{super_precision_bonus:.2f} (总分: {total_score:.2f})")
+                logger.debug("🔥 超级精准能源标签奖励: +%.2f (总分: %.2f)", super_precision_bonus, total_score)
         
         # 🎯 权重优先逻辑：标签权重分层 + 时间调节
         if highest_tag_weight >= 4.0:
@@ -326,6 +422,17 @@ class RecommendationService:
             time_factor = self._calculate_time_factor(content.publish_time) if hasattr(content, 'publish_time') and content.publish_time else 1.0
             final_score = total_score * time_factor  # 传统的时间权重
         
+        if explanation is not None:
+            explanation.update({
+                "matched_tags": [item["tag"] for item in explanation["contributions"]],
+                "base_score": base_score,
+                "bonuses": {"precision": precision_bonus, "super_precision": super_precision_bonus},
+                "highest_tag_weight": highest_tag_weight,
+                "weight_band": "high" if highest_tag_weight >= 4.0 else "medium" if highest_tag_weight >= 2.0 else "low",
+                "time_factor": time_factor,
+                "final_score": final_score
+            })
+        
         return final_score
 
     def _calculate_time_factor_light(self, publish_time: str) -> float:
@@ -389,7 +496,9 @@ class RecommendationService:
             ]
             
             contents = []
-            async for document in self.content_service.collection.aggregate(pipeline):
+            async for document in self.content_service.recommendation_collection.aggregate(
+                pipeline, **max_time_options(settings.MONGODB_RECOMMENDATION_MAX_TIME_MS)
+            ):
                 document['id'] = str(document['_id'])
                 contents.append(Content(**document))
             
@@ -457,7 +566,7 @@ class RecommendationService:
                         "total_secondary": 0
                     }
             
-            print(f"🎯 分级推荐为用户 {user_id} 处理 {len(user_tags.tags)} 个标签")
+            logger.debug("🎯 分级推荐为用户 %s 处理 %s 个标签", user_id, len(user_tags.tags))
             
             # 分离一级和二级权重标签
             primary_tags = []  # 地域、能源类型
@@ -469,8 +578,8 @@ class RecommendationService:
                 else:
                     secondary_tags.append(tag.name)
             
-            print(f"📍 一级权重标签（地域+能源）: {primary_tags}")
-            print(f"📋 二级权重标签（业务+政策等）: {secondary_tags}")
+            logger.debug("📍 一级权重标签（地域+能源）: %s", primary_tags)
+            logger.debug("📋 二级权重标签（业务+政策等）: %s", secondary_tags)
             
             # 获取精准推荐（基于一级权重标签）
             primary_recommendations = []
@@ -515,7 +624,7 @@ class RecommendationService:
                 
                 secondary_recommendations.sort(key=lambda x: x.relevance_score or 0, reverse=True)
             
-            print(f"✅ 分级推荐完成: 精准{len(primary_recommendations)}篇，扩展{len(secondary_recommendations)}篇")
+            logger.debug("✅ 分级推荐完成: 精准%s篇，扩展%s篇", len(primary_recommendations), len(secondary_recommendations))
             
             return {
                 "primary_recommendations": primary_recommendations,
@@ -527,7 +636,7 @@ class RecommendationService:
             }
             
         except Exception as e:
-            print(f"❌ 分级推荐服务错误: {str(e)}")
+            logger.error("❌ 分级推荐服务错误: %s", str(e))
             raise Exception(f"Failed to get tiered recommendations: {str(e)}")
 
     async def calculate_primary_relevance_score(
@@ -619,7 +728,8 @@ class RecommendationService:
         self,
         user_id: str,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        explainer: Optional[RecommendationExplainer] = None
     ) -> List[Content]:
         """
         🔥 智能推荐算法：精准权重匹配优先 + 时间排序
@@ -634,12 +744,14 @@ class RecommendationService:
             user_id: 用户ID
             skip: 跳过数量
             limit: 返回数量限制
+            explainer: 推荐解释收集器（可选）
             
         Returns:
             List[Content]: 智能推荐的内容列表
         """
         try:
-            print(f"🧠 开始智能推荐 - 用户: {user_id}")
+            stages = StageTimer("smart")
+            logger.debug("🧠 开始智能推荐 - 用户: %s", user_id)
             
             # 获取用户标签
             user_tags = await self.user_service.get_user_tags(user_id)
@@ -648,88 +760,112 @@ class RecommendationService:
                 try:
                     user_tags = await self.user_service.ensure_user_has_tags(user_id)
                 except:
-                    print(f"❌ 用户 {user_id} 无标签，返回最新内容")
+                    logger.error("❌ 用户 %s 无标签，返回最新内容", user_id)
                     return await self.content_service.get_content_list(skip=skip, limit=limit)
             
-            print(f"🏷️ 用户标签数量: {len(user_tags.tags)}")
+            logger.debug("🏷️ 用户标签数量: %s", len(user_tags.tags))
+            stages.lap("tag_fetch")
             
             # 根据用户行为调整标签权重
             adjusted_tags = await self.adjust_tag_weights_by_behavior(user_id, user_tags.tags)
             
             # 按标签权重排序，权重高的优先
             adjusted_tags.sort(key=lambda x: x.weight, reverse=True)
+            stages.lap("behavior_adjust")
+            if explainer:
+                explainer.user_tag_count = len(adjusted_tags)
             
             # 🔥 分层推荐策略
             recommendations = []
             used_content_ids = set()
             
-            print(f"🎯 开始分层推荐，初始used_content_ids: {len(used_content_ids)}")
+            logger.debug("🎯 开始分层推荐，初始used_content_ids: %s", len(used_content_ids))
             
             # 第一层：最高权重标签精准匹配（权重 >= 4.0）
             high_weight_tags = [tag for tag in adjusted_tags if tag.weight >= 4.0]
             if high_weight_tags:
-                print(f"🔥 第一层：高权重标签 ({len(high_weight_tags)}个)")
+                logger.debug("🔥 第一层：高权重标签 (%s个)", len(high_weight_tags))
                 for tag in high_weight_tags:
-                    print(f"   🏷️ {tag.name} (权重: {tag.weight})")
+                    logger.debug("   🏷️ %s (权重: %s)", tag.name, tag.weight)
                 
-                print(f"🔍 第一层前used_content_ids: {used_content_ids}")
+                logger.debug("🔍 第一层前used_content_ids: %s", used_content_ids)
                 first_tier = await self._get_precise_content_by_tags(
                     high_weight_tags,
                     used_content_ids,
-                    max_per_tag=3  # 每个高权重标签最多3篇
+                    max_per_tag=3,  # 每个高权重标签最多3篇
+                    explainer=explainer,
+                    tier="tier1"
                 )
                 recommendations.extend(first_tier)
-                print(f"🔍 第一层后used_content_ids: {used_content_ids}")
-                print(f"   ✅ 第一层推荐: {len(first_tier)}篇")
+                if explainer:
+                    explainer.record_tier(first_tier, "tier1")
+                stages.lap("tier1_fetch")
+                logger.debug("🔍 第一层后used_content_ids: %s", used_content_ids)
+                logger.debug("   ✅ 第一层推荐: %s篇", len(first_tier))
             
             # 第二层：中等权重标签匹配（权重 2.0-4.0）
             if len(recommendations) < limit:
                 medium_weight_tags = [tag for tag in adjusted_tags if 2.0 <= tag.weight < 4.0]
                 if medium_weight_tags:
-                    print(f"🟡 第二层：中权重标签 ({len(medium_weight_tags)}个)")
+                    logger.debug("🟡 第二层：中权重标签 (%s个)", len(medium_weight_tags))
                     
-                    print(f"🔍 第二层前used_content_ids: {used_content_ids}")
+                    logger.debug("🔍 第二层前used_content_ids: %s", used_content_ids)
                     second_tier = await self._get_precise_content_by_tags(
                         medium_weight_tags,
                         used_content_ids,
-                        max_per_tag=2  # 每个中权重标签最多2篇
+                        max_per_tag=2,  # 每个中权重标签最多2篇
+                        explainer=explainer,
+                        tier="tier2"
                     )
                     recommendations.extend(second_tier)
-                    print(f"🔍 第二层后used_content_ids: {used_content_ids}")
-                    print(f"   ✅ 第二层推荐: {len(second_tier)}篇")
+                    if explainer:
+                        explainer.record_tier(second_tier, "tier2")
+                    stages.lap("tier2_fetch")
+                    logger.debug("🔍 第二层后used_content_ids: %s", used_content_ids)
+                    logger.debug("   ✅ 第二层推荐: %s篇", len(second_tier))
             
             # 第三层：低权重标签匹配（权重 < 2.0）
             if len(recommendations) < limit:
                 low_weight_tags = [tag for tag in adjusted_tags if tag.weight < 2.0]
                 if low_weight_tags:
-                    print(f"🔵 第三层：低权重标签 ({len(low_weight_tags)}个)")
+                    logger.debug("🔵 第三层：低权重标签 (%s个)", len(low_weight_tags))
                     
-                    print(f"🔍 第三层前used_content_ids: {used_content_ids}")
+                    logger.debug("🔍 第三层前used_content_ids: %s", used_content_ids)
                     third_tier = await self._get_precise_content_by_tags(
                         low_weight_tags,
                         used_content_ids,
-                        max_per_tag=1  # 每个低权重标签最多1篇
+                        max_per_tag=1,  # 每个低权重标签最多1篇
+                        explainer=explainer,
+                        tier="tier3"
                     )
                     recommendations.extend(third_tier)
-                    print(f"🔍 第三层后used_content_ids: {used_content_ids}")
-                    print(f"   ✅ 第三层推荐: {len(third_tier)}篇")
+                    if explainer:
+                        explainer.record_tier(third_tier, "tier3")
+                    stages.lap("tier3_fetch")
+                    logger.debug("🔍 第三层后used_content_ids: %s", used_content_ids)
+                    logger.debug("   ✅ 第三层推荐: %s篇", len(third_tier))
             
             # 第四层：如果还不够，补充最新内容
             if len(recommendations) < limit:
-                print(f"📰 第四层：补充最新内容")
+                logger.debug("📰 第四层：补充最新内容")
                 remaining_limit = limit - len(recommendations)
                 latest_content = await self.content_service.get_content_list(
                     skip=0, 
                     limit=remaining_limit * 2  # 多取一些用于过滤
                 )
+                if explainer:
+                    explainer.record_candidates("latest", len(latest_content))
                 
                 # 过滤掉已推荐的内容
                 for content in latest_content:
                     if content.id not in used_content_ids and len(recommendations) < limit:
                         recommendations.append(content)
                         used_content_ids.add(content.id)
+                        if explainer:
+                            explainer.record_tier([content], "latest")
                 
-                print(f"   ✅ 第四层补充: {len(recommendations) - len(recommendations)}篇")
+                logger.debug("   ✅ 第四层补充: %s篇", len(recommendations) - len(recommendations))
+                stages.lap("latest_fill")
             
             # 应用分页
             if skip > 0:
@@ -739,58 +875,63 @@ class RecommendationService:
             # 为每个推荐内容计算最终相关性分数
             for content in recommendations:
                 content.relevance_score = await self.calculate_content_relevance_score_v2(
-                    user_tags, content
+                    user_tags, content,
+                    explanation=explainer.item(content.id) if explainer else None
                 )
             
             # 🎯 关键修改：按相关性分数重新排序整个推荐列表
             recommendations.sort(key=lambda x: x.relevance_score or 0, reverse=True)
+            stages.lap("scoring")
             
-            print(f"🎯 智能推荐完成: 返回 {len(recommendations)} 篇内容")
+            logger.debug("🎯 智能推荐完成: 返回 %s 篇内容", len(recommendations))
             
-            # 输出推荐内容的标签匹配情况
-            for i, content in enumerate(recommendations[:5]):  # 只显示前5篇
-                content_tags = self._get_all_content_tags(content)
-                matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
-                print(f"   📄 {i+1}. {content.title[:50]}...")
-                print(f"       🏷️ 匹配标签: {matched_user_tags}")
-                print(f"       ⭐ 相关性: {content.relevance_score:.2f}")
-                print(f"       📅 时间: {content.publish_time}")
+            # 输出推荐内容的标签匹配情况（仅调试/追踪时计算）
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, content in enumerate(recommendations[:5]):  # 只显示前5篇
+                    content_tags = self._get_all_content_tags(content)
+                    matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
+                    logger.debug("   📄 %s. %s...", i + 1, content.title[:50])
+                    logger.debug("       🏷️ 匹配标签: %s", matched_user_tags)
+                    logger.debug("       ⭐ 相关性: %.2f", content.relevance_score)
+                    logger.debug("       📅 时间: %s", content.publish_time)
             
             # 🎯 推荐服务层最终去重保障（在排序后）
             unique_recommendations = []
             seen_ids = set()
             
-            print(f"🔍 推荐服务层最终去重: 输入 {len(recommendations)} 条推荐")
+            logger.debug("🔍 推荐服务层最终去重: 输入 %s 条推荐", len(recommendations))
             
             for i, content in enumerate(recommendations):
                 content_id = content.id
                 if content_id not in seen_ids:
                     unique_recommendations.append(content)
                     seen_ids.add(content_id)
-                    print(f"   ✅ 保留第{i+1}条: {content.title[:30]}... (ID: {content_id})")
+                    logger.debug("   ✅ 保留第%s条: %s... (ID: %s)", i + 1, content.title[:30], content_id)
                 else:
-                    print(f"   ❌ 推荐服务层去重：跳过第{i+1}条重复内容: {content.title[:30]}... (ID: {content_id})")
+                    logger.debug("   ❌ 推荐服务层去重：跳过第%s条重复内容: %s... (ID: %s)", i + 1, content.title[:30], content_id)
             
             final_recommendations = unique_recommendations
-            print(f"🎯 推荐服务层去重完成: {len(recommendations)} → {len(final_recommendations)} 条唯一推荐")
-            
-            print(f"🎯 智能推荐完成: 返回 {len(final_recommendations)} 篇内容")
-            
-            # 输出推荐内容的标签匹配情况
-            for i, content in enumerate(final_recommendations[:3]):  # 只显示前3篇
-                content_tags = self._get_all_content_tags(content)
-                matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
-                print(f"   📄 {i+1}. {content.title[:50]}...")
-                print(f"       🏷️ 匹配标签: {matched_user_tags}")
-                print(f"       ⭐ 相关性: {content.relevance_score:.2f}")
-                print(f"       📅 时间: {content.publish_time}")
+            stages.lap("dedup")
+            if explainer:
+                explainer.stage_timings = stages.timings
+            logger.debug("🎯 推荐服务层去重完成: %s → %s 条唯一推荐", len(recommendations), len(final_recommendations))
+            
+            logger.debug("🎯 智能推荐完成: 返回 %s 篇内容", len(final_recommendations))
+            
+            # 输出推荐内容的标签匹配情况（仅调试/追踪时计算）
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, content in enumerate(final_recommendations[:3]):  # 只显示前3篇
+                    content_tags = self._get_all_content_tags(content)
+                    matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
+                    logger.debug("   📄 %s. %s...", i + 1, content.title[:50])
+                    logger.debug("       🏷️ 匹配标签: %s", matched_user_tags)
+                    logger.debug("       ⭐ 相关性: %.2f", content.relevance_score)
+                    logger.debug("       📅 时间: %s", content.publish_time)
             
             return final_recommendations
             
         except Exception as e:
-            print(f"❌ 智能推荐失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 智能推荐失败: %s", str(e))
             # 回退到普通推荐
             return await self.get_user_recommendations(user_id, skip, limit)
 
@@ -798,7 +939,9 @@ class RecommendationService:
         self,
         tags: List[UserTag],
         used_content_ids: set,
-        max_per_tag: int = 2
+        max_per_tag: int = 2,
+        explainer: Optional[RecommendationExplainer] = None,
+        tier: str = ""
     ) -> List[Content]:
         """
         🎯 根据标签精准获取内容
@@ -814,7 +957,7 @@ class RecommendationService:
         content_list = []
         
         for tag in tags:
-            print(f"🔍 搜索标签: {tag.name} (权重: {tag.weight})")
+            logger.debug("🔍 搜索标签: %s (权重: %s)", tag.name, tag.weight)
             
             # 根据标签搜索内容
             tag_content = await self.content_service.get_content_by_user_tags(
@@ -822,6 +965,8 @@ class RecommendationService:
                 skip=0,
                 limit=max_per_tag * 3  # 多取一些用于过滤
             )
+            if explainer:
+                explainer.record_candidates(tier, len(tag_content))
             
             # 过滤已使用的内容
             filtered_content = []
@@ -834,11 +979,11 @@ class RecommendationService:
             selected_content = filtered_content[:max_per_tag]
             content_list.extend(selected_content)
             
-            print(f"   ✅ 找到 {len(selected_content)} 篇内容 (总共 {len(tag_content)} 篇)")
+            logger.debug("   ✅ 找到 %s 篇内容 (总共 %s 篇)", len(selected_content), len(tag_content))
             
             # 显示匹配的内容信息
             for content in selected_content:
-                print(f"      📄 {content.title[:30]}... ({content.publish_time})")
+                logger.debug("      📄 %s... (%s)", content.title[:30], content.publish_time)
         
         return content_list
 
@@ -868,7 +1013,8 @@ class RecommendationService:
         content_types: List[str],
         basic_info_tags: List[str],
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        explainer: Optional[RecommendationExplainer] = None
     ) -> List[Content]:
         """
         🎯 按内容类型的智能推荐：权重优先 + 时间调节
@@ -879,12 +1025,14 @@ class RecommendationService:
             basic_info_tags: 基础信息标签列表 ['行业资讯', '政策法规', '交易公告', '调价公告'] 
             skip: 跳过数量
             limit: 返回数量限制
+            explainer: 推荐解释收集器（可选）
             
         Returns:
             List[Content]: 按类型筛选的智能推荐内容
         """
         try:
-            print(f"🎯 按类型智能推荐 - 用户: {user_id}, 类型: {content_types}, 标签: {basic_info_tags}")
+            stages = StageTimer("by_type")
+            logger.debug("🎯 按类型智能推荐 - 用户: %s, 类型: %s, 标签: %s", user_id, content_types, basic_info_tags)
             
             # 获取用户标签
             user_tags = await self.user_service.get_user_tags(user_id)
@@ -893,16 +1041,20 @@ class RecommendationService:
                 try:
                     user_tags = await self.user_service.ensure_user_has_tags(user_id)
                 except:
-                    print(f"❌ 用户 {user_id} 无标签，返回空内容")
+                    logger.error("❌ 用户 %s 无标签，返回空内容", user_id)
                     return []
             
-            print(f"🏷️ 用户标签数量: {len(user_tags.tags)}")
+            logger.debug("🏷️ 用户标签数量: %s", len(user_tags.tags))
+            stages.lap("tag_fetch")
             
             # 根据用户行为调整标签权重
             adjusted_tags = await self.adjust_tag_weights_by_behavior(user_id, user_tags.tags)
             
             # 按标签权重排序，权重高的优先
             adjusted_tags.sort(key=lambda x: x.weight, reverse=True)
+            stages.lap("behavior_adjust")
+            if explainer:
+                explainer.user_tag_count = len(adjusted_tags)
             
             # 🔥 构建类型筛选查询条件
             type_filter = {
@@ -912,74 +1064,93 @@ class RecommendationService:
                 ]
             }
             
-            print(f"🔍 类型筛选条件: {type_filter}")
+            logger.debug("🔍 类型筛选条件: %s", type_filter)
             
             # 🔥 分层推荐策略（仅在指定类型内）
             recommendations = []
             used_content_ids = set()
             
-            print(f"🎯 开始分层推荐，初始used_content_ids: {len(used_content_ids)}")
+            logger.debug("🎯 开始分层推荐，初始used_content_ids: %s", len(used_content_ids))
             
             # 第一层：最高权重标签精准匹配（权重 >= 4.0）
             high_weight_tags = [tag for tag in adjusted_tags if tag.weight >= 4.0]
             if high_weight_tags:
-                print(f"🔥 第一层：高权重标签 ({len(high_weight_tags)}个)")
+                logger.debug("🔥 第一层：高权重标签 (%s个)", len(high_weight_tags))
                 for tag in high_weight_tags:
-                    print(f"   🏷️ {tag.name} (权重: {tag.weight})")
+                    logger.debug("   🏷️ %s (权重: %s)", tag.name, tag.weight)
                 
-                print(f"🔍 第一层前used_content_ids: {used_content_ids}")
+                logger.debug("🔍 第一层前used_content_ids: %s", used_content_ids)
                 first_tier = await self._get_precise_content_by_tags_and_type(
                     high_weight_tags,
                     used_content_ids,
                     type_filter,
-                    max_per_tag=3
+                    max_per_tag=3,
+                    explainer=explainer,
+                    tier="tier1"
                 )
                 recommendations.extend(first_tier)
-                print(f"🔍 第一层后used_content_ids: {used_content_ids}")
-                print(f"   ✅ 第一层推荐: {len(first_tier)}篇")
+                if explainer:
+                    explainer.record_tier(first_tier, "tier1")
+                stages.lap("tier1_fetch")
+                logger.debug("🔍 第一层后used_content_ids: %s", used_content_ids)
+                logger.debug("   ✅ 第一层推荐: %s篇", len(first_tier))
             
             # 第二层：中等权重标签匹配（权重 2.0-4.0）
             if len(recommendations) < limit:
                 medium_weight_tags = [tag for tag in adjusted_tags if 2.0 <= tag.weight < 4.0]
                 if medium_weight_tags:
-                    print(f"🟡 第二层：中权重标签 ({len(medium_weight_tags)}个)")
+                    logger.debug("🟡 第二层：中权重标签 (%s个)", len(medium_weight_tags))
                     
-                    print(f"🔍 第二层前used_content_ids: {used_content_ids}")
+                    logger.debug("🔍 第二层前used_content_ids: %s", used_content_ids)
                     second_tier = await self._get_precise_content_by_tags_and_type(
                         medium_weight_tags,
                         used_content_ids,
                         type_filter,
-                        max_per_tag=2
+                        max_per_tag=2,
+                        explainer=explainer,
+                        tier="tier2"
                     )
                     recommendations.extend(second_tier)
-                    print(f"🔍 第二层后used_content_ids: {used_content_ids}")
-                    print(f"   ✅ 第二层推荐: {len(second_tier)}篇")
+                    if explainer:
+                        explainer.record_tier(second_tier, "tier2")
+                    stages.lap("tier2_fetch")
+                    logger.debug("🔍 第二层后used_content_ids: %s", used_content_ids)
+                    logger.debug("   ✅ 第二层推荐: %s篇", len(second_tier))
             
             # 第三层：低权重标签匹配（权重 < 2.0）
             if len(recommendations) < limit:
                 low_weight_tags = [tag for tag in adjusted_tags if tag.weight < 2.0]
                 if low_weight_tags:
-                    print(f"🔵 第三层：低权重标签 ({len(low_weight_tags)}个)")
+                    logger.debug("🔵 第三层：低权重标签 (%s个)", len(low_weight_tags))
                     
-                    print(f"🔍 第三层前used_content_ids: {used_content_ids}")
+                    logger.debug("🔍 第三层前used_content_ids: %s", used_content_ids)
                     third_tier = await self._get_precise_content_by_tags_and_type(
                         low_weight_tags,
                         used_content_ids,
                         type_filter,
-                        max_per_tag=1
+                        max_per_tag=1,
+                        explainer=explainer,
+                        tier="tier3"
                     )
                     recommendations.extend(third_tier)
-                    print(f"🔍 第三层后used_content_ids: {used_content_ids}")
-                    print(f"   ✅ 第三层推荐: {len(third_tier)}篇")
+                    if explainer:
+                        explainer.record_tier(third_tier, "tier3")
+                    stages.lap("tier3_fetch")
+                    logger.debug("🔍 第三层后used_content_ids: %s", used_content_ids)
+                    logger.debug("   ✅ 第三层推荐: %s篇", len(third_tier))
             
             # 第四层：如果还不够，补充该类型的最新内容
             if len(recommendations) < limit:
-                print(f"📰 第四层：补充该类型最新内容")
+                logger.debug("📰 第四层：补充该类型最新内容")
                 remaining_limit = limit - len(recommendations)
                 
                 # 查询该类型的最新内容
-                latest_content_cursor = self.content_service.collection.find(type_filter).sort("publish_time", -1)
+                latest_content_cursor = self.content_service.recommendation_collection.find(
+                    type_filter, max_time_ms=self.content_service.recommendation_max_time_ms
+                ).sort("publish_time", -1)
                 latest_content_docs = await latest_content_cursor.to_list(length=remaining_limit * 2)
+                if explainer:
+                    explainer.record_candidates("latest", len(latest_content_docs))
                 
                 # 🔥 修复重复问题：检查used_content_ids
                 added_count = 0
@@ -993,13 +1164,16 @@ class RecommendationService:
                         recommendations.append(content)
                         used_content_ids.add(content_id)
                         added_count += 1
+                        if explainer:
+                            explainer.record_tier([content], "latest")
                         
-                        print(f"      ✅ 补充内容: {content.title[:30]}... (ID: {content_id})")
+                        logger.debug("      ✅ 补充内容: %s... (ID: %s)", content.title[:30], content_id)
                     else:
                         if content_id in used_content_ids:
-                            print(f"      ⚠️ 内容已存在，跳过: {doc.get('title', 'Unknown')[:30]}... (ID: {content_id})")
+                            logger.debug("      ⚠️ 内容已存在，跳过: %s... (ID: %s)", doc.get('title', 'Unknown')[:30], content_id)
                 
-                print(f"   ✅ 第四层补充: {added_count}篇新内容")
+                logger.debug("   ✅ 第四层补充: %s篇新内容", added_count)
+                stages.lap("latest_fill")
             
             # 应用分页
             if skip > 0:
@@ -1009,48 +1183,52 @@ class RecommendationService:
             # 为每个推荐内容计算最终相关性分数
             for content in recommendations:
                 content.relevance_score = await self.calculate_content_relevance_score_v2(
-                    user_tags, content
+                    user_tags, content,
+                    explanation=explainer.item(content.id) if explainer else None
                 )
             
             # 🎯 关键：按相关性分数重新排序整个推荐列表
             recommendations.sort(key=lambda x: x.relevance_score or 0, reverse=True)
+            stages.lap("scoring")
             
             # 🔥 推荐服务层最终去重保障（在排序后）
             unique_recommendations = []
             seen_ids = set()
             
-            print(f"🔍 推荐服务层最终去重: 输入 {len(recommendations)} 条推荐")
+            logger.debug("🔍 推荐服务层最终去重: 输入 %s 条推荐", len(recommendations))
             
             for i, content in enumerate(recommendations):
                 content_id = content.id
                 if content_id not in seen_ids:
                     unique_recommendations.append(content)
                     seen_ids.add(content_id)
-                    print(f"   ✅ 保留第{i+1}条: {content.title[:30]}... (ID: {content_id})")
+                    logger.debug("   ✅ 保留第%s条: %s... (ID: %s)", i + 1, content.title[:30], content_id)
                 else:
-                    print(f"   ❌ 推荐服务层去重：跳过第{i+1}条重复内容: {content.title[:30]}... (ID: {content_id})")
+                    logger.debug("   ❌ 推荐服务层去重：跳过第%s条重复内容: %s... (ID: %s)", i + 1, content.title[:30], content_id)
             
             final_recommendations = unique_recommendations
-            print(f"🎯 推荐服务层去重完成: {len(recommendations)} → {len(final_recommendations)} 条唯一推荐")
-            
-            print(f"🎯 按类型智能推荐完成: 返回 {len(final_recommendations)} 篇 {content_types} 类型内容")
-            
-            # 输出推荐内容的标签匹配情况
-            for i, content in enumerate(final_recommendations[:3]):  # 只显示前3篇
-                content_tags = self._get_all_content_tags(content)
-                matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
-                print(f"   📄 {i+1}. {content.title[:50]}...")
-                print(f"       🏷️ 匹配标签: {matched_user_tags}")
-                print(f"       ⭐ 相关性: {content.relevance_score:.2f}")
-                print(f"       📅 时间: {content.publish_time}")
-                print(f"       🏷️ 类型: {content.type}")
+            stages.lap("dedup")
+            if explainer:
+                explainer.stage_timings = stages.timings
+            logger.debug("🎯 推荐服务层去重完成: %s → %s 条唯一推荐", len(recommendations), len(final_recommendations))
+            
+            logger.debug("🎯 按类型智能推荐完成: 返回 %s 篇 %s 类型内容", len(final_recommendations), content_types)
+            
+            # 输出推荐内容的标签匹配情况（仅调试/追踪时计算）
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, content in enumerate(final_recommendations[:3]):  # 只显示前3篇
+                    content_tags = self._get_all_content_tags(content)
+                    matched_user_tags = [tag.name for tag in adjusted_tags if tag.name in content_tags]
+                    logger.debug("   📄 %s. %s...", i + 1, content.title[:50])
+                    logger.debug("       🏷️ 匹配标签: %s", matched_user_tags)
+                    logger.debug("       ⭐ 相关性: %.2f", content.relevance_score)
+                    logger.debug("       📅 时间: %s", content.publish_time)
+                    logger.debug("       🏷️ 类型: %s", content.type)
             
             return final_recommendations
             
         except Exception as e:
-            print(f"❌ 按类型智能推荐失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 按类型智能推荐失败: %s", str(e))
             return []
 
     async def _get_precise_content_by_tags_and_type(
@@ -1058,7 +1236,9 @@ class RecommendationService:
         tags: List[UserTag],
         used_content_ids: set,
         type_filter: dict,
-        max_per_tag: int = 2
+        max_per_tag: int = 2,
+        explainer: Optional[RecommendationExplainer] = None,
+        tier: str = ""
     ) -> List[Content]:
         """
         🎯 根据标签和类型精准获取内容
@@ -1075,7 +1255,7 @@ class RecommendationService:
         content_list = []
         
         for tag in tags:
-            print(f"🔍 搜索标签: {tag.name} (权重: {tag.weight}) 在指定类型中")
+            logger.debug("🔍 搜索标签: %s (权重: %s) 在指定类型中", tag.name, tag.weight)
             
             # 构建查询条件：标签匹配 + 类型筛选
             query = {
@@ -1096,8 +1276,12 @@ class RecommendationService:
             }
             
             # 查询匹配的内容
-            content_cursor = self.content_service.collection.find(query).sort("publish_time", -1)
+            content_cursor = self.content_service.recommendation_collection.find(
+                query, max_time_ms=self.content_service.recommendation_max_time_ms
+            ).sort("publish_time", -1)
             content_docs = await content_cursor.to_list(length=max_per_tag * 3)
+            if explainer:
+                explainer.record_candidates(tier, len(content_docs))
             
             # 🔥 简化去重逻辑：只检查used_content_ids，确保内容不重复
             tag_content_count = 0  # 该标签已添加的内容数量
@@ -1113,15 +1297,15 @@ class RecommendationService:
                     used_content_ids.add(content_id)
                     tag_content_count += 1
                     
-                    print(f"      ✅ 添加内容: {content.title[:30]}... (ID: {content_id})")
+                    logger.debug("      ✅ 添加内容: %s... (ID: %s)", content.title[:30], content_id)
                     
                     # 该标签达到最大数量限制，停止添加
                     if tag_content_count >= max_per_tag:
                         break
                 else:
-                    print(f"      ⚠️ 内容已存在，跳过: {doc.get('title', 'Unknown')[:30]}... (ID: {content_id})")
+                    logger.debug("      ⚠️ 内容已存在，跳过: %s... (ID: %s)", doc.get('title', 'Unknown')[:30], content_id)
             
-            print(f"   ✅ 标签 {tag.name} 找到 {tag_content_count} 篇新内容")
+            logger.debug("   ✅ 标签 %s 找到 %s 篇新内容", tag.name, tag_content_count)
         
-        print(f"🎯 按标签和类型搜索完成，总共找到 {len(content_list)} 篇内容")
+        logger.debug("🎯 按标签和类型搜索完成，总共找到 %s 篇内容", len(content_list))
         return content_list 
\ No newline at end of file
@@ -1,12 +1,51 @@
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional, Tuple
+from pymongo import ReturnDocument
 from pymongo.database import Database
 from app.models.user import UserTags, UserTag, TagCategory, UserCreate, User, UserRole, TagSource
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_and_update_password
 from app.utils.region_mapper import RegionMapper
 from app.utils.energy_weight_system import EnergyWeightSystem, get_energy_weight  # 🔥 新增能源权重系统
+from app.core.logging_config import get_trace_logger
 from datetime import datetime
 import uuid
 
+logger = get_trace_logger(__name__)
+
+# 与 _validate_tags 一致的标签数量上限
+MAX_USER_TAGS = 50
+MAX_TAGS_PER_CATEGORY = 10
+
+def _category_value(category: Any) -> Any:
+    return getattr(category, "value", category)
+
+def _select_new_tags(existing: Iterable[Tuple[str, Any]], new_tags: List[UserTag]) -> List[UserTag]:
+    """
+    按名称去重并遵守数量上限，依次挑选可写入的新标签
+
+    existing 为已有标签的 (名称, 分类)；规则与 add_user_tags 的更新管道一致。
+    """
+    known_names = set()
+    category_counts = {}
+    total_count = 0
+    for name, category in existing:
+        known_names.add(name)
+        category = _category_value(category)
+        category_counts[category] = category_counts.get(category, 0) + 1
+        total_count += 1
+
+    selected = []
+    for tag in new_tags:
+        category = _category_value(tag.category)
+        if tag.name in known_names:
+            continue
+        if total_count >= MAX_USER_TAGS or category_counts.get(category, 0) >= MAX_TAGS_PER_CATEGORY:
+            continue
+        selected.append(tag)
+        known_names.add(tag.name)
+        category_counts[category] = category_counts.get(category, 0) + 1
+        total_count += 1
+    return selected
+
 class UserService:
     def __init__(self, database: Database):
         self.db = database
@@ -34,6 +73,8 @@ class UserService:
             province_code = RegionMapper.get_province_by_city(user_data.register_city)
             if not province_code:
                 raise ValueError(f"不支持的注册城市: {user_data.register_city}")
+            # 统一使用标准城市名（"广州市" → "广州"），与内容地域标签一致
+            register_city = RegionMapper.normalize_city(user_data.register_city)
             
             # 通过省份获取区域信息（确保完整的地域信息）
             region_code = RegionMapper.get_region_by_province(province_code)
@@ -41,11 +82,11 @@ class UserService:
                 raise ValueError(f"无法获取城市 {user_data.register_city} 的区域信息")
             
             # 🔥 获取注册时的完整地域信息
-            location_info = RegionMapper.get_full_location_info(user_data.register_city)
+            location_info = RegionMapper.get_full_location_info(register_city)
             
             # 🔥 构建注册信息（用于重置标签功能）
             register_info = {
-                "register_city": user_data.register_city,
+                "register_city": register_city,
                 "energy_types": energy_types or [],
                 "location_info": location_info,
                 "register_time": datetime.utcnow().isoformat(),
@@ -55,7 +96,7 @@ class UserService:
             
             # 创建用户基础信息
             user_id = str(uuid.uuid4())
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
             
             user_doc = {
                 "id": user_id,
@@ -65,8 +106,9 @@ class UserService:
                 "role": UserRole.FREE,
                 "is_active": True,
                 "created_at": datetime.utcnow().isoformat(),
+                "updated_at": datetime.utcnow(),  # 失效总线轮询模式依赖此字段
                 "has_initial_tags": False,
-                "register_city": user_data.register_city,
+                "register_city": register_city,
                 "register_info": register_info  # 🔥 存储完整的注册信息
             }
             
@@ -74,13 +116,13 @@ class UserService:
             await self.users_collection.insert_one(user_doc)
             
             # 根据注册城市自动初始化标签
-            await self.initialize_user_tags_by_city(user_id, user_data.register_city, energy_types)
+            await self.initialize_user_tags_by_city(user_id, register_city, energy_types)
             
             # 更新用户标签初始化状态
             user_doc["has_initial_tags"] = True
             await self.users_collection.update_one(
                 {"id": user_id},
-                {"$set": {"has_initial_tags": True}}
+                {"$set": {"has_initial_tags": True, "updated_at": datetime.utcnow()}}
             )
             
             # 返回用户对象（不包含密码）
@@ -157,12 +199,12 @@ class UserService:
                 tags.extend(energy_tags_info["tags"])
                 
                 # 输出能源标签信息
-                print(f"⚡ 能源标签分层权重配置:")
+                logger.debug("⚡ 能源标签分层权重配置:")
                 for category, products in energy_tags_info["hierarchy"].items():
                     if products:
-                        print(f"   📁 {category} (大类权重: 3.0)")
+                        logger.debug("   📁 %s (大类权重: 3.0)", category)
                         for product in products:
-                            print(f"      └── {product} (具体产品权重: 5.0)")
+                            logger.debug("      └── %s (具体产品权重: 5.0)", product)
             
             # 创建或更新用户标签
             user_tags = UserTags(
@@ -178,13 +220,13 @@ class UserService:
                 upsert=True
             )
             
-            print(f"✅ 用户 {user_id} 标签初始化完成:")
-            print(f"   🏙️ 城市标签: {location_info['city']} (权重: 5.0)")
+            logger.debug("✅ 用户 %s 标签初始化完成:", user_id)
+            logger.debug("   🏙️ 城市标签: %s (权重: 5.0)", location_info['city'])
             if "province" in location_info:
-                print(f"   🏛️ 省份标签: {location_info['province']} (权重: 1.5)")
+                logger.debug("   🏛️ 省份标签: %s (权重: 1.5)", location_info['province'])
             if "region" in location_info:
-                print(f"   🗺️ 地区标签: {location_info['region']} (权重: 1.0)")
-            print(f"   🌍 全国标签: 全国 (权重: 0.5)")
+                logger.debug("   🗺️ 地区标签: %s (权重: 1.0)", location_info['region'])
+            logger.debug("   🌍 全国标签: 全国 (权重: 0.5)")
             
             return user_tags
             
@@ -288,9 +330,15 @@ class UserService:
             if not user_doc:
                 return None
             
-            # 验证密码
-            if not verify_password(password, user_doc.get("hashed_password", "")):
+            # 验证密码（线程池执行；哈希参数过期时顺便更新）
+            verified, new_hash = await verify_and_update_password(password, user_doc.get("hashed_password", ""))
+            if not verified:
                 return None
+            if new_hash:
+                await self.users_collection.update_one(
+                    {"_id": user_doc["_id"]},
+                    {"$set": {"hashed_password": new_hash, "updated_at": datetime.utcnow()}}
+                )
             
             # 返回用户对象（不包含密码）
             user_doc.pop("hashed_password", None)
@@ -383,7 +431,7 @@ class UserService:
                 )
             
             # 如果用户不存在或没有注册城市，创建基础标签
-            print(f"为用户 {user_id} 创建基础标签（用户{'不存在' if not user else '无注册城市'}）")
+            logger.debug("为用户 %s 创建基础标签（用户%s）", user_id, '不存在' if not user else '无注册城市')
             basic_tags = [
                 # 移除"全国"标签，避免用户获取过多无关内容
                 # UserTag(
@@ -421,11 +469,11 @@ class UserService:
                 upsert=True
             )
             
-            print(f"✅ 成功为用户 {user_id} 创建了 {len(basic_tags)} 个基础标签")
+            logger.debug("✅ 成功为用户 %s 创建了 %s 个基础标签", user_id, len(basic_tags))
             return user_tags
             
         except Exception as e:
-            print(f"❌ 确保用户标签失败: {str(e)}")
+            logger.error("❌ 确保用户标签失败: %s", str(e))
             raise Exception(f"Failed to ensure user has tags: {str(e)}")
 
     async def reset_user_tags_to_registration(self, user_id: str) -> UserTags:
@@ -451,7 +499,7 @@ class UserService:
             if not hasattr(user, 'register_info') or not user.register_info:
                 # 如果没有注册信息，使用 register_city 作为备选方案
                 if hasattr(user, 'register_city') and user.register_city:
-                    print(f"⚠️ 用户 {user_id} 缺少详细注册信息，使用 register_city: {user.register_city}")
+                    logger.warning("⚠️ 用户 %s 缺少详细注册信息，使用 register_city: %s", user_id, user.register_city)
                     # 使用基础的城市信息重新初始化
                     return await self.initialize_user_tags_by_city(user_id, user.register_city, [])
                 else:
@@ -461,13 +509,13 @@ class UserService:
             original_city = register_info.get("register_city")
             original_energy_types = register_info.get("energy_types", [])
             
-            print(f"🔄 开始重置用户 {user_id} 的标签...")
-            print(f"   📍 原始注册城市: {original_city}")
-            print(f"   ⚡ 原始能源类型: {original_energy_types}")
+            logger.debug("🔄 开始重置用户 %s 的标签...", user_id)
+            logger.debug("   📍 原始注册城市: %s", original_city)
+            logger.debug("   ⚡ 原始能源类型: %s", original_energy_types)
             
             # 删除现有标签
             await self.user_tags_collection.delete_one({"user_id": user_id})
-            print(f"   🗑️ 已清除所有现有标签")
+            logger.debug("   🗑️ 已清除所有现有标签")
             
             # 根据注册信息重新初始化标签
             new_tags = await self.initialize_user_tags_by_city(
@@ -476,8 +524,8 @@ class UserService:
                 original_energy_types
             )
             
-            print(f"✅ 用户 {user_id} 标签重置完成")
-            print(f"   🏷️ 新标签数量: {len(new_tags.tags)}")
+            logger.debug("✅ 用户 %s 标签重置完成", user_id)
+            logger.debug("   🏷️ 新标签数量: %s", len(new_tags.tags))
             
             # 统计标签类型
             tag_stats = {}
@@ -487,12 +535,12 @@ class UserService:
                     tag_stats[category] = 0
                 tag_stats[category] += 1
             
-            print(f"   📊 标签分布: {tag_stats}")
+            logger.debug("   📊 标签分布: %s", tag_stats)
             
             return new_tags
             
         except Exception as e:
-            print(f"❌ 重置用户标签失败: {str(e)}")
+            logger.error("❌ 重置用户标签失败: %s", str(e))
             raise Exception(f"Failed to reset user tags: {str(e)}")
 
     async def update_user_tags(self, user_id: str, tags: List[UserTag]) -> UserTags:
@@ -532,17 +580,6 @@ class UserService:
         为用户添加新标签（用于收藏学习等场景）
         """
         try:
-            # 获取当前用户标签
-            current_user_tags = await self.get_user_tags(user_id)
-            if not current_user_tags:
-                # 如果用户没有标签，先初始化
-                current_user_tags = await self.ensure_user_has_tags(user_id)
-            
-            # 检查标签是否已存在
-            existing_tag_names = {tag.name for tag in current_user_tags.tags}
-            if tag_name in existing_tag_names:
-                return False  # 标签已存在，不重复添加
-            
             # 创建新标签
             new_tag = UserTag(
                 category=category,
@@ -551,29 +588,110 @@ class UserService:
                 source=source,
                 created_at=datetime.utcnow()
             )
-            
-            # 添加到现有标签列表
-            updated_tags = current_user_tags.tags + [new_tag]
-            
-            # 更新用户标签
-            await self.update_user_tags(user_id, updated_tags)
-            
-            return True
-            
+
+            added_tags = await self.add_user_tags(user_id, [new_tag])
+            return len(added_tags) > 0  # 标签已存在或超出数量限制时不添加
+
         except Exception as e:
-            print(f"添加用户标签失败: {str(e)}")
+            logger.error("添加用户标签失败: %s", str(e))
             return False
 
+    async def add_user_tags(
+        self,
+        user_id: str,
+        new_tags: List[UserTag],
+        current_user_tags: Optional[UserTags] = None
+    ) -> List[UserTag]:
+        """
+        🔥 批量为用户添加新标签（一次原子更新）
+
+        按标签名称去重，并遵守 _validate_tags 的数量限制。写入使用聚合管道更新，
+        去重与数量限制在数据库端逐个标签判定，并发收藏也不会写入重名标签或超出上限；
+        返回值按更新前的文档重新推算，与实际写入一致。
+
+        Args:
+            user_id: 用户ID
+            new_tags: 待添加的标签列表
+            current_user_tags: 调用方已读取的用户标签，传入可省去一次查询
+
+        Returns:
+            List[UserTag]: 实际写入的新标签
+        """
+        if not new_tags:
+            return []
+
+        try:
+            if current_user_tags is None:
+                current_user_tags = await self.get_user_tags(user_id)
+            if not current_user_tags:
+                # 如果用户没有标签，先初始化
+                current_user_tags = await self.ensure_user_has_tags(user_id)
+
+            # 先按调用方的快照过滤，明显无法写入时省去一次更新
+            candidates = _select_new_tags(
+                ((tag.name, tag.category) for tag in current_user_tags.tags), new_tags
+            )
+            if not candidates:
+                return []
+
+            # 数据库端逐个判定：重名、总数达上限或所属分类达上限时跳过
+            append_if_allowed = {
+                "$cond": [
+                    {"$or": [
+                        {"$in": ["$$this.name", {"$ifNull": ["$$value.name", []]}]},
+                        {"$gte": [{"$size": "$$value"}, MAX_USER_TAGS]},
+                        {"$gte": [
+                            {"$size": {"$filter": {
+                                "input": "$$value",
+                                "as": "tag",
+                                "cond": {"$eq": ["$$tag.category", "$$this.category"]}
+                            }}},
+                            MAX_TAGS_PER_CATEGORY
+                        ]}
+                    ]},
+                    "$$value",
+                    {"$concatArrays": ["$$value", ["$$this"]]}
+                ]
+            }
+
+            # 演示用户的标签文档以真实用户ID存储
+            before = await self.user_tags_collection.find_one_and_update(
+                {"user_id": current_user_tags.user_id},
+                [{
+                    "$set": {
+                        "tags": {
+                            "$reduce": {
+                                "input": {"$literal": [tag.dict() for tag in candidates]},
+                                "initialValue": {"$ifNull": ["$tags", []]},
+                                "in": append_if_allowed
+                            }
+                        },
+                        "updated_at": datetime.utcnow()
+                    }
+                }],
+                projection={"_id": 0, "tags.name": 1, "tags.category": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if before is None:
+                return []
+
+            return _select_new_tags(
+                ((tag.get("name"), tag.get("category")) for tag in before.get("tags") or []), candidates
+            )
+
+        except Exception as e:
+            raise Exception(f"Failed to add user tags: {str(e)}")
+
     def _validate_tags(self, tags: List[UserTag]) -> None:
         """验证标签数据"""
-        if len(tags) > 50:  # 限制标签数量
+        if len(tags) > MAX_USER_TAGS:  # 限制标签数量
             raise ValueError("Too many tags. Maximum 50 tags allowed.")
         
         # 检查每个分类的标签数量
         category_counts = {}
         for tag in tags:
             category_counts[tag.category] = category_counts.get(tag.category, 0) + 1
-            if category_counts[tag.category] > 10:
+            if category_counts[tag.category] > MAX_TAGS_PER_CATEGORY:
                 raise ValueError(f"Too many tags in category {tag.category}. Maximum 10 tags per category.")
 
     async def get_user_tags_by_category(
@@ -660,13 +778,20 @@ class UserService:
                 {"hashed_password": 0, "_id": 0}  # 排除密码字段和_id字段
             ).skip(skip).limit(page_size).sort("created_at", -1)  # 按创建时间倒序
             
+            user_docs = await cursor.to_list(length=page_size)
+            
+            # 一次聚合取回本页用户的标签数量
+            tags_counts = {}
+            if user_docs:
+                async for doc in self.user_tags_collection.aggregate([
+                    {"$match": {"user_id": {"$in": [user_doc["id"] for user_doc in user_docs]}}},
+                    {"$project": {"_id": 0, "user_id": 1, "tags_count": {"$size": {"$ifNull": ["$tags", []]}}}}
+                ]):
+                    tags_counts[doc["user_id"]] = doc["tags_count"]
+            
             users_list = []
-            async for user_doc in cursor:
-                # 获取用户标签数量
-                tags_count = 0
-                user_tags = await self.user_tags_collection.find_one({"user_id": user_doc["id"]})
-                if user_tags and "tags" in user_tags:
-                    tags_count = len(user_tags["tags"])
+            for user_doc in user_docs:
+                tags_count = tags_counts.get(user_doc["id"], 0)
                 
                 user_info = {
                     "id": user_doc["id"],
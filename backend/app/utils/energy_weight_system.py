@@ -5,7 +5,8 @@
 建立大类（权重3.0）和具体产品（权重5.0）的层级结构
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from types import MappingProxyType
 from enum import Enum
 
 class EnergyProductWeight(float, Enum):
@@ -13,6 +14,16 @@ class EnergyProductWeight(float, Enum):
     CATEGORY = 3.0      # 大类能源产品权重
     SPECIFIC = 5.0      # 具体能源产品权重
 
+class EnergyEntry(NamedTuple):
+    """能源产品索引项"""
+    category: str
+    weight: EnergyProductWeight
+    is_category: bool
+
+def normalize_energy_name(energy_name: str) -> str:
+    """能源名称归一化：去除空白、全角括号转半角、英文字母大写"""
+    return "".join(energy_name.split()).replace("（", "(").replace("）", ")").upper()
+
 class EnergyWeightSystem:
     """能源产品权重管理系统"""
     
@@ -129,6 +140,58 @@ class EnergyWeightSystem:
         "重烃": ("化工能源", "重烃"),
     }
     
+    # 🔥 预计算索引（模块导入时由 _build_index 构建，只读）
+    # 名称 -> (大类, 权重, 是否大类)；别名（归一化名称、括号内缩写、括号前名称）-> 标准名称
+    _ENERGY_INDEX: Mapping[str, EnergyEntry] = MappingProxyType({})
+    _ENERGY_ALIASES: Mapping[str, str] = MappingProxyType({})
+    
+    @classmethod
+    def _build_index(cls):
+        """展开层级结构与兼容性映射，构建名称索引与别名表"""
+        index: Dict[str, EnergyEntry] = {}
+        
+        for category, info in cls.ENERGY_HIERARCHY.items():
+            index[category] = EnergyEntry(category, info["weight"], True)
+        
+        for category, info in cls.ENERGY_HIERARCHY.items():
+            for product, weight in info["sub_products"].items():
+                index.setdefault(product, EnergyEntry(category, weight, False))
+        
+        for name, (category, product) in cls.LEGACY_MAPPING.items():
+            index.setdefault(name, EnergyEntry(
+                category, cls.ENERGY_HIERARCHY[category]["sub_products"][product], False
+            ))
+        
+        aliases: Dict[str, str] = {}
+        for name in index:
+            aliases.setdefault(normalize_energy_name(name), name)
+        for name in index:
+            # "液化天然气(LNG)" -> "液化天然气"、"LNG"
+            if "(" in name and name.endswith(")"):
+                main_name, abbr = name[:-1].split("(", 1)
+                for alias in (main_name, abbr):
+                    aliases.setdefault(normalize_energy_name(alias), name)
+        
+        cls._ENERGY_INDEX = MappingProxyType(index)
+        cls._ENERGY_ALIASES = MappingProxyType(aliases)
+    
+    @classmethod
+    def get_energy_entry(cls, energy_name: str) -> Optional[EnergyEntry]:
+        """查找能源产品索引项（支持别名），未找到返回None"""
+        entry = cls._ENERGY_INDEX.get(energy_name)
+        if entry is None and energy_name:
+            name = cls._ENERGY_ALIASES.get(normalize_energy_name(energy_name))
+            if name is not None:
+                entry = cls._ENERGY_INDEX[name]
+        return entry
+    
+    @classmethod
+    def get_canonical_name(cls, energy_name: str) -> str:
+        """获取能源产品标准名称（如 "LNG" -> "液化天然气(LNG)"），未知名称原样返回"""
+        if energy_name in cls._ENERGY_INDEX or not energy_name:
+            return energy_name
+        return cls._ENERGY_ALIASES.get(normalize_energy_name(energy_name), energy_name)
+    
     @classmethod
     def get_energy_weight(cls, energy_name: str) -> float:
         """
@@ -140,19 +203,9 @@ class EnergyWeightSystem:
         Returns:
             float: 权重值 (3.0 for 大类, 5.0 for 具体产品)
         """
-        # 检查是否为大类
-        if energy_name in cls.ENERGY_HIERARCHY:
-            return cls.ENERGY_HIERARCHY[energy_name]["weight"]
-        
-        # 检查是否为具体产品
-        for category, info in cls.ENERGY_HIERARCHY.items():
-            if energy_name in info["sub_products"]:
-                return info["sub_products"][energy_name]
-        
-        # 检查兼容性映射
-        if energy_name in cls.LEGACY_MAPPING:
-            category, product = cls.LEGACY_MAPPING[energy_name]
-            return cls.ENERGY_HIERARCHY[category]["sub_products"][product]
+        entry = cls.get_energy_entry(energy_name)
+        if entry is not None:
+            return entry.weight
         
         # 默认权重（未分类的能源产品）
         return 3.0
@@ -168,21 +221,8 @@ class EnergyWeightSystem:
         Returns:
             Optional[str]: 大类名称，如果未找到返回None
         """
-        # 检查是否本身就是大类
-        if energy_name in cls.ENERGY_HIERARCHY:
-            return energy_name
-        
-        # 检查是否为具体产品
-        for category, info in cls.ENERGY_HIERARCHY.items():
-            if energy_name in info["sub_products"]:
-                return category
-        
-        # 检查兼容性映射
-        if energy_name in cls.LEGACY_MAPPING:
-            category, _ = cls.LEGACY_MAPPING[energy_name]
-            return category
-        
-        return None
+        entry = cls.get_energy_entry(energy_name)
+        return entry.category if entry is not None else None
     
     @classmethod
     def get_all_categories(cls) -> List[str]:
@@ -274,8 +314,9 @@ class EnergyWeightSystem:
         recommendations = []
         
         for energy in user_selected_energies:
-            weight = cls.get_energy_weight(energy)
-            category = cls.get_energy_category(energy)
+            entry = cls.get_energy_entry(energy)
+            weight = entry.weight if entry is not None else 3.0
+            category = entry.category if entry is not None else None
             
             recommendation = {
                 "name": energy,
@@ -315,11 +356,12 @@ class EnergyWeightSystem:
         suggestions = []
         
         for energy in energies:
-            if cls.get_energy_weight(energy) > 0:
+            entry = cls.get_energy_entry(energy)
+            # 未分类的能源产品使用默认权重，同样视为有效
+            if entry is None or entry.weight > 0:
                 valid_energies.append(energy)
-                category = cls.get_energy_category(energy)
-                if category:
-                    categories_covered.add(category)
+                if entry is not None:
+                    categories_covered.add(entry.category)
             else:
                 invalid_energies.append(energy)
         
@@ -339,6 +381,8 @@ class EnergyWeightSystem:
             "coverage_ratio": len(categories_covered) / len(cls.ENERGY_HIERARCHY)
         }
 
+EnergyWeightSystem._build_index()
+
 # 工具函数：快速访问
 def get_energy_weight(energy_name: str) -> float:
     """快速获取能源权重"""
@@ -350,14 +394,13 @@ def get_energy_category(energy_name: str) -> Optional[str]:
 
 def is_energy_category(energy_name: str) -> bool:
     """判断是否为能源大类"""
-    return energy_name in EnergyWeightSystem.ENERGY_HIERARCHY
+    entry = EnergyWeightSystem.get_energy_entry(energy_name)
+    return entry is not None and entry.is_category
 
 def is_specific_product(energy_name: str) -> bool:
     """判断是否为具体能源产品"""
-    for category, info in EnergyWeightSystem.ENERGY_HIERARCHY.items():
-        if energy_name in info["sub_products"]:
-            return True
-    return energy_name in EnergyWeightSystem.LEGACY_MAPPING
+    entry = EnergyWeightSystem.get_energy_entry(energy_name)
+    return entry is not None and not entry.is_category
 
 if __name__ == "__main__":
     # 测试功能
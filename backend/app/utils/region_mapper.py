@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from types import MappingProxyType
 from enum import Enum
 
 class RegionCode(str, Enum):
@@ -614,25 +615,99 @@ class RegionMapper:
         ProvinceCode.HEILONGJIANG: "黑龙江省",
     }
 
+    # 城市名称常见后缀（"上海市" → "上海"、"锡林郭勒盟" → "锡林郭勒"）
+    CITY_SUFFIXES = ("自治州", "地区", "市", "盟")
+    
+    # 🔥 预计算索引（模块导入时由 _build_index 构建，只读）
+    _CITY_INDEX: Mapping[str, Tuple[Optional[str], Optional[str]]] = MappingProxyType({})
+    _CITY_ALIASES: Mapping[str, str] = MappingProxyType({})
+    _PROVINCE_CITIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+    _REGION_CITIES: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+    _REGION_PROVINCE_CITIES: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({})
+    _PROVINCES_WITH_CITIES: Tuple[Dict[str, Any], ...] = ()
+    
+    @classmethod
+    def _build_index(cls):
+        """根据映射表构建反向索引：城市→(省份, 区域)、省份→城市、区域→省份→城市、城市别名"""
+        city_index = {}
+        aliases = {}
+        province_cities: Dict[str, List[str]] = {}
+        region_province_cities: Dict[str, Dict[str, List[str]]] = {}
+        
+        for city, province_code in cls.CITY_TO_PROVINCE.items():
+            # 区域优先使用城市直接映射，否则通过省份映射
+            region_code = cls.CITY_TO_REGION.get(city) or cls.PROVINCE_TO_REGION.get(province_code)
+            city_index[city] = (province_code, region_code)
+            province_cities.setdefault(province_code, []).append(city)
+            if region_code:
+                region_province_cities.setdefault(region_code, {}).setdefault(province_code, []).append(city)
+            for suffix in cls.CITY_SUFFIXES:
+                aliases.setdefault(city + suffix, city)
+        
+        for city, region_code in cls.CITY_TO_REGION.items():
+            if city not in city_index:
+                city_index[city] = (None, region_code)
+        
+        region_cities: Dict[str, List[str]] = {}
+        for city, region_code in cls.CITY_TO_REGION.items():
+            region_cities.setdefault(region_code, []).append(city)
+        
+        provinces_data = []
+        for province_code, province_name in cls.PROVINCE_NAMES.items():
+            cities = province_cities.get(province_code)
+            if cities:  # 只包含有城市数据的省份
+                provinces_data.append({
+                    "code": province_code,
+                    "name": province_name,
+                    "cities": tuple(sorted(cities)),
+                    "city_count": len(cities)
+                })
+        # 按城市数量排序，城市多的省份在前
+        provinces_data.sort(key=lambda x: x["city_count"], reverse=True)
+        
+        cls._CITY_INDEX = MappingProxyType(city_index)
+        # "上海市" 等别名同时也是省级名称，但只用于城市查找；省份标签仍取自 PROVINCE_NAMES，不受影响
+        cls._CITY_ALIASES = MappingProxyType({
+            alias: city for alias, city in aliases.items() if alias not in city_index
+        })
+        cls._PROVINCE_CITIES = MappingProxyType({code: tuple(cities) for code, cities in province_cities.items()})
+        cls._REGION_CITIES = MappingProxyType({code: tuple(cities) for code, cities in region_cities.items()})
+        cls._REGION_PROVINCE_CITIES = MappingProxyType({
+            region_code: MappingProxyType({code: tuple(cities) for code, cities in provinces.items()})
+            for region_code, provinces in region_province_cities.items()
+        })
+        cls._PROVINCES_WITH_CITIES = tuple(provinces_data)
+    
+    @classmethod
+    def normalize_city(cls, city: str) -> str:
+        """城市名称归一化（去除空白与"市"等后缀），未知城市原样返回"""
+        if not city:
+            return city
+        if city in cls._CITY_INDEX:
+            return city
+        stripped = city.strip()
+        if stripped in cls._CITY_INDEX:
+            return stripped
+        return cls._CITY_ALIASES.get(stripped, stripped)
+    
+    @classmethod
+    def _lookup_city(cls, city: str) -> Tuple[Optional[str], Optional[str]]:
+        """按别名查找城市索引（精确命中已在调用方处理）"""
+        if not city:
+            return (None, None)
+        return cls._CITY_INDEX.get(cls.normalize_city(city), (None, None))
+
     @classmethod
     def get_province_by_city(cls, city: str) -> Optional[str]:
         """根据城市获取省份代码"""
-        return cls.CITY_TO_PROVINCE.get(city)
+        entry = cls._CITY_INDEX.get(city)
+        return entry[0] if entry is not None else cls._lookup_city(city)[0]
     
     @classmethod
     def get_region_by_city(cls, city: str) -> Optional[str]:
         """根据城市获取区域代码（优先使用直接映射，否则通过省份映射）"""
-        # 首先尝试直接映射
-        direct_region = cls.CITY_TO_REGION.get(city)
-        if direct_region:
-            return direct_region
-        
-        # 如果直接映射不存在，通过省份映射获取
-        province_code = cls.get_province_by_city(city)
-        if province_code:
-            return cls.get_region_by_province(province_code)
-        
-        return None
+        entry = cls._CITY_INDEX.get(city)
+        return entry[1] if entry is not None else cls._lookup_city(city)[1]
     
     @classmethod
     def get_region_by_province(cls, province_code: str) -> Optional[str]:
@@ -651,9 +726,10 @@ class RegionMapper:
 
     @classmethod
     def get_full_location_info(cls, city: str) -> Dict[str, str]:
-        """获取城市的完整位置信息（城市、省份、地区）"""
-        province_code = cls.get_province_by_city(city)
-        region_code = cls.get_region_by_city(city)
+        """获取城市的完整位置信息（城市、省份、地区），city 为归一化后的标准名称"""
+        province_code, region_code = cls._CITY_INDEX.get(city) or cls._lookup_city(city)
+        if province_code or region_code:
+            city = cls.normalize_city(city)
         
         result = {
             "city": city,
@@ -662,13 +738,13 @@ class RegionMapper:
         
         if province_code:
             result.update({
-                "province": cls.get_province_name(province_code),
+                "province": cls.PROVINCE_NAMES.get(province_code, province_code),
                 "province_code": province_code
             })
         
         if region_code:
             result.update({
-                "region": cls.get_region_name(region_code),
+                "region": cls.REGION_NAMES.get(region_code, region_code),
                 "region_code": region_code
             })
         
@@ -692,7 +768,15 @@ class RegionMapper:
     @classmethod
     def get_cities_by_region(cls, region_code: str) -> List[str]:
         """根据区域获取城市列表"""
-        return [city for city, region in cls.CITY_TO_REGION.items() if region == region_code]
+        return list(cls._REGION_CITIES.get(region_code, ()))
+
+    @classmethod
+    def get_provinces_by_region(cls, region_code: str) -> Dict[str, List[str]]:
+        """根据区域获取省份代码及其城市列表"""
+        return {
+            province_code: list(cities)
+            for province_code, cities in cls._REGION_PROVINCE_CITIES.get(region_code, {}).items()
+        }
 
     @classmethod
     def get_all_regions(cls) -> List[Dict[str, str]]:
@@ -714,21 +798,14 @@ class RegionMapper:
     @classmethod
     def get_cities_by_province(cls, province_code: str) -> List[str]:
         """根据省份代码获取城市列表"""
-        return [city for city, prov_code in cls.CITY_TO_PROVINCE.items() if prov_code == province_code]
+        return list(cls._PROVINCE_CITIES.get(province_code, ()))
     
     @classmethod
-    def get_provinces_with_cities(cls) -> List[Dict[str, any]]:
-        """获取省份及其城市的结构化数据"""
-        provinces_data = []
-        for province_code, province_name in cls.PROVINCE_NAMES.items():
-            cities = cls.get_cities_by_province(province_code)
-            if cities:  # 只包含有城市数据的省份
-                provinces_data.append({
-                    "code": province_code,
-                    "name": province_name,
-                    "cities": sorted(cities),
-                    "city_count": len(cities)
-                })
-        
-        # 按城市数量排序，城市多的省份在前
-        return sorted(provinces_data, key=lambda x: x["city_count"], reverse=True) 
\ No newline at end of file
+    def get_provinces_with_cities(cls) -> List[Dict[str, Any]]:
+        """获取省份及其城市的结构化数据（返回副本，调用方可修改）"""
+        return [
+            {**province, "cities": list(province["cities"])}
+            for province in cls._PROVINCES_WITH_CITIES
+        ]
+
+RegionMapper._build_index()
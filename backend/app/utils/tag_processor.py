@@ -156,7 +156,7 @@ class TagProcessor:
         suggestions = []
         
         for tag in tags:
-            if tag in cls.STANDARD_ENERGY_TYPES:
+            if tag in _STANDARD_ENERGY_TYPE_SET:
                 valid_tags.append(tag)
             else:
                 invalid_tags.append(tag)
@@ -253,17 +253,10 @@ class TagProcessor:
         else:
             extracted_tags["basic_info_tags"].append("行业资讯")
         
-        # 能源类型标签提取
-        for energy_type in cls.STANDARD_ENERGY_TYPES:
-            # 特殊处理带括号的能源类型
-            if "(" in energy_type:
-                main_name = energy_type.split("(")[0]
-                abbr = energy_type.split("(")[1].rstrip(")")
-                if main_name.lower() in text or abbr.lower() in text:
-                    extracted_tags["energy_type_tags"].append(energy_type)
-            else:
-                if energy_type.lower() in text:
-                    extracted_tags["energy_type_tags"].append(energy_type)
+        # 能源类型标签提取（带括号的能源类型按名称或缩写匹配）
+        for energy_type, keywords in _ENERGY_TYPE_KEYWORDS:
+            if any(keyword in text for keyword in keywords):
+                extracted_tags["energy_type_tags"].append(energy_type)
         
         # 业务领域标签提取
         business_keywords = {
@@ -333,4 +326,19 @@ class TagProcessor:
             
             stats["tag_frequency"][category] = dict(tag_counter)
         
-        return stats 
\ No newline at end of file
+        return stats 
+
+def _energy_type_keywords(energy_type: str) -> tuple:
+    """能源类型的匹配关键词（小写）：带括号的类型拆为名称与缩写"""
+    if "(" in energy_type:
+        main_name = energy_type.split("(")[0]
+        abbr = energy_type.split("(")[1].rstrip(")")
+        return (main_name.lower(), abbr.lower())
+    return (energy_type.lower(),)
+
+# 🔥 预计算：能源类型集合与匹配关键词（避免每次调用重复遍历与拆分）
+_STANDARD_ENERGY_TYPE_SET = frozenset(TagProcessor.STANDARD_ENERGY_TYPES)
+_ENERGY_TYPE_KEYWORDS = tuple(
+    (energy_type, _energy_type_keywords(energy_type))
+    for energy_type in TagProcessor.STANDARD_ENERGY_TYPES
+)
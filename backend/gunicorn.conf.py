@@ -0,0 +1,41 @@
+"""
+生产部署：gunicorn 管理多个 uvicorn worker
+
+用法（在 backend 目录下）:
+    gunicorn app.main:app -c gunicorn.conf.py
+    WEB_CONCURRENCY=8 PORT=8001 gunicorn app.main:app -c gunicorn.conf.py
+
+每个 worker 独立执行 lifespan（连接 MongoDB、预热缓存、启动失效总线），
+不使用 preload_app：Motor 客户端与后台任务不能在 fork 前创建。
+跨 worker 共享的数据通过 SHARED_STATE_URL 配置的共享状态后端读写。
+"""
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 预热（user_behavior 聚合、推荐预计算）可能较慢，启动超时放宽
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# 定期回收 worker，避免长期运行的内存碎片；抖动避免所有 worker 同时重启
+max_requests = int(os.getenv("MAX_REQUESTS", "20000"))
+max_requests_jitter = 2000
+
+# /health 只在首批 worker 预热期间返回 503：所有 worker 共用同一个监听 socket，
+# 负载均衡的健康检查落在哪个 worker 上是随机的，回收重启的 worker 若也返回 503，
+# 会让整个实例在摘除 / 恢复之间来回抖动。之后 fork 的 worker 照常后台预热，但不挡健康检查。
+_forked_workers = 0
+
+def pre_fork(server, worker):
+    global _forked_workers
+    _forked_workers += 1
+    if _forked_workers > server.num_workers:
+        os.environ["WARMUP_GATE_HEALTH"] = "false"
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
@@ -0,0 +1,8 @@
+"""
+HTTP 压测工具（asyncio + httpx）
+
+- scenarios：按真实前端流量建模的场景（仪表盘首屏并发请求、内容浏览、搜索、参考数据）
+- driver：虚拟用户并发驱动、按接口统计吞吐与尾延迟、JSONL 请求录制回放
+
+用法见 python -m loadtest --help
+"""
@@ -0,0 +1,106 @@
+"""
+压测命令行入口
+
+用法（在 backend 目录下）:
+    # 准备 loadtest{i}@example.com 用户与文章（默认写入 energy_info_synthetic，不动业务库）
+    python scripts/generate_synthetic_corpus.py --users 200
+    # --start-server 时以 DATABASE_NAME=<--database> 启动被测服务
+    python -m loadtest --start-server --database energy_info_synthetic --users 50 --duration 60
+    # 压测已运行的服务时，该服务需以同一库启动：DATABASE_NAME=energy_info_synthetic ./start_backend.sh
+    python -m loadtest --weights dashboard=0.8,browse_content=0.2 --output report.json
+    python -m loadtest --replay capture.jsonl --speed 2
+
+开始前会先登录首尾两个合成用户，登录失败（库不一致或用户数不足）时直接退出。
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from loadtest.driver import LoadTestRunner, load_capture, print_report, replay_capture
+from loadtest.scenarios import DEFAULT_WEIGHTS, parse_weights
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_server(port: int, workers: int, database: str) -> subprocess.Popen:
+    """在本地启动 uvicorn（关闭 reload 与访问日志，避免干扰计时），连接合成语料库"""
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--no-access-log",
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, "DATABASE_NAME": database})
+
+def wait_for_health(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise Exception(f"服务在 {timeout}s 内未就绪: {base_url}")
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if args.replay:
+            entries = load_capture(args.replay)
+            print(f"⏯️ 回放 {len(entries)} 个请求（{args.speed}x）")
+            return await replay_capture(client, entries, speed=args.speed, token=args.token)
+
+        weights = parse_weights(args.weights) if args.weights else DEFAULT_WEIGHTS
+        print(f"🚀 {args.users} 个虚拟用户，持续 {args.duration}s，场景权重 {weights}")
+        runner = LoadTestRunner(
+            client, weights, users=args.users, duration=args.duration,
+            think_time=args.think_time, seed=args.seed, password=args.password
+        )
+        await runner.check_users()
+        return await runner.run()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="HTTP 压测（仪表盘真实流量模型）")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001", help="服务地址")
+    parser.add_argument("--users", type=int, default=20, help="并发虚拟用户数")
+    parser.add_argument("--duration", type=float, default=30.0, help="持续时间（秒）")
+    parser.add_argument("--think-time", type=float, default=0.0, help="场景间平均思考时间（秒）")
+    parser.add_argument("--weights", help="场景权重，如 dashboard=0.7,search=0.3")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--password", default="demo123", help="合成用户密码")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP连接池大小")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单请求超时（秒）")
+    parser.add_argument("--replay", help="回放 JSONL 请求录制文件")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度倍率")
+    parser.add_argument("--token", help="回放时使用的 Bearer 令牌")
+    parser.add_argument("--start-server", action="store_true", help="在本地启动 uvicorn 后再压测")
+    parser.add_argument("--server-workers", type=int, default=1, help="--start-server 时的 worker 数")
+    parser.add_argument("--database", default="energy_info_synthetic", help="--start-server 时被测服务使用的数据库（合成语料库）")
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    server = None
+    if args.start_server:
+        port = httpx.URL(args.base_url).port or 8001
+        server = start_server(port, args.server_workers, args.database)
+    try:
+        wait_for_health(args.base_url)
+        report = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
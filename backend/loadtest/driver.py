@@ -0,0 +1,206 @@
+"""
+压测驱动
+
+- EndpointStats：按接口名（路由模板）累计延迟、状态码、错误
+- LoadTestRunner：N 个虚拟用户登录后按权重循环执行场景，持续指定时长
+- replay_capture：按录制的时间偏移回放 JSONL 请求（每行 {"method","path","params","json","headers","offset_ms","name"}）
+"""
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from loadtest.scenarios import API, SCENARIOS, VirtualUser
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+class EndpointStats:
+    """单个接口的压测统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.status_counts: Dict[int, int] = {}
+        self.errors = 0
+
+    def record(self, latency_ms: float, status_code: Optional[int]):
+        self.latencies.append(latency_ms)
+        if status_code is None:
+            self.errors += 1
+            return
+        self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "errors": self.errors,
+            "status": {str(code): n for code, n in sorted(self.status_counts.items())},
+        }
+
+class StatsCollector:
+    """所有接口的统计汇总"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def record(self, name: str, latency_ms: float, status_code: Optional[int]):
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats(name)
+        stats.record(latency_ms, status_code)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        endpoints = {name: stats.summary(elapsed) for name, stats in sorted(self.endpoints.items())}
+        total = sum(item["requests"] for item in endpoints.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "errors": sum(item["errors"] for item in endpoints.values()),
+            "endpoints": endpoints,
+        }
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n📊 压测结果: {report['requests']} 请求 / {report['elapsed_s']}s = {report['rps']} req/s，错误 {report['errors']}")
+    print(f"{'接口':<62} {'请求数':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'错误':>5}")
+    for name, item in report["endpoints"].items():
+        print(f"{name:<62} {item['requests']:>7} {item['rps']:>8.2f} {item['p50_ms']:>7.1f}ms "
+              f"{item['p95_ms']:>7.1f}ms {item['p99_ms']:>7.1f}ms {item['errors']:>5}")
+
+async def timed_request(client: httpx.AsyncClient, stats: StatsCollector, name: str, method: str, path: str,
+                        token: Optional[str] = None, **kwargs) -> Optional[httpx.Response]:
+    """发出请求并记录延迟；网络异常记为错误，返回 None"""
+    headers = dict(kwargs.pop("headers", None) or {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, headers=headers, **kwargs)
+    except httpx.HTTPError:
+        stats.record(name, (time.perf_counter() - start) * 1000, None)
+        return None
+    stats.record(name, (time.perf_counter() - start) * 1000, response.status_code)
+    return response
+
+class LoadTestRunner:
+    """按场景权重驱动虚拟用户"""
+
+    def __init__(self, client: httpx.AsyncClient, weights: Dict[str, float], users: int, duration: float,
+                 think_time: float = 0.0, seed: int = 42, password: str = "demo123"):
+        self.client = client
+        self.weights = weights
+        self.users = users
+        self.duration = duration
+        self.think_time = think_time
+        self.seed = seed
+        self.password = password
+        self.stats = StatsCollector()
+
+    async def login(self, index: int) -> Optional[VirtualUser]:
+        """以合成语料用户 loadtest{i}@example.com 登录"""
+        response = await timed_request(
+            self.client, self.stats, "POST /users/login", "POST", f"{API}/users/login",
+            json={"email": f"loadtest{index}@example.com", "password": self.password}
+        )
+        if response is None or response.status_code != 200:
+            return None
+        payload = response.json()
+        token = payload["access_token"]
+        rng = random.Random(f"{self.seed}:{index}")
+
+        async def request(name: str, method: str, path: str, **kwargs):
+            return await timed_request(self.client, self.stats, name, method, path, token=token, **kwargs)
+
+        return VirtualUser(payload["user_info"]["id"], token, request, rng)
+
+    async def check_users(self):
+        """压测前确认首尾两个合成用户可以登录，避免整轮只测到 401"""
+        for index in sorted({0, self.users - 1}):
+            email = f"loadtest{index}@example.com"
+            response = await self.client.post(f"{API}/users/login", json={"email": email, "password": self.password})
+            if response.status_code != 200:
+                raise Exception(
+                    f"合成用户 {email} 登录失败（HTTP {response.status_code}）：被测服务的 DATABASE_NAME "
+                    f"需与 generate_synthetic_corpus.py --database 一致，且 --users 不少于 {self.users}"
+                )
+
+    async def run_user(self, index: int, deadline: float):
+        user = await self.login(index)
+        if user is None:
+            return
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[user.rng.choices(names, weights=weights)[0]]
+            await scenario(user)
+            if self.think_time:
+                await asyncio.sleep(user.rng.uniform(0, self.think_time * 2))
+
+    async def run(self) -> Dict[str, Any]:
+        self.stats = StatsCollector()
+        deadline = time.perf_counter() + self.duration
+        await asyncio.gather(*(self.run_user(index, deadline) for index in range(self.users)))
+        self.stats.finish()
+        return self.stats.report()
+
+def load_capture(path: str) -> List[Dict[str, Any]]:
+    """读取 JSONL 录制文件，按 offset_ms 排序"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "path" not in entry:
+                raise ValueError(f"{path}:{line_number} 缺少 path 字段")
+            entries.append(entry)
+    return sorted(entries, key=lambda entry: entry.get("offset_ms", 0))
+
+async def replay_capture(client: httpx.AsyncClient, entries: Iterable[Dict[str, Any]], speed: float = 1.0,
+                         token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    按录制时间线回放请求
+
+    speed > 1 加速回放；未提供 name 时以 "METHOD path" 作为统计键。
+    """
+    stats = StatsCollector()
+    start = time.perf_counter()
+    tasks = []
+    for entry in entries:
+        delay = entry.get("offset_ms", 0) / 1000 / speed - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        method = entry.get("method", "GET").upper()
+        name = entry.get("name") or f"{method} {entry['path']}"
+        tasks.append(asyncio.create_task(timed_request(
+            client, stats, name, method, entry["path"], token=token,
+            params=entry.get("params"), json=entry.get("json"), headers=entry.get("headers")
+        )))
+    await asyncio.gather(*tasks)
+    stats.finish()
+    return stats.report()
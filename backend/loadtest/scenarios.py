@@ -0,0 +1,142 @@
+"""
+压测场景定义
+
+每个场景是一个协程：接收 VirtualUser，按前端真实调用顺序发出请求。
+仪表盘场景与 Dashboard.vue 首屏一致：用户标签 + 智能推荐 + 4个分类推荐 + 内容统计 + 收藏批量检查并发发出。
+场景权重来自前端页面访问比例，可通过 --weights 覆盖。
+"""
+import asyncio
+import random
+from typing import Awaitable, Callable, Dict, List
+
+API = "/api/v1"
+
+# 仪表盘分类推荐（Dashboard.vue 中的推荐筛选项）
+RECOMMENDATION_TYPES = ["all", "market", "policy", "announcement"]
+
+SEARCH_KEYWORDS = ["天然气", "LNG", "电力", "价格", "交易", "政策", "上海", "原油"]
+
+class VirtualUser:
+    """
+    一个已登录的虚拟用户
+
+    request(name, method, path, ...) 由驱动注入：name 为统计用的接口名（路由模板），
+    保证同一路由不同参数的请求汇总到一起。
+    """
+
+    def __init__(self, user_id: str, token: str, request: Callable[..., Awaitable], rng: random.Random):
+        self.user_id = user_id
+        self.token = token
+        self.request = request
+        self.rng = rng
+        # 最近看到的文章ID（用于详情、收藏检查）
+        self.seen_content_ids: List[str] = []
+        # 内容列表 ETag（模拟浏览器条件请求）
+        self.etags: Dict[str, str] = {}
+
+    def remember(self, response) -> None:
+        if response is None or response.status_code != 200:
+            return
+        try:
+            payload = response.json()
+        except ValueError:
+            return
+        items = payload.get("items") if isinstance(payload, dict) else None
+        if items:
+            self.seen_content_ids = [item["id"] for item in items if item.get("id")][:50]
+
+async def dashboard(user: VirtualUser):
+    """仪表盘首屏：并发加载标签、推荐、分类推荐、统计，随后批量检查收藏状态"""
+    uid = user.user_id
+    calls = [
+        user.request("GET /users/{user_id}/tags", "GET", f"{API}/users/{uid}/tags"),
+        user.request(
+            "GET /users/{user_id}/smart-recommendations", "GET",
+            f"{API}/users/{uid}/smart-recommendations", params={"page": 1, "page_size": 50}
+        ),
+        user.request("GET /content/stats", "GET", f"{API}/content/stats"),
+        user.request("GET /favorites/count", "GET", f"{API}/favorites/count"),
+    ]
+    calls.extend(
+        user.request(
+            "GET /users/{user_id}/recommendations-by-type/{content_type}", "GET",
+            f"{API}/users/{uid}/recommendations-by-type/{content_type}", params={"page": 1, "page_size": 20}
+        )
+        for content_type in RECOMMENDATION_TYPES
+    )
+    responses = await asyncio.gather(*calls)
+    user.remember(responses[1])
+
+    if user.seen_content_ids:
+        await user.request(
+            "POST /favorites/check", "POST", f"{API}/favorites/check",
+            json={"content_ids": user.seen_content_ids}
+        )
+
+async def browse_content(user: VirtualUser):
+    """内容列表翻页 + 打开详情（带 If-None-Match）"""
+    page = user.rng.randint(1, 5)
+    path = f"{API}/content/"
+    key = f"{path}?page={page}"
+    headers = {"If-None-Match": user.etags[key]} if key in user.etags else None
+    response = await user.request(
+        "GET /content/", "GET", path, params={"page": page, "page_size": 20}, headers=headers
+    )
+    if response is not None and response.headers.get("etag"):
+        user.etags[key] = response.headers["etag"]
+    user.remember(response)
+
+    if user.seen_content_ids:
+        content_id = user.rng.choice(user.seen_content_ids)
+        await user.request("GET /content/{content_id}", "GET", f"{API}/content/{content_id}")
+        await user.request("POST /content/{content_id}/view", "POST", f"{API}/content/{content_id}/view")
+
+async def search(user: VirtualUser):
+    """关键词搜索"""
+    await user.request(
+        "GET /content/search", "GET", f"{API}/content/search",
+        params={"keyword": user.rng.choice(SEARCH_KEYWORDS), "page": 1, "page_size": 20}
+    )
+
+async def favorites(user: VirtualUser):
+    """收藏页：列表 + 统计"""
+    await asyncio.gather(
+        user.request("GET /favorites/list", "GET", f"{API}/favorites/list"),
+        user.request("GET /favorites/stats", "GET", f"{API}/favorites/stats"),
+    )
+
+async def reference_data(user: VirtualUser):
+    """标签管理页：静态参考数据"""
+    await asyncio.gather(
+        user.request("GET /users/tag-options", "GET", f"{API}/users/tag-options"),
+        user.request("GET /users/energy-hierarchy", "GET", f"{API}/users/energy-hierarchy"),
+        user.request("GET /users/provinces-with-cities", "GET", f"{API}/users/provinces-with-cities"),
+    )
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable]] = {
+    "dashboard": dashboard,
+    "browse_content": browse_content,
+    "search": search,
+    "favorites": favorites,
+    "reference_data": reference_data,
+}
+
+# 默认流量配比（仪表盘首屏占绝大多数）
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "dashboard": 0.55,
+    "browse_content": 0.25,
+    "search": 0.08,
+    "favorites": 0.08,
+    "reference_data": 0.04,
+}
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """解析 "dashboard=0.7,search=0.3" 形式的场景权重"""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        weights[name] = float(weight)
+    return weights
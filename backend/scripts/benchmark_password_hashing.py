@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+密码哈希事件循环延迟基准测试
+
+模拟一批并发登录，同时运行一个每10ms唤醒一次的探针协程，统计探针的唤醒延迟：
+- sync：在协程中直接调用 verify_password（旧实现）
+- async：通过 verify_password_async 放到有界线程池（新实现）
+
+用法: python scripts/benchmark_password_hashing.py [--logins 20] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import pwd_context, verify_password, verify_password_async
+
+PROBE_INTERVAL = 0.01
+
+async def probe_event_loop(lags: list, stop: asyncio.Event):
+    """记录事件循环唤醒延迟（实际睡眠时间 - 期望睡眠时间）"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+async def sync_login(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+async def async_login(password: str, hashed: str) -> bool:
+    return await verify_password_async(password, hashed)
+
+async def run_scenario(name: str, login, logins: int, hashed: str):
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_event_loop(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 3)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("demo123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+
+    assert all(results), "密码校验失败"
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{name:>6} | 登录 {logins} 次耗时 {elapsed:.2f}s | 探针唤醒 {len(lags):4d} 次 | "
+          f"延迟 p50 {statistics.median(lags):7.1f}ms  p99 {p99:7.1f}ms  max {lags[-1]:7.1f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="密码哈希事件循环延迟基准测试")
+    parser.add_argument("--logins", type=int, default=20, help="并发登录次数")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt轮数（默认使用配置值）")
+    args = parser.parse_args()
+
+    context = pwd_context.copy(bcrypt__rounds=args.rounds) if args.rounds else pwd_context
+    hashed = context.hash("demo123")
+    print(f"🔐 bcrypt 哈希: {hashed[:7]}... 并发登录: {args.logins}")
+
+    await run_scenario("sync", sync_login, args.logins, hashed)
+    await run_scenario("async", async_login, args.logins, hashed)
+
+if __name__ == "__main__":
+    asyncio.run(main())
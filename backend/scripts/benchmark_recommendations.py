@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+推荐服务延迟基准测试（带回归门禁）
+
+在进程内直接调用 RecommendationService（不经过HTTP），针对本地 mongod 中由
+generate_synthetic_corpus.py 生成的固定语料：
+- get_smart_recommendations
+- get_smart_recommendations_by_type（行情 / 政策 / 公告）
+- get_tiered_recommendations
+- get_similar_content
+
+每个场景记录 p50/p95/p99 延迟与单次调用的 MongoDB 命令数，并与基线文件比较：
+p95/p99 超出基线 (1 + 容差) 或平均命令数增加时以退出码 1 结束；
+基线文件不存在或语料参数与基线不一致时同样以退出码 1 结束（需先 --update-baseline）。
+
+语料不一致时会重建目标数据库。只会自动清空带有基准元数据（_benchmark_meta）的数据库，
+其他非空数据库（如业务库 energy_info）需显式传入 --drop 才会被清空。
+
+用法:
+    python scripts/benchmark_recommendations.py --update-baseline      # 首次运行，生成基线
+    python scripts/benchmark_recommendations.py                        # 与基线比较
+    python scripts/benchmark_recommendations.py --articles 200000 --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo import MongoClient, monitoring
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.services.user_service import UserService
+from app.services.content_service import ContentService
+from app.services.recommendation_service import RecommendationService
+from generate_synthetic_corpus import CorpusGenerator, load_corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "recommendation_baseline.json")
+META_COLLECTION = "_benchmark_meta"
+
+class CommandCounter(monitoring.CommandListener):
+    """统计驱动发出的MongoDB命令数"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+def ensure_corpus(args) -> CorpusGenerator:
+    """语料参数与已有数据不一致时重新生成（固定种子保证每次结果相同）"""
+    generator = CorpusGenerator(seed=args.seed, articles=args.articles)
+    meta = {"seed": args.seed, "articles": args.articles, "users": args.users}
+
+    client = MongoClient(args.mongodb_url)
+    db = client[args.database]
+    existing = db[META_COLLECTION].find_one({"_id": "corpus"}, {"_id": 0})
+    if existing != meta:
+        collections = db.list_collection_names()
+        if collections and META_COLLECTION not in collections and not getattr(args, "drop", False):
+            client.close()
+            raise SystemExit(
+                f"❌ 数据库 {args.database} 非空且不是基准语料库，拒绝清空；确认可以删除时加 --drop"
+            )
+        print(f"🌱 生成基准语料: {meta}")
+        client.drop_database(args.database)
+        load_corpus(db, generator, users=args.users)
+        db[META_COLLECTION].replace_one({"_id": "corpus"}, {"_id": "corpus", **meta}, upsert=True)
+    else:
+        print(f"🌱 复用已有基准语料: {meta}")
+    client.close()
+    return generator
+
+def build_scenarios(service: RecommendationService, generator: CorpusGenerator, users: int) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    """场景名 -> 以迭代序号为参数的调用（轮流使用不同用户/文章）"""
+    user_ids = [generator.user_id(index) for index in range(min(users, 50))]
+    article_ids = [str(generator.article_id(generator.articles - 1 - index * 7)) for index in range(50)]
+
+    def user(i: int) -> str:
+        return user_ids[i % len(user_ids)]
+
+    return {
+        "smart": lambda i: service.get_smart_recommendations(user(i), skip=0, limit=20),
+        "by_type_market": lambda i: service.get_smart_recommendations_by_type(
+            user(i), content_types=["news"], basic_info_tags=["行业资讯"], skip=0, limit=20
+        ),
+        "by_type_policy": lambda i: service.get_smart_recommendations_by_type(
+            user(i), content_types=["policy"], basic_info_tags=["政策法规"], skip=0, limit=20
+        ),
+        "by_type_announcement": lambda i: service.get_smart_recommendations_by_type(
+            user(i), content_types=["announcement", "price"], basic_info_tags=["交易公告", "调价公告"], skip=0, limit=20
+        ),
+        "tiered": lambda i: service.get_tiered_recommendations(user(i)),
+        "similar": lambda i: service.get_similar_content(article_ids[i % len(article_ids)], limit=5),
+    }
+
+async def run_scenario(call: Callable[[int], Awaitable[Any]], counter: CommandCounter, iterations: int, warmup: int) -> Dict[str, float]:
+    for i in range(warmup):
+        await call(i)
+
+    latencies = []
+    queries = []
+    for i in range(iterations):
+        counter.count = 0
+        start = time.perf_counter()
+        await call(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+    }
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], latency_tolerance: float, query_tolerance: float) -> List[str]:
+    """返回回归项列表"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + latency_tolerance)
+            if result[metric] > limit:
+                regressions.append(f"{name}.{metric}: {result[metric]:.2f} > {limit:.2f} (基线 {base[metric]:.2f})")
+        limit = base["queries_mean"] * (1 + query_tolerance)
+        if result["queries_mean"] > limit:
+            regressions.append(f"{name}.queries_mean: {result['queries_mean']} > {limit:.2f} (基线 {base['queries_mean']})")
+    return regressions
+
+async def main():
+    parser = argparse.ArgumentParser(description="推荐服务延迟基准测试")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017", help="MongoDB连接地址")
+    parser.add_argument("--database", default="energy_info_bench", help="基准测试数据库（会被重建）")
+    parser.add_argument("--seed", type=int, default=42, help="语料随机种子")
+    parser.add_argument("--articles", type=int, default=50000, help="语料文章数")
+    parser.add_argument("--users", type=int, default=200, help="语料用户数")
+    parser.add_argument("--iterations", type=int, default=100, help="每个场景的计时次数")
+    parser.add_argument("--warmup", type=int, default=5, help="每个场景的预热次数")
+    parser.add_argument("--scenario", action="append", help="只运行指定场景（可重复）")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25, help="p95/p99 允许超出基线的比例")
+    parser.add_argument("--query-tolerance", type=float, default=0.0, help="平均命令数允许超出基线的比例")
+    parser.add_argument("--output", help="把本次结果写入JSON文件")
+    parser.add_argument("--drop", action="store_true", help="允许清空不含基准元数据的非空数据库")
+    args = parser.parse_args()
+
+    generator = ensure_corpus(args)
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(args.mongodb_url, event_listeners=[counter])
+    db = client[args.database]
+    user_service = UserService(db)
+    content_service = ContentService(db)
+    service = RecommendationService(db, user_service=user_service, content_service=content_service)
+
+    scenarios = build_scenarios(service, generator, args.users)
+    if args.scenario:
+        scenarios = {name: call for name, call in scenarios.items() if name in args.scenario}
+
+    results = {}
+    print(f"{'场景':<22} {'p50':>9} {'p95':>9} {'p99':>9} {'命令数(均/最大)':>16}")
+    for name, call in scenarios.items():
+        result = await run_scenario(call, counter, args.iterations, args.warmup)
+        results[name] = result
+        print(f"{name:<22} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+              f"{result['queries_mean']:>10} / {result['queries_max']:<4}")
+    client.close()
+
+    report = {
+        "corpus": {"seed": args.seed, "articles": args.articles, "users": args.users},
+        "iterations": args.iterations,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 基线已更新: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ 未找到基线文件 {args.baseline}，使用 --update-baseline 生成并提交")
+        return 1
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != report["corpus"]:
+        print(f"❌ 基线语料 {baseline.get('corpus')} 与本次 {report['corpus']} 不一致，无法比较")
+        return 1
+
+    regressions = compare(results, baseline["results"], args.latency_tolerance, args.query_tolerance)
+    if regressions:
+        print("❌ 性能回归:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+
+    print("✅ 未发现性能回归")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+RegionMapper 查询基准测试
+
+对全部城市逐一查询，比较旧实现（每次遍历映射表）与预计算索引的耗时：
+- get_region_by_city / get_full_location_info
+- get_cities_by_province / get_cities_by_region
+- get_provinces_with_cities
+
+用法: python scripts/benchmark_region_mapper.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.region_mapper import RegionMapper
+
+# ---------- 旧实现（遍历映射表） ----------
+
+def legacy_region_by_city(city):
+    direct_region = RegionMapper.CITY_TO_REGION.get(city)
+    if direct_region:
+        return direct_region
+    province_code = RegionMapper.CITY_TO_PROVINCE.get(city)
+    if province_code:
+        return RegionMapper.PROVINCE_TO_REGION.get(province_code)
+    return None
+
+def legacy_full_location_info(city):
+    province_code = RegionMapper.CITY_TO_PROVINCE.get(city)
+    region_code = legacy_region_by_city(city)
+    result = {"city": city, "city_code": city.lower().replace(" ", "_")}
+    if province_code:
+        result.update({"province": RegionMapper.PROVINCE_NAMES.get(province_code), "province_code": province_code})
+    if region_code:
+        result.update({"region": RegionMapper.REGION_NAMES.get(region_code), "region_code": region_code})
+    return result
+
+def legacy_cities_by_province(province_code):
+    return [city for city, code in RegionMapper.CITY_TO_PROVINCE.items() if code == province_code]
+
+def legacy_cities_by_region(region_code):
+    return [city for city, code in RegionMapper.CITY_TO_REGION.items() if code == region_code]
+
+def legacy_provinces_with_cities():
+    provinces_data = []
+    for province_code, province_name in RegionMapper.PROVINCE_NAMES.items():
+        cities = legacy_cities_by_province(province_code)
+        if cities:
+            provinces_data.append({
+                "code": province_code,
+                "name": province_name,
+                "cities": sorted(cities),
+                "city_count": len(cities)
+            })
+    return sorted(provinces_data, key=lambda x: x["city_count"], reverse=True)
+
+# ---------- 基准 ----------
+
+def timeit(func, repeat: int) -> float:
+    """返回单轮平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description="RegionMapper 查询基准测试")
+    parser.add_argument("--repeat", type=int, default=200, help="每个场景重复轮数")
+    args = parser.parse_args()
+
+    cities = RegionMapper.get_all_cities()
+    provinces = [p["code"] for p in RegionMapper.get_all_provinces()]
+    regions = [r["code"] for r in RegionMapper.get_all_regions()]
+
+    # 结果一致性校验
+    for city in cities:
+        assert RegionMapper.get_full_location_info(city) == legacy_full_location_info(city), city
+    for code in provinces:
+        assert RegionMapper.get_cities_by_province(code) == legacy_cities_by_province(code), code
+    for code in regions:
+        assert RegionMapper.get_cities_by_region(code) == legacy_cities_by_region(code), code
+    assert RegionMapper.get_provinces_with_cities() == legacy_provinces_with_cities()
+
+    scenarios = [
+        (f"region_by_city x{len(cities)}",
+         lambda: [legacy_region_by_city(c) for c in cities],
+         lambda: [RegionMapper.get_region_by_city(c) for c in cities]),
+        (f"full_location_info x{len(cities)}",
+         lambda: [legacy_full_location_info(c) for c in cities],
+         lambda: [RegionMapper.get_full_location_info(c) for c in cities]),
+        (f"cities_by_province x{len(provinces)}",
+         lambda: [legacy_cities_by_province(p) for p in provinces],
+         lambda: [RegionMapper.get_cities_by_province(p) for p in provinces]),
+        (f"cities_by_region x{len(regions)}",
+         lambda: [legacy_cities_by_region(r) for r in regions],
+         lambda: [RegionMapper.get_cities_by_region(r) for r in regions]),
+        ("provinces_with_cities",
+         legacy_provinces_with_cities,
+         RegionMapper.get_provinces_with_cities),
+    ]
+
+    print(f"🗺️ 城市 {len(cities)} 个，省份 {len(provinces)} 个，区域 {len(regions)} 个，重复 {args.repeat} 轮")
+    for name, legacy, indexed in scenarios:
+        legacy_us = timeit(legacy, args.repeat)
+        indexed_us = timeit(indexed, args.repeat)
+        print(f"{name:>28} | 旧实现 {legacy_us:9.1f}µs | 索引 {indexed_us:9.1f}µs | 加速 {legacy_us / indexed_us:6.1f}x")
+
+if __name__ == "__main__":
+    main()
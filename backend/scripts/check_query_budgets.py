@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+主要接口的 MongoDB 查询预算检查
+
+在进程内调用各接口背后的服务方法（不经过HTTP），用 app.core.query_guard 统计每次调用
+发出的命令数与命令总耗时，超出预算时列出命令最多的调用位置并以退出码 1 结束。
+数据使用 generate_synthetic_corpus.py 生成的固定语料（与 benchmark_recommendations.py 共用）。
+
+新增接口或修复 N+1 后请同步更新 BUDGETS。
+
+用法:
+    python scripts/check_query_budgets.py
+    python scripts/check_query_budgets.py --report-only          # 只输出报告，不做判定
+    python scripts/check_query_budgets.py --case get_users --top 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict, NamedTuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.query_guard import QueryRecorder, format_report, query_budget, query_guard_listener
+from app.models.ai_chat import ChatHistoryQuery
+from app.services.ai_chat_service import AIChatService
+from app.services.user_service import UserService
+from app.services.content_service import ContentService
+from app.services.favorite_service import FavoriteService
+from app.services.recommendation_service import RecommendationService
+from benchmark_recommendations import ensure_corpus
+
+class Budget(NamedTuple):
+    max_commands: int
+    max_time_ms: float
+
+# 接口 -> 预算（命令数 / 命令总耗时ms，按合成语料 5万篇文章计）
+BUDGETS: Dict[str, Budget] = {
+    "get_users": Budget(3, 100),
+    "search_chat_history": Budget(3, 100),
+    "adjust_tag_weights_by_behavior": Budget(3, 100),
+    "get_user_behavior_insights": Budget(3, 100),
+    "get_user_favorites": Budget(3, 50),
+    "check_favorites": Budget(2, 50),
+    "content_list": Budget(2, 100),
+    "content_search": Budget(2, 200),
+    "smart_recommendations": Budget(12, 400),
+    "recommendations_by_type": Budget(12, 400),
+    "similar_content": Budget(4, 200),
+}
+
+def build_cases(db, generator) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    user_service = UserService(db)
+    content_service = ContentService(db)
+    favorite_service = FavoriteService(db, user_service=user_service)
+    recommendation_service = RecommendationService(db, user_service=user_service, content_service=content_service)
+    chat_service = AIChatService(db)
+
+    user_id = generator.user_id(0)
+    article_id = str(generator.article_id(generator.articles - 1))
+    content_ids = [str(generator.article_id(generator.articles - 1 - index)) for index in range(50)]
+
+    async def adjust_tag_weights():
+        user_tags = await user_service.get_user_tags(user_id)
+        return await recommendation_service.adjust_tag_weights_by_behavior(user_id, user_tags.tags if user_tags else [])
+
+    return {
+        "get_users": lambda: user_service.get_users(page=1, page_size=20),
+        "search_chat_history": lambda: chat_service.search_chat_history(ChatHistoryQuery(page=1, page_size=20)),
+        "adjust_tag_weights_by_behavior": adjust_tag_weights,
+        "get_user_behavior_insights": lambda: recommendation_service.get_user_behavior_insights(user_id),
+        "get_user_favorites": lambda: favorite_service.get_user_favorites(user_id),
+        "check_favorites": lambda: favorite_service.check_favorites(user_id, content_ids),
+        "content_list": lambda: content_service.get_content_list(skip=0, limit=20),
+        "content_search": lambda: content_service.search_content("天然气", skip=0, limit=20),
+        "smart_recommendations": lambda: recommendation_service.get_smart_recommendations(user_id, skip=0, limit=20),
+        "recommendations_by_type": lambda: recommendation_service.get_smart_recommendations_by_type(
+            user_id, content_types=["policy"], basic_info_tags=["政策法规"], skip=0, limit=20
+        ),
+        "similar_content": lambda: recommendation_service.get_similar_content(article_id, limit=5),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="MongoDB 查询预算检查")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017", help="MongoDB连接地址")
+    parser.add_argument("--database", default="energy_info_bench", help="语料数据库（与基准测试共用）")
+    parser.add_argument("--seed", type=int, default=42, help="语料随机种子")
+    parser.add_argument("--articles", type=int, default=50000, help="语料文章数")
+    parser.add_argument("--users", type=int, default=200, help="语料用户数")
+    parser.add_argument("--case", action="append", help="只检查指定接口（可重复）")
+    parser.add_argument("--top", type=int, default=10, help="报告中列出的调用位置数")
+    parser.add_argument("--report-only", action="store_true", help="只输出报告，不判定预算")
+    parser.add_argument("--drop", action="store_true", help="允许清空不含基准元数据的非空数据库")
+    args = parser.parse_args()
+
+    generator = ensure_corpus(args)
+
+    client = AsyncIOMotorClient(args.mongodb_url, event_listeners=[query_guard_listener])
+    db = client[args.database]
+    cases = build_cases(db, generator)
+    if args.case:
+        cases = {name: call for name, call in cases.items() if name in args.case}
+
+    failures = []
+    for name, call in cases.items():
+        # 预热一次（连接建立、服务内缓存）
+        await call()
+        budget = BUDGETS.get(name)
+        guard = query_budget(budget.max_commands, budget.max_time_ms, label=name, top=args.top) if budget else None
+        with QueryRecorder(name) as recorder:
+            await call()
+
+        problems = guard.violations(recorder) if guard and not args.report_only else []
+        mark = "❌" if problems else "✅"
+        limit = f"（预算 {budget.max_commands} 条 / {budget.max_time_ms}ms）" if budget else "（未设预算）"
+        print(f"{mark} {format_report(recorder, args.top)} {limit}")
+        if problems:
+            failures.append(f"{name}: {'；'.join(problems)}")
+    client.close()
+
+    if failures:
+        print("\n❌ 超出查询预算:")
+        for failure in failures:
+            print(f"   {failure}")
+        return 1
+    print("\n✅ 全部接口在查询预算内")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
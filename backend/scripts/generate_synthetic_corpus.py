@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+大规模合成数据生成器（用于压测与性能基准）
+
+按固定随机种子生成可复现的数据并批量写入本地 MongoDB：
+- content：文章（10万 ~ 1000万篇），标签分布取自 complete_tag_options.json、RegionMapper、EnergyWeightSystem
+- users / user_tags：用户及注册城市 + 能源偏好标签（与注册流程的权重体系一致）
+- user_behavior：浏览/点击/点赞/分享行为
+- user_favorites：收藏记录（带内容快照）
+- ai_chat_sessions：AI助手会话
+
+文章可按序号随机访问（同一种子、同一序号总是生成同一篇文章），生成收藏快照时无需在内存中保留全部文章。
+文章 _id 由发布时间与序号确定，行为记录与AI会话的 _id 由种子、用户序号与记录序号确定，
+用户按 id 唯一索引去重，重复运行（未使用 --drop）时已存在的文档会被跳过。
+
+用法:
+    python scripts/generate_synthetic_corpus.py --articles 100000 --users 1000
+    python scripts/generate_synthetic_corpus.py --articles 10000000 --users 100000 --database energy_info_load --drop
+    python scripts/generate_synthetic_corpus.py --articles 20 --users 3 --dry-run
+"""
+import argparse
+import bisect
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from app.utils.region_mapper import RegionMapper
+from app.utils.energy_weight_system import EnergyWeightSystem
+from app.utils.tag_processor import TagProcessor
+
+TAG_OPTIONS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "complete_tag_options.json"
+)
+
+# 文章类型分布（基础信息标签, 内容类型, 占比）
+CONTENT_TYPES = [
+    ("行业资讯", "news", 0.45),
+    ("政策法规", "policy", 0.20),
+    ("交易公告", "announcement", 0.20),
+    ("调价公告", "price", 0.15),
+]
+
+SOURCES = [
+    "国家能源局", "国家发展改革委", "上海石油天然气交易中心", "中国石油", "中国石化",
+    "中国海油", "国家电网", "南方电网", "北京电力交易中心", "广州电力交易中心",
+    "能源研究院", "地方发展改革委", "行业协会", "能源资讯网"
+]
+
+TITLE_TEMPLATES = {
+    "news": ["{region}{energy}市场动态周报", "{energy}供需形势分析：{region}需求回暖", "{region}{energy}项目建设取得新进展"],
+    "policy": ["{region}关于促进{energy}高质量发展的实施意见", "{region}{energy}行业管理办法（征求意见稿）", "关于做好{region}{energy}保供工作的通知"],
+    "announcement": ["{region}{energy}竞价交易公告", "{energy}挂牌交易结果公示（{region}）", "{region}{energy}储气库容量交易公告"],
+    "price": ["{region}{energy}价格调整通知", "关于调整{region}{energy}销售价格的公告", "{region}{energy}门站价格调整公告"],
+}
+
+PARAGRAPHS = [
+    "为深入贯彻落实能源安全新战略，推动能源生产和消费革命，现就有关事项通知如下。",
+    "今年以来，市场供需总体平稳，价格在合理区间波动，保供稳价工作取得积极成效。",
+    "各有关单位要加强组织领导，压实主体责任，确保各项措施落地见效。",
+    "交易采用线上竞价方式进行，竞价主体须在规定时间内完成报名与保证金缴纳。",
+    "根据成本监审结果，结合上下游价格联动机制，对相关价格进行相应调整。",
+    "下一步将持续完善市场化交易机制，提升资源配置效率，促进行业健康发展。",
+    "业内人士表示，随着基础设施互联互通水平提升，区域间资源调配能力明显增强。",
+    "本次调整自发布之日起执行，请各相关企业做好衔接工作。",
+]
+
+BEHAVIOR_ACTIONS = [("view", 0.70), ("click", 0.20), ("like", 0.07), ("share", 0.03)]
+
+CHAT_QUESTIONS = [
+    "最近天然气价格走势如何？", "有哪些新的交易公告？", "如何参与竞价交易？",
+    "本地区的调价政策有什么变化？", "LNG进口情况怎么样？", "帮我总结一下本周的政策法规。"
+]
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """热门程度按排名衰减（少数标签占据大部分文章）"""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+class TagPools:
+    """标签候选池及其分布（从项目内置的标签体系加载）"""
+
+    def __init__(self, tag_options_path: str = TAG_OPTIONS_PATH):
+        tag_options = {}
+        if os.path.exists(tag_options_path):
+            with open(tag_options_path, "r", encoding="utf-8") as f:
+                tag_options = json.load(f)
+
+        self.energy_types = tag_options.get("energy_type_tags") or [
+            product["name"] for product in EnergyWeightSystem.get_all_energy_products()
+        ]
+        self.cities = RegionMapper.get_all_cities()
+        self.provinces = [province["name"] for province in RegionMapper.get_all_provinces()]
+        self.regions = [region["name"] for region in RegionMapper.get_all_regions()]
+        self.business_fields = TagProcessor.STANDARD_BUSINESS_FIELD_TAGS
+        self.beneficiaries = TagProcessor.STANDARD_BENEFICIARY_TAGS
+        self.policy_measures = TagProcessor.STANDARD_POLICY_MEASURE_TAGS
+        self.importance = TagProcessor.STANDARD_IMPORTANCE_TAGS
+
+        self._cum = {
+            name: _cumulative(_zipf_weights(len(getattr(self, name))))
+            for name in ("energy_types", "cities", "business_fields", "beneficiaries", "policy_measures", "importance")
+        }
+        self._type_cum = _cumulative([share for _, _, share in CONTENT_TYPES])
+
+    def pick(self, rng: random.Random, pool: str, k: int = 1) -> List[str]:
+        """按分布无放回抽取 k 个标签"""
+        values = getattr(self, pool)
+        cum = self._cum[pool]
+        picked = []
+        for _ in range(k * 3):
+            value = values[bisect.bisect(cum, rng.random() * cum[-1])]
+            if value not in picked:
+                picked.append(value)
+                if len(picked) == k:
+                    break
+        return picked
+
+    def pick_type(self, rng: random.Random) -> Tuple[str, str]:
+        basic_info, content_type, _ = CONTENT_TYPES[bisect.bisect(self._type_cum, rng.random() * self._type_cum[-1])]
+        return basic_info, content_type
+
+class CorpusGenerator:
+    """可复现的合成数据生成器"""
+
+    def __init__(self, seed: int = 42, articles: int = 100000, days: int = 730, end_time: Optional[datetime] = None):
+        self.seed = seed
+        self.articles = articles
+        self.days = days
+        self.end_time = end_time or datetime(2025, 1, 1)
+        self.start_time = self.end_time - timedelta(days=days)
+        self.pools = TagPools()
+
+    def _rng(self, stream: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}:{index}")
+
+    def _stable_id(self, stream: str, index: int, position: int, timestamp: datetime) -> ObjectId:
+        """派生文档ID：时间戳 + (种子, 数据流, 用户序号, 记录序号) 的哈希，重复运行时保持不变"""
+        digest = hashlib.blake2b(f"{self.seed}:{stream}:{index}:{position}".encode(), digest_size=8).hexdigest()
+        return ObjectId(f"{int(timestamp.timestamp()):08x}{digest}")
+
+    # ---------- 文章 ----------
+
+    def article_id(self, index: int) -> ObjectId:
+        """文章ID：发布时间戳 + 序号（序号越大越新）"""
+        publish_time = self.publish_time(index)
+        return ObjectId(f"{int(publish_time.timestamp()):08x}{index:016x}")
+
+    def publish_time(self, index: int) -> datetime:
+        offset = self.days * 86400 * (index + 0.5) / max(self.articles, 1)
+        return self.start_time + timedelta(seconds=int(offset))
+
+    def article(self, index: int) -> Dict[str, Any]:
+        """生成第 index 篇文章（同一种子下结果固定）"""
+        rng = self._rng("article", index)
+        pools = self.pools
+        basic_info, content_type = pools.pick_type(rng)
+
+        energy_types = pools.pick(rng, "energy_types", rng.choice((1, 1, 2, 3)))
+        region_tags = self._article_regions(rng)
+        region_label = region_tags[0] if region_tags else "全国"
+        title = rng.choice(TITLE_TEMPLATES[content_type]).format(region=region_label, energy=energy_types[0])
+
+        paragraph_count = rng.randint(3, 20)
+        body = "\n".join(rng.choice(PARAGRAPHS) for _ in range(paragraph_count))
+
+        publish_time = self.publish_time(index)
+        _id = self.article_id(index)
+        return {
+            "_id": _id,
+            "id": str(_id),
+            "title": f"{title}（{index}）",
+            "content": body,
+            "type": content_type,
+            "source": rng.choice(SOURCES),
+            "publish_time": publish_time,
+            "publish_date": publish_time.strftime("%Y-%m-%d"),
+            "tags": [],
+            "link": f"https://example.com/articles/{index}",
+            "basic_info_tags": [basic_info],
+            "region_tags": region_tags,
+            "energy_type_tags": energy_types,
+            "business_field_tags": pools.pick(rng, "business_fields", rng.randint(1, 3)),
+            "beneficiary_tags": pools.pick(rng, "beneficiaries", rng.randint(1, 2)),
+            "policy_measure_tags": pools.pick(rng, "policy_measures", rng.randint(0, 2)),
+            "importance_tags": pools.pick(rng, "importance", 1),
+            "created_at": publish_time,
+            "updated_at": publish_time,
+            "relevance_score": None,
+            "view_count": int(rng.paretovariate(1.2)) - 1,
+        }
+
+    def _article_regions(self, rng: random.Random) -> List[str]:
+        """地域标签：约30%全国性文章，其余为城市 + 所属省份 + 所属地区"""
+        if rng.random() < 0.3:
+            return ["全国"]
+        city = self.pools.pick(rng, "cities")[0]
+        info = RegionMapper.get_full_location_info(city)
+        return [tag for tag in (city, info.get("province"), info.get("region")) if tag]
+
+    def iter_articles(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        for index in range(start, self.articles):
+            yield self.article(index)
+
+    def pick_article_index(self, rng: random.Random) -> int:
+        """按热度抽取文章序号（偏向新文章）"""
+        return self.articles - 1 - int(self.articles * rng.random() ** 3)
+
+    # ---------- 用户 ----------
+
+    def user_id(self, index: int) -> str:
+        return str(uuid.UUID(int=random.Random(f"{self.seed}:user-id:{index}").getrandbits(128), version=4))
+
+    def user(self, index: int, hashed_password: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """生成用户文档及其标签文档（标签权重与注册流程一致）"""
+        rng = self._rng("user", index)
+        user_id = self.user_id(index)
+        city = self.pools.pick(rng, "cities")[0]
+        location_info = RegionMapper.get_full_location_info(city)
+        energy_types = self.pools.pick(rng, "energy_types", rng.randint(1, 4))
+        created_at = self.start_time + timedelta(seconds=rng.randint(0, self.days * 86400))
+
+        user_doc = {
+            "id": user_id,
+            "email": f"loadtest{index}@example.com",
+            "username": f"loadtest{index}",
+            "hashed_password": hashed_password,
+            "role": "paid" if rng.random() < 0.2 else "free",
+            "is_active": True,
+            "created_at": created_at.isoformat(),
+            "has_initial_tags": True,
+            "register_city": city,
+            "register_info": {
+                "register_city": city,
+                "energy_types": energy_types,
+                "location_info": location_info,
+                "register_time": created_at.isoformat(),
+                "province_code": location_info.get("province_code"),
+                "region_code": location_info.get("region_code"),
+            },
+        }
+
+        tags = [{"category": "city", "name": city, "weight": 5.0, "source": "preset"}]
+        if "province" in location_info:
+            tags.append({"category": "province", "name": location_info["province"], "weight": 1.5, "source": "region_auto"})
+        if "region" in location_info:
+            tags.append({"category": "region", "name": location_info["region"], "weight": 1.0, "source": "region_auto"})
+        tags.append({"category": "region", "name": "全国", "weight": 0.5, "source": "region_auto"})
+        for energy_type in energy_types:
+            tags.append({
+                "category": "energy_type",
+                "name": energy_type,
+                "weight": float(EnergyWeightSystem.get_energy_weight(energy_type)),
+                "source": "preset",
+            })
+        for business_field in self.pools.pick(rng, "business_fields", rng.randint(0, 2)):
+            tags.append({"category": "business_field", "name": business_field, "weight": round(rng.uniform(0.5, 2.0), 1), "source": "manual"})
+        for tag in tags:
+            tag["created_at"] = created_at
+
+        user_tags_doc = {"user_id": user_id, "tags": tags, "updated_at": created_at}
+        return user_doc, user_tags_doc
+
+    def behaviors(self, index: int, count: int) -> List[Dict[str, Any]]:
+        rng = self._rng("behavior", index)
+        user_id = self.user_id(index)
+        cum = _cumulative([share for _, share in BEHAVIOR_ACTIONS])
+        docs = []
+        for position in range(count):
+            action = BEHAVIOR_ACTIONS[bisect.bisect(cum, rng.random() * cum[-1])][0]
+            content_id = str(self.article_id(self.pick_article_index(rng)))
+            timestamp = self.end_time - timedelta(seconds=rng.randint(0, 60 * 86400))
+            docs.append({
+                "_id": self._stable_id("behavior", index, position, timestamp),
+                "user_id": user_id,
+                "action": action,
+                "content_id": content_id,
+                "timestamp": timestamp,
+                "duration": rng.randint(5, 600) if action == "view" else None,
+            })
+        return docs
+
+    def favorites(self, index: int, count: int) -> List[Dict[str, Any]]:
+        """收藏记录（含内容快照，与 FavoriteService.build_content_snapshot 字段一致）"""
+        rng = self._rng("favorite", index)
+        user_id = self.user_id(index)
+        article_indexes = {self.pick_article_index(rng) for _ in range(count)}
+        docs = []
+        for article_index in sorted(article_indexes):
+            article = self.article(article_index)
+            docs.append({
+                "user_id": user_id,
+                "content_id": article["id"],
+                "favorited_at": self.end_time - timedelta(seconds=rng.randint(0, 180 * 86400)),
+                "title": article["title"],
+                "source": article["source"],
+                "type": article["type"],
+                "publish_date": article["publish_date"],
+                "link": article["link"],
+                "content_deleted": False,
+                "energy_type_tags": article["energy_type_tags"],
+                "region_tags": article["region_tags"],
+                "business_field_tags": article["business_field_tags"],
+                "tags_learned": False,
+                "learned_at": None,
+            })
+        return docs
+
+    def chat_sessions(self, index: int, count: int) -> List[Dict[str, Any]]:
+        rng = self._rng("chat", index)
+        user_id = self.user_id(index)
+        sessions = []
+        for session_index in range(count):
+            created_at = self.end_time - timedelta(seconds=rng.randint(0, 90 * 86400))
+            messages = []
+            for turn in range(rng.randint(1, 6)):
+                timestamp = created_at + timedelta(seconds=turn * 30)
+                messages.append({"role": "user", "content": rng.choice(CHAT_QUESTIONS), "timestamp": timestamp})
+                messages.append({"role": "assistant", "content": rng.choice(PARAGRAPHS), "timestamp": timestamp + timedelta(seconds=5)})
+            assistant_type = rng.choice(("customer_service", "news_assistant", "trading_assistant"))
+            sessions.append({
+                "_id": self._stable_id("chat", index, session_index, created_at),
+                "user_id": user_id,
+                "session_id": f"loadtest-{index}-{session_index}",
+                "assistant_type": assistant_type,
+                "assistant_name": assistant_type,
+                "messages": messages,
+                "user_info": None,
+                "created_at": created_at,
+                "updated_at": messages[-1]["timestamp"],
+                "username": f"loadtest{index}",
+            })
+        return sessions
+
+def _insert_batches(collection, docs: Iterator[Dict[str, Any]], batch_size: int, label: str) -> int:
+    """分批无序写入；重复运行时跳过已存在的文档"""
+    from pymongo.errors import BulkWriteError
+
+    inserted = 0
+    start = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(docs, batch_size))
+        if not batch:
+            break
+        try:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+        elapsed = time.perf_counter() - start
+        print(f"   {label}: {inserted:,} 条 ({inserted / max(elapsed, 1e-6):,.0f} 条/秒)", end="\r", flush=True)
+    print()
+    return inserted
+
+def _ensure_indexes(db):
+    """与服务启动时一致的索引，另加推荐查询常用的标签与时间索引"""
+    db.content.create_index([("publish_time", -1)])
+    for field in ("energy_type_tags", "region_tags", "basic_info_tags", "type"):
+        db.content.create_index([(field, 1), ("publish_time", -1)])
+    db.users.create_index("id", unique=True)
+    db.users.create_index("email", unique=True)
+    db.user_tags.create_index("user_id", unique=True)
+    db.user_behavior.create_index([("user_id", 1), ("timestamp", -1)])
+    db.user_favorites.create_index([("user_id", 1), ("content_id", 1)], unique=True)
+    db.user_favorites.create_index([("user_id", 1), ("favorited_at", -1)])
+    db.user_favorites.create_index("content_id")
+    db.ai_chat_sessions.create_index("session_id")
+    db.ai_chat_sessions.create_index([("user_id", 1), ("updated_at", -1)])
+
+def load_corpus(
+    db,
+    generator: CorpusGenerator,
+    users: int,
+    behaviors_per_user: int = 30,
+    favorites_per_user: int = 10,
+    sessions_per_user: int = 1,
+    batch_size: int = 5000,
+    password: str = "demo123"
+) -> Dict[str, int]:
+    """把合成数据写入 db（pymongo 同步数据库对象），返回各集合写入数量"""
+    from app.core.security import pwd_context
+
+    # 所有合成用户共用一个密码哈希，避免生成阶段被 bcrypt 拖慢
+    hashed_password = pwd_context.hash(password)
+
+    def iter_user_docs(kind: int):
+        for index in range(users):
+            yield generator.user(index, hashed_password)[kind]
+
+    def iter_per_user(factory, count: int):
+        for index in range(users):
+            yield from factory(index, count)
+
+    counts = {}
+    print(f"📰 写入文章 {generator.articles:,} 篇")
+    counts["content"] = _insert_batches(db.content, generator.iter_articles(), batch_size, "content")
+    if users:
+        print(f"👥 写入用户 {users:,} 个")
+        counts["users"] = _insert_batches(db.users, iter_user_docs(0), batch_size, "users")
+        counts["user_tags"] = _insert_batches(db.user_tags, iter_user_docs(1), batch_size, "user_tags")
+        counts["user_behavior"] = _insert_batches(
+            db.user_behavior, iter_per_user(generator.behaviors, behaviors_per_user), batch_size, "user_behavior"
+        )
+        counts["user_favorites"] = _insert_batches(
+            db.user_favorites, iter_per_user(generator.favorites, favorites_per_user), batch_size, "user_favorites"
+        )
+        counts["ai_chat_sessions"] = _insert_batches(
+            db.ai_chat_sessions, iter_per_user(generator.chat_sessions, sessions_per_user), batch_size, "ai_chat_sessions"
+        )
+    print("🗂️ 创建索引")
+    _ensure_indexes(db)
+    return counts
+
+COLLECTIONS = ("content", "users", "user_tags", "user_behavior", "user_favorites", "user_favorite_summaries", "ai_chat_sessions")
+
+def main():
+    parser = argparse.ArgumentParser(description="大规模合成数据生成器")
+    parser.add_argument("--articles", type=int, default=100000, help="文章数量")
+    parser.add_argument("--users", type=int, default=1000, help="用户数量")
+    parser.add_argument("--behaviors-per-user", type=int, default=30, help="每个用户的行为记录数")
+    parser.add_argument("--favorites-per-user", type=int, default=10, help="每个用户的收藏数")
+    parser.add_argument("--sessions-per-user", type=int, default=1, help="每个用户的AI会话数")
+    parser.add_argument("--days", type=int, default=730, help="文章发布时间跨度（天）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--batch-size", type=int, default=5000, help="批量写入大小")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017", help="MongoDB连接地址")
+    parser.add_argument("--database", default="energy_info_synthetic", help="目标数据库（默认不写入业务库）")
+    parser.add_argument("--drop", action="store_true", help="写入前清空目标集合")
+    parser.add_argument("--dry-run", action="store_true", help="只输出样例文档，不连接数据库")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(seed=args.seed, articles=args.articles, days=args.days)
+
+    if args.dry_run:
+        sample = {
+            "article": generator.article(args.articles - 1),
+            "user": generator.user(0, "<hashed>"),
+            "behavior": generator.behaviors(0, 1),
+            "favorite": generator.favorites(0, 1),
+            "chat_session": generator.chat_sessions(0, 1),
+        }
+        print(json.dumps(sample, ensure_ascii=False, indent=2, default=str))
+        return
+
+    from pymongo import MongoClient
+
+    client = MongoClient(args.mongodb_url)
+    db = client[args.database]
+    if args.drop:
+        for name in COLLECTIONS:
+            db.drop_collection(name)
+        print(f"🗑️ 已清空 {args.database} 中的数据集合")
+
+    start = time.perf_counter()
+    counts = load_corpus(
+        db,
+        generator,
+        users=args.users,
+        behaviors_per_user=args.behaviors_per_user,
+        favorites_per_user=args.favorites_per_user,
+        sessions_per_user=args.sessions_per_user,
+        batch_size=args.batch_size,
+    )
+    print(f"✅ 完成，耗时 {time.perf_counter() - start:.1f}s: {counts}")
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+共享状态本地替身（Redis 协议子集）
+
+未安装 Redis 时用于验证多 worker 下的共享状态，数据保存在本进程内存中（LocalSharedState）。
+支持命令：PING / AUTH / SELECT / GET / SET [EX|PX] [NX] / DEL / INCRBY / INCR / PEXPIRE / FLUSHDB
+
+用法:
+    python scripts/shared_state_server.py --port 6390
+    SHARED_STATE_URL=redis://127.0.0.1:6390/0 ./start_backend_prod.sh
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.shared_state import LocalSharedState, SharedStateError, encode_command
+
+class RespStandIn:
+    def __init__(self):
+        self.state = LocalSharedState()
+
+    async def handle(self, command: str, args):
+        state = self.state
+        if command == "PING":
+            return ("+", "PONG")
+        if command in ("AUTH", "SELECT"):
+            return ("+", "OK")
+        if command == "GET":
+            return ("$", await state.get(args[0]))
+        if command == "SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            ttl = None
+            if "PX" in options:
+                ttl = int(args[2 + options.index("PX") + 1]) / 1000
+            elif "EX" in options:
+                ttl = int(args[2 + options.index("EX") + 1])
+            written = await state.set(key, value, ttl, only_if_absent="NX" in options)
+            return ("+", "OK") if written else ("$", None)
+        if command == "DEL":
+            existed = 0
+            for key in args:
+                if await state.get(key) is not None:
+                    existed += 1
+                await state.delete(key)
+            return (":", existed)
+        if command in ("INCR", "INCRBY"):
+            amount = int(args[1]) if command == "INCRBY" else 1
+            return (":", await state.incr(args[0], amount))
+        if command == "PEXPIRE":
+            entry = state._live(args[0])
+            if entry is None:
+                return (":", 0)
+            state._entries[args[0]] = (time.monotonic() + int(args[1]) / 1000, entry[1])
+            return (":", 1)
+        if command == "FLUSHDB":
+            state._entries.clear()
+            return ("+", "OK")
+        return ("-", f"ERR unknown command '{command}'")
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    writer.write(b"-ERR protocol error\r\n")
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode("utf-8"))
+                try:
+                    kind, value = await self.handle(args[0].upper(), args[1:])
+                except (IndexError, ValueError, SharedStateError) as e:
+                    kind, value = "-", f"ERR {e}"
+                writer.write(encode_reply(kind, value))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def encode_reply(kind: str, value) -> bytes:
+    if kind in ("+", "-"):
+        return f"{kind}{value}\r\n".encode("utf-8")
+    if kind == ":":
+        return f":{value}\r\n".encode("utf-8")
+    if value is None:
+        return b"$-1\r\n"
+    # 单个批量字符串：复用命令编码去掉数组头
+    return encode_command(value).split(b"\r\n", 1)[1]
+
+async def main():
+    parser = argparse.ArgumentParser(description="共享状态本地替身（Redis 协议子集）")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=6390, help="监听端口")
+    args = parser.parse_args()
+
+    standin = RespStandIn()
+    server = await asyncio.start_server(standin.serve_client, args.host, args.port)
+    print(f"🗄️ 共享状态替身已启动: redis://{args.host}:{args.port}/0")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
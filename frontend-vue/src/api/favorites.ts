@@ -80,6 +80,14 @@ class FavoritesAPI {
     return response.data.is_favorited
   }
 
+  // 批量检查收藏状态
+  async checkFavoritesStatus(contentIds: string[]): Promise<Record<string, boolean>> {
+    const response = await api.post(`/favorites/check`, {
+      content_ids: contentIds
+    })
+    return response.data.favorites
+  }
+
   // 获取收藏总数
   async getFavoritesCount(): Promise<number> {
     const response = await api.get(`/favorites/count`)
@@ -0,0 +1,27 @@
+#!/bin/bash
+
+echo "=== 启动能源信息服务后端（多 worker 生产模式） ==="
+
+# 进入后端目录
+cd "$(dirname "$0")/backend"
+
+# 激活虚拟环境（如果存在）
+if [ -d "venv" ]; then
+    source venv/bin/activate
+fi
+
+WORKERS=${WEB_CONCURRENCY:-$(python3 -c "import multiprocessing; print(multiprocessing.cpu_count())")}
+PORT=${PORT:-8001}
+
+if [ -z "$SHARED_STATE_URL" ]; then
+    echo "⚠️ 未配置 SHARED_STATE_URL，各 worker 的缓存与计数互相独立"
+fi
+
+# 优先使用 gunicorn 管理 worker（崩溃自动拉起），未安装时退回 uvicorn --workers
+if python3 -c "import gunicorn" 2>/dev/null; then
+    echo "启动 gunicorn: ${WORKERS} 个 worker，端口 ${PORT}"
+    WEB_CONCURRENCY=$WORKERS PORT=$PORT exec gunicorn app.main:app -c gunicorn.conf.py
+else
+    echo "启动 uvicorn: ${WORKERS} 个 worker，端口 ${PORT}"
+    exec python3 -m uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --workers "$WORKERS" --no-access-log
+fi